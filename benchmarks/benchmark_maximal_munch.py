@@ -0,0 +1,74 @@
+"""Verifica que a análise léxica continua linear no pior caso do maximal munch.
+
+Com os padrões `a` e `a*b` sobre "aaaa...", cada token `a` pode ler até o
+fim da linha procurando um `b`; sem a memória de configurações sem saída
+(inclusive os trechos consumidos de uma vez pelos laços), a análise fica
+quadrática. Mede `analisar` e `ScannerBytes.escanear` para tamanhos que
+dobram e falha se o tempo crescer bem mais que linearmente.
+
+Uso: python -m benchmarks.benchmark_maximal_munch
+"""
+
+import contextlib
+import io
+import os
+import tempfile
+import time
+
+from src.analisador_lexico import AnalisadorLexico
+
+TAMANHOS = (40_000, 80_000, 160_000)
+# dobrar a entrada deve no máximo ~dobrar o tempo; quadrático quadruplica
+RAZAO_MAXIMA = 3.0
+
+
+def criar_analisador() -> AnalisadorLexico:
+    analisador = AnalisadorLexico()
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, "definicoes.txt")
+        with open(caminho, "w", encoding="utf-8") as f:
+            f.write("a: a\nab: a*b\n")
+        with contextlib.redirect_stdout(io.StringIO()):
+            analisador.ler_definicoes(caminho)
+            analisador.gerar_analisador()
+    return analisador
+
+
+def medir_analisar(analisador: AnalisadorLexico, tamanho: int) -> float:
+    analisador.entrada_texto = ["a" * tamanho]
+    inicio = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        tokens = analisador.analisar()
+    tempo = time.perf_counter() - inicio
+    if len(tokens) != tamanho or any(t != ("a", "a") for t in tokens):
+        raise ValueError("analisar produziu tokens inesperados")
+    return tempo
+
+
+def medir_scanner(analisador: AnalisadorLexico, tamanho: int) -> float:
+    scanner = analisador.criar_scanner_bytes()
+    dados = b"a" * tamanho
+    inicio = time.perf_counter()
+    tokens = list(scanner.escanear(dados))
+    tempo = time.perf_counter() - inicio
+    if len(tokens) != tamanho or any(scanner.tipo(t) != "a" for t in tokens):
+        raise ValueError("ScannerBytes.escanear produziu tokens inesperados")
+    return tempo
+
+
+if __name__ == "__main__":
+    analisador = criar_analisador()
+    print(f"{'caracteres':>10} {'analisar s':>11} {'scanner s':>10}")
+
+    anteriores = None
+    for tamanho in TAMANHOS:
+        tempos = (medir_analisar(analisador, tamanho), medir_scanner(analisador, tamanho))
+        print(f"{tamanho:>10} {tempos[0]:>11.3f} {tempos[1]:>10.3f}")
+        if anteriores is not None:
+            for nome, atual, anterior in zip(("analisar", "scanner"), tempos, anteriores):
+                razao = atual / max(anterior, 1e-9)
+                if razao > RAZAO_MAXIMA:
+                    raise ValueError(
+                        f"{nome}: tempo cresceu {razao:.1f}x ao dobrar a entrada"
+                    )
+        anteriores = tempos
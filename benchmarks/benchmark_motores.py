@@ -0,0 +1,72 @@
+"""Compara os motores de conversão ER → AFD nos arquivos de definição.
+
+Para cada definição, mede o tempo de geração do AFD e o número de estados
+antes e depois da minimização, com a construção direta (followpos) e com
+derivadas de Brzozowski.
+
+Uso: python -m benchmarks.benchmark_motores [arquivo_definicoes ...]
+"""
+
+import contextlib
+import io
+import os
+import sys
+import time
+
+from src.analisador_lexico import AnalisadorLexico
+from src.automatos import HandlerAutomatos
+from src.expressaoregular import ExpressaoRegular
+
+PASTA_DEFINICOES = "tests/arquivos_definicao"
+REPETICOES = 5
+
+
+def medir(conversor, expressao: str) -> tuple[float, int, int]:
+    """Retorna (tempo médio em ms, estados gerados, estados após minimizar)."""
+    handler = HandlerAutomatos()
+    inicio = time.perf_counter()
+    for _ in range(REPETICOES):
+        # o cache de derivadas é por instância, então cada medida parte do zero
+        if hasattr(conversor, "cache_derivadas"):
+            conversor.cache_derivadas.clear()
+        afd = conversor.gerar_afd(ExpressaoRegular(expressao))
+    tempo = (time.perf_counter() - inicio) / REPETICOES * 1000
+    return tempo, len(afd.estados), len(handler.minimizar(afd).estados)
+
+
+def comparar(arquivo: str) -> None:
+    analisador = AnalisadorLexico()
+    with contextlib.redirect_stdout(io.StringIO()):
+        analisador.ler_definicoes(arquivo)
+
+    print(f"\n=== {arquivo} ===\n")
+    print(
+        f"{'definição':<16} {'followpos ms':>12} {'estados':>8} "
+        f"{'derivadas ms':>12} {'estados':>8} {'mínimo':>7}"
+    )
+
+    totais = [0.0, 0, 0.0, 0]
+    for nome, expressao in analisador.definicoes.items():
+        t_pos, n_pos, minimo = medir(analisador.conversores["followpos"], expressao)
+        t_der, n_der, _ = medir(analisador.conversores["derivadas"], expressao)
+
+        totais[0] += t_pos
+        totais[1] += n_pos
+        totais[2] += t_der
+        totais[3] += n_der
+        print(
+            f"{nome:<16} {t_pos:>12.3f} {n_pos:>8} {t_der:>12.3f} {n_der:>8} {minimo:>7}"
+        )
+
+    print(
+        f"{'TOTAL':<16} {totais[0]:>12.3f} {totais[1]:>8} "
+        f"{totais[2]:>12.3f} {totais[3]:>8}"
+    )
+
+
+if __name__ == "__main__":
+    arquivos = sys.argv[1:] or [
+        os.path.join(PASTA_DEFINICOES, f) for f in sorted(os.listdir(PASTA_DEFINICOES))
+    ]
+    for arquivo in arquivos:
+        comparar(arquivo)
@@ -0,0 +1,118 @@
+"""Compara os AFDs gerados com e sem a simplificação das expressões regulares.
+
+Para cada definição dos arquivos de definição, e para um conjunto de
+expressões aleatórias, gera o AFD por followpos a partir de
+`ExpressaoRegular(e, simplificar=False)` e de `simplificar=True`, verifica
+que os dois reconhecem a mesma linguagem e mostra a redução no número de
+posições (folhas da árvore) e de estados. Falha se algum par divergir.
+
+Uso: python -m benchmarks.benchmark_simplificacao [arquivo_definicoes ...]
+"""
+
+import contextlib
+import io
+import os
+import random
+import sys
+
+from src.analisador_lexico import AnalisadorLexico
+from src.automatos import HandlerAutomatos
+from src.conversorER import ConversorER_AFD
+from src.expressaoregular import ExpressaoRegular
+
+PASTA_DEFINICOES = "tests/arquivos_definicao"
+EXPRESSOES_ALEATORIAS = 2000
+PROFUNDIDADE = 4
+SEMENTE = 0
+
+
+def medir(expressao: str) -> tuple[int, int, int, int, int]:
+    """Retorna (posições sem/com simplificação, estados sem/com, estados mínimos).
+
+    Raises:
+        ValueError: Se os AFDs com e sem simplificação não forem equivalentes.
+    """
+    conversor = ConversorER_AFD()
+    original = ExpressaoRegular(expressao, simplificar=False)
+    simplificada = ExpressaoRegular(expressao, simplificar=True)
+    afd_original = conversor.gerar_afd(original)
+    afd_simplificado = conversor.gerar_afd(simplificada)
+    handler = HandlerAutomatos()
+    if not handler.equivalentes(afd_original, afd_simplificado):
+        raise ValueError(f"Simplificação alterou a linguagem de '{expressao}'")
+    minimo = handler.minimizar(afd_simplificado)
+    return (
+        len(original.folhas),
+        len(simplificada.folhas),
+        len(afd_original.estados),
+        len(afd_simplificado.estados),
+        len(minimo.estados),
+    )
+
+
+def reducao(antes: int, depois: int) -> str:
+    return f"{(antes - depois) / antes:>6.1%}" if antes else f"{'-':>6}"
+
+
+def imprimir_linha(nome: str, medidas: list[int] | tuple[int, ...]) -> None:
+    pos_antes, pos_depois, est_antes, est_depois, minimo = medidas
+    print(
+        f"{nome:<16} {pos_antes:>9} {pos_depois:>7} {reducao(pos_antes, pos_depois)} "
+        f"{est_antes:>8} {est_depois:>7} {reducao(est_antes, est_depois)} {minimo:>7}"
+    )
+
+
+def comparar(arquivo: str) -> None:
+    analisador = AnalisadorLexico()
+    with contextlib.redirect_stdout(io.StringIO()):
+        analisador.ler_definicoes(arquivo)
+
+    print(f"\n=== {arquivo} ===\n")
+    print(
+        f"{'definição':<16} {'posições':>9} {'simpl.':>7} {'redução':>7} "
+        f"{'estados':>8} {'simpl.':>7} {'redução':>7} {'mínimo':>7}"
+    )
+
+    totais = [0, 0, 0, 0, 0]
+    for nome, expressao in analisador.definicoes.items():
+        medidas = medir(expressao)
+        totais = [t + m for t, m in zip(totais, medidas)]
+        imprimir_linha(nome, medidas)
+    imprimir_linha("TOTAL", totais)
+
+
+def expressao_aleatoria(gerador: random.Random, profundidade: int) -> str:
+    """ER aleatória sobre {a, b, c} com ε, união, concatenação e fechos."""
+    sorteio = gerador.random()
+    if profundidade == 0 or sorteio < 0.3:
+        return gerador.choice("abc&")
+    if sorteio < 0.5:
+        esquerda = expressao_aleatoria(gerador, profundidade - 1)
+        direita = expressao_aleatoria(gerador, profundidade - 1)
+        return f"({esquerda}|{direita})"
+    if sorteio < 0.7:
+        return expressao_aleatoria(gerador, profundidade - 1) + expressao_aleatoria(
+            gerador, profundidade - 1
+        )
+    interna = expressao_aleatoria(gerador, profundidade - 1)
+    return f"({interna}){gerador.choice('*+?')}"
+
+
+def comparar_aleatorias() -> None:
+    gerador = random.Random(SEMENTE)
+    totais = [0, 0, 0, 0, 0]
+    for _ in range(EXPRESSOES_ALEATORIAS):
+        medidas = medir(expressao_aleatoria(gerador, PROFUNDIDADE))
+        totais = [t + m for t, m in zip(totais, medidas)]
+
+    print(f"\n=== {EXPRESSOES_ALEATORIAS} expressões aleatórias (semente {SEMENTE}) ===\n")
+    imprimir_linha("TOTAL", totais)
+
+
+if __name__ == "__main__":
+    arquivos = sys.argv[1:] or [
+        os.path.join(PASTA_DEFINICOES, f) for f in sorted(os.listdir(PASTA_DEFINICOES))
+    ]
+    for arquivo in arquivos:
+        comparar(arquivo)
+    comparar_aleatorias()
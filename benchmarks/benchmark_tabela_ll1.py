@@ -0,0 +1,178 @@
+"""Compara as representações da tabela LL(1): dicionário, densa e comprimida.
+
+Para cada gramática (os arquivos de teste e uma gramática gerada com
+centenas de terminais), mede a memória de cada representação, o tempo médio
+de consulta das entradas preenchidas e o tempo de parse de uma entrada com
+a tabela densa, com a comprimida (deslocamento de linhas) e com o parser
+descendente recursivo gerado a partir da tabela.
+
+Uso: python -m benchmarks.benchmark_tabela_ll1 [arquivo_gramatica ...]
+"""
+
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+from src.gramaticas import Gramatica, HandlerGramatica, NaoTerminal, Producao, Terminal
+from src.ll.analisador_ll1 import AnalisadorLL1
+from src.ll.gerador_descendente import carregar_parser, salvar_parser
+from src.ll.parser_ll1 import ParserLL1
+from src.ll.tabela_comprimida import TabelaLL1Comprimida, chave_gramatica
+
+PASTA_GRAMATICAS = "tests/arquivos_gramatica"
+REPETICOES = 5
+COMANDOS_GERADOS = 300
+
+
+def gramatica_gerada(comandos: int) -> tuple[Gramatica, list[tuple[str, str]]]:
+    """Gramática LL(1) com `comandos` palavras-chave e uma entrada que a usa.
+
+    programa ::= comando programa | ε
+    comando  ::= kw_i lista_i ;               (para cada i)
+    lista_i  ::= id resto_i
+    resto_i  ::= , id resto_i | ε
+    """
+    programa, comando = NaoTerminal("programa"), NaoTerminal("comando")
+    ident, virgula, fim = Terminal("id"), Terminal(","), Terminal(";")
+    producoes = [
+        Producao(programa, (comando, programa), 0),
+        Producao(programa, (), 1),
+    ]
+    tokens: list[tuple[str, str]] = []
+
+    for i in range(comandos):
+        palavra = Terminal(f"kw{i}")
+        lista, resto = NaoTerminal(f"lista{i}"), NaoTerminal(f"resto{i}")
+        for cabeca, corpo in (
+            (comando, (palavra, lista, fim)),
+            (lista, (ident, resto)),
+            (resto, (virgula, ident, resto)),
+            (resto, ()),
+        ):
+            producoes.append(Producao(cabeca, corpo, len(producoes)))
+        tokens += [(f"kw{i}", f"kw{i}"), ("x", "id"), (",", ","), ("y", "id")]
+        tokens.append((";", ";"))
+
+    terminais = {s for p in producoes for s in p.corpo if isinstance(s, Terminal)}
+    nao_terminais = {p.cabeca for p in producoes}
+    return Gramatica(producoes, terminais, nao_terminais, programa), tokens * 20
+
+
+def gramatica_arquivo(arquivo: str) -> tuple[Gramatica, list[tuple[str, str]]]:
+    from src.analisador_sintatico import AnalisadorSintatico
+
+    analisador = AnalisadorSintatico()
+    analisador.ler_gramatica(arquivo)
+    return analisador.gramatica, []
+
+
+def tamanho_dicionario(tabela: dict) -> int:
+    """Memória do dicionário e das tuplas-chave (os símbolos são compartilhados)."""
+    return sys.getsizeof(tabela) + sum(sys.getsizeof(chave) for chave in tabela)
+
+
+def medir_consultas(consulta, chaves: list) -> float:
+    """Tempo médio por consulta, em nanossegundos."""
+    inicio = time.perf_counter_ns()
+    for _ in range(REPETICOES):
+        for chave in chaves:
+            consulta(chave)
+    return (time.perf_counter_ns() - inicio) / (REPETICOES * len(chaves))
+
+
+def medir_parse(parser, tokens: list[tuple[str, str]]) -> float:
+    """Tempo médio de parse, em ms (após um parse inicial, que prepara a tabela)."""
+    parser.parsear(tokens)
+    inicio = time.perf_counter()
+    for _ in range(REPETICOES):
+        if not parser.parsear(tokens):
+            raise ValueError("Entrada do benchmark rejeitada")
+    return (time.perf_counter() - inicio) / REPETICOES * 1000
+
+
+def comparar(nome: str, gramatica: Gramatica, tokens: list[tuple[str, str]]) -> None:
+    handler = HandlerGramatica(gramatica)
+    with contextlib.redirect_stdout(io.StringIO()):
+        tabela = AnalisadorLL1(gramatica, handler).construir_tabela()
+    compilada = tabela.compilar(gramatica)
+    inicio = time.perf_counter()
+    comprimida = TabelaLL1Comprimida.de_compilada(compilada, chave_gramatica(gramatica))
+    t_compressao = (time.perf_counter() - inicio) * 1000
+
+    largura = compilada.num_terminais
+    simbolos = gramatica.simbolos
+    pares = [
+        (simbolos.ids_nao_terminais[nt], simbolos.ids_terminais[t])
+        for nt, t in tabela.tabela
+    ]
+    for (n, t), producao in zip(pares, tabela.tabela.values()):
+        if compilada.producoes[comprimida.consultar(n, t)] != producao:
+            raise ValueError(f"Tabela comprimida difere em ({n}, {t})")
+
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, "tabela.ll1")
+        comprimida.salvar(caminho)
+        tamanho_arquivo = os.path.getsize(caminho)
+        carregada = TabelaLL1Comprimida.carregar(caminho, comprimida.chave)
+        if any(carregada.consultar(n, t) != comprimida.consultar(n, t) for n, t in pares):
+            raise ValueError("Tabela carregada difere da gravada")
+        del carregada
+
+    chaves = list(tabela.tabela)
+    acoes = compilada.acoes
+    t_dict = medir_consultas(tabela.tabela.__getitem__, chaves)
+    t_densa = medir_consultas(lambda par: acoes[par[0] * largura + par[1]], pares)
+    t_comprimida = medir_consultas(lambda par: comprimida.consultar(*par), pares)
+
+    b_dict = tamanho_dicionario(tabela.tabela)
+    b_densa = acoes.itemsize * len(acoes)
+    b_comprimida = comprimida.tamanho_bytes()
+
+    print(f"\n=== {nome} ===\n")
+    print(
+        f"{len(gramatica.producoes)} produções, {len(compilada.terminais)} terminais, "
+        f"{len(acoes) // max(largura, 1)} não-terminais, {len(chaves)} entradas"
+    )
+    print(f"{'representação':<14} {'bytes':>10} {'razão':>7} {'ns/consulta':>12}")
+    for rotulo, tamanho, tempo in (
+        ("dicionário", b_dict, t_dict),
+        ("densa", b_densa, t_densa),
+        ("comprimida", b_comprimida, t_comprimida),
+    ):
+        print(f"{rotulo:<14} {tamanho:>10} {b_dict / tamanho:>6.1f}x {tempo:>12.1f}")
+    print(
+        f"compressão: {t_compressao:.2f} ms; "
+        f"arquivo da tabela comprimida: {tamanho_arquivo} bytes"
+    )
+
+    if tokens:
+        t_parse_densa = medir_parse(ParserLL1(tabela, gramatica), tokens)
+        t_parse_comprimida = medir_parse(
+            ParserLL1(tabela, gramatica, comprimida=True), tokens
+        )
+        with tempfile.TemporaryDirectory() as pasta:
+            caminho = os.path.join(pasta, "parser_gerado.py")
+            salvar_parser(tabela, gramatica, caminho)
+            gerado = carregar_parser(caminho, chave_gramatica(gramatica))
+        t_parse_gerado = medir_parse(gerado.ParserDescendente(), tokens)
+        print(
+            f"parse de {len(tokens)} tokens: densa {t_parse_densa:.2f} ms, "
+            f"comprimida {t_parse_comprimida:.2f} ms, "
+            f"descendente gerado {t_parse_gerado:.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    arquivos = sys.argv[1:] or [
+        os.path.join(PASTA_GRAMATICAS, f) for f in sorted(os.listdir(PASTA_GRAMATICAS))
+    ]
+    for arquivo in arquivos:
+        with contextlib.redirect_stdout(io.StringIO()):
+            gramatica, tokens = gramatica_arquivo(arquivo)
+        comparar(arquivo, gramatica, tokens)
+
+    gramatica, tokens = gramatica_gerada(COMANDOS_GERADOS)
+    comparar(f"gerada ({COMANDOS_GERADOS} comandos)", gramatica, tokens)
@@ -1,9 +1,30 @@
+import os
 import re
-import time
+import threading
+from dataclasses import dataclass
+from typing import Iterator
+
+from src.artefato_lexico import ArtefatoLexico, chave_cache
+from src.automatos import Automato, Estado, HandlerAutomatos, LimiteEstadosExcedido
+from src.conversorDerivadas import AFDPreguicosoDerivadas, ConversorDerivadas_AFD
+from src.conversorER import AFDPreguicoso, ConversorER_AFD
+from src.expressaoregular import ExpressaoRegular, NodoER
+from src.intervalos import AlfabetoIntervalos, intervalos_simbolo, normalizar
+from src.perfil import Perfilador
+from src.scanner_bytes import ScannerBytes, registrar_falhas
+from src.token_stream import TokenStream, formatar_token
+
+
+@dataclass
+class DefinicaoCompilada:
+    """AFD mínimo (já renomeado) de uma definição, guardado entre gerações.
+
+    `intervalos_folhas` são os intervalos das folhas da expressão, necessários
+    para recalcular o alfabeto compartilhado sem reprocessar a expressão.
+    """
 
-from src.automatos import Automato, Estado, HandlerAutomatos
-from src.conversorER import ConversorER_AFD
-from src.expressaoregular import ExpressaoRegular
+    afd: Automato
+    intervalos_folhas: list[list[tuple[int, int]]]
 
 
 class AnalisadorLexico:
@@ -22,17 +43,40 @@ class AnalisadorLexico:
         definições regulares e estruturas para o autômato unificado.
         """
         self.conversor: ConversorER_AFD = ConversorER_AFD()
+        self.conversores: dict[str, ConversorER_AFD | ConversorDerivadas_AFD] = {
+            "followpos": self.conversor,
+            "derivadas": ConversorDerivadas_AFD(),
+        }
         self.handler_automatos: HandlerAutomatos = HandlerAutomatos()
         self.definicoes: dict[str, str] = {}
+        self.macros: dict[str, str] = {}
+        self.arvores_macros: dict[str, NodoER] = {}
+        self.definicoes_compiladas: dict[tuple[str, str, str], DefinicaoCompilada] = {}
+        self.macros_compiladas: dict[str, str] = {}
         self.automato_unificado: Automato | None = None
+        self.alfabeto: AlfabetoIntervalos | None = None
         self.mapa_estados_padroes: dict[Estado, str] = {}
         self.entrada_texto: list[str] = []
         self.arquivo_tokens: str | None = None
-        self.ultima_lista_tokens: list[tuple[str, str]] = []
+        self.ultima_lista_tokens: list[tuple[str, str]] | TokenStream = []
+        self.perfil: Perfilador = Perfilador()
+        # orçamento de estados por AFD; definições que o excedem são simuladas
+        # por um AFD construído sob demanda (`definicoes_preguicosas`)
+        self.limite_estados: int = 10_000
+        self.definicoes_preguicosas: dict[str, AFDPreguicoso | AFDPreguicosoDerivadas] = {}
+        self.prioridades: dict[str, int] = {}
+        # memoriza configurações sem saída em `analisar` (tempo linear garantido)
+        self.maximal_munch_linear: bool = True
+        # estados com laço dominante → padrão que consome a sequência do laço
+        self.lacos: dict[Estado, re.Pattern[str]] = {}
 
     def ler_grupos(self, expressao: str) -> str:
         """
         Lê expresoes que foram entradas no formato de grupos, como [a-z], [A-Z], [a-zA-Z], [0-9]
+
+        Grupos negados ([^...]), com caracteres não ASCII ou com categorias
+        Unicode (\\p{L}) são mantidos, pois são tratados como intervalos por
+        `ExpressaoRegular`.
         """
         resultado: str = expressao
         padrao = r"\[([^\]]+)\]"
@@ -54,6 +98,9 @@ class AnalisadorLexico:
             ValueError: Se o grupo estiver vazio ou for inválido.
         """
         conteudo = match.group(1)
+        if conteudo.startswith("^") or "\\p" in conteudo or not conteudo.isascii():
+            return match.group(0)
+
         caracteres = self.processar_grupos(conteudo)
 
         if not caracteres:
@@ -174,6 +221,11 @@ class AnalisadorLexico:
         Formato esperado: nome:expressao_regular
         Linhas começando com # são tratadas como comentários.
 
+        Definições auxiliares (macros) usam o nome entre chaves, como
+        `{digito}: [0-9]`, e não geram tokens. Cada macro é compilada uma única
+        vez em uma subárvore, copiada onde for referenciada por `{digito}` em
+        definições posteriores.
+
         Args:
             arquivo: Caminho do arquivo de definições.
 
@@ -213,10 +265,85 @@ class AnalisadorLexico:
 
                 er = self.ler_grupos(er)
 
+                if len(nome) > 2 and nome.startswith("{") and nome.endswith("}"):
+                    self.adicionar_macro(nome[1:-1], er)
+                    continue
+
                 self.definicoes[nome] = er
                 print(f"Nova definição: {nome} = {er}")
 
-    def gerar_analisador(self):
+    def recarregar_definicoes(self, arquivo: str):
+        """Relê o arquivo de definições do zero.
+
+        Os AFDs das definições já compiladas são mantidos, então a próxima
+        chamada de `gerar_analisador` só compila as definições novas ou
+        alteradas.
+
+        Args:
+            arquivo: Caminho do arquivo de definições.
+
+        Raises:
+            ValueError: Se encontrar linha com formato inválido.
+        """
+        self.definicoes = {}
+        self.macros = {}
+        self.arvores_macros = {}
+        self.ler_definicoes(arquivo)
+
+    def observar_definicoes(
+        self, arquivo: str, motor: str = "followpos", intervalo: float = 1.0
+    ) -> threading.Event:
+        """Regera o analisador sempre que o arquivo de definições for modificado.
+
+        Verifica a data de modificação do arquivo a cada `intervalo` segundos em
+        uma thread separada. Se a nova versão tiver erro, ele é exibido e o
+        analisador anterior continua em uso.
+
+        Args:
+            arquivo: Caminho do arquivo de definições.
+            motor: Motor de conversão repassado a `gerar_analisador`.
+            intervalo: Segundos entre verificações.
+
+        Returns:
+            Evento que encerra a observação quando sinalizado (`set()`).
+        """
+        parar = threading.Event()
+
+        def observar():
+            modificado = os.stat(arquivo).st_mtime_ns
+            while not parar.wait(intervalo):
+                try:
+                    atual = os.stat(arquivo).st_mtime_ns
+                    if atual == modificado:
+                        continue
+                    modificado = atual
+                    self.recarregar_definicoes(arquivo)
+                    self.gerar_analisador(motor)
+                    print(f"Analisador regerado a partir de '{arquivo}'")
+                except (OSError, ValueError) as e:
+                    print(f"Erro ao regerar o analisador: {e}")
+
+        threading.Thread(target=observar, daemon=True).start()
+        return parar
+
+    def adicionar_macro(self, nome: str, expressao: str):
+        """Compila uma definição auxiliar, referenciável como `{nome}`.
+
+        Args:
+            nome: Nome da macro, sem as chaves.
+            expressao: Expressão regular (pode referenciar macros anteriores).
+
+        Raises:
+            ValueError: Se a expressão for inválida.
+        """
+        arvore = ExpressaoRegular(expressao, macros=self.arvores_macros).subarvore()
+        self.macros[nome] = expressao
+        self.arvores_macros[nome] = arvore
+        print(f"Nova macro: {{{nome}}} = {expressao}")
+
+    def gerar_analisador(
+        self, motor: str = "followpos", diretorio_cache: str | None = None
+    ):
         """Gera autômato unificado a partir das definições regulares.
 
         Processo:
@@ -226,56 +353,234 @@ class AnalisadorLexico:
         4. Determiniza o autômato unificado
         5. Mapeia estados finais aos seus padrões/tokens
 
+        Com `diretorio_cache`, o resultado é salvo como artefato compilado cujo
+        nome é a chave das definições (conteúdo, motor e versão do gerador).
+        Se o artefato já existir, ele é carregado e nada é recompilado; se as
+        definições mudarem, a chave muda e o analisador é gerado novamente.
+
+        O tempo e os tamanhos de cada fase, por definição, ficam em `self.perfil`.
+
+        Args:
+            motor: Conversor de ER para AFD usado no passo 1: "followpos"
+                (construção direta) ou "derivadas" (derivadas de Brzozowski).
+            diretorio_cache: Diretório dos artefatos compilados (opcional).
+
         Raises:
-            ValueError: Se nenhuma definição foi adicionada ou se ocorrer erro na conversão.
+            ValueError: Se nenhuma definição foi adicionada, se o motor for
+                desconhecido ou se ocorrer erro na conversão.
         """
         if not self.definicoes:
             raise ValueError("Nenhuma definição foi adicionada")
 
-        afds_minimizados: list[Automato] = []
-
+        if motor not in self.conversores:
+            raise ValueError(
+                f"Motor desconhecido: {motor}. Opções: {list(self.conversores)}"
+            )
+        conversor = self.conversores[motor]
+        self.perfil.limpar()
+
+        caminho_cache = None
+        if diretorio_cache is not None:
+            chave = chave_cache(self.macros, self.definicoes, motor)
+            caminho_cache = os.path.join(diretorio_cache, f"{chave}.lex")
+            if os.path.exists(caminho_cache):
+                try:
+                    self.carregar_analisador(caminho_cache, chave)
+                    print(f"Analisador carregado do cache: {caminho_cache}")
+                    return
+                except ValueError as e:
+                    print(f"Cache ignorado ({e}), gerando novamente")
+
+        # Definições já compiladas (mesma expressão e motor) são reaproveitadas;
+        # mudar uma macro pode alterar qualquer definição, então invalida todas.
+        if self.macros != self.macros_compiladas:
+            self.definicoes_compiladas.clear()
+            self.macros_compiladas = dict(self.macros)
+
+        # As árvores de todas as definições definem uma única partição dos
+        # caracteres em intervalos, compartilhada por todos os AFDs.
+        compiladas: dict[str, DefinicaoCompilada] = {}
+        expressoes: dict[str, ExpressaoRegular] = {}
+        preguicosos: dict[str, AFDPreguicoso | AFDPreguicosoDerivadas] = {}
+        folhas: dict[str, list[list[tuple[int, int]]]] = {}
+        intervalos_folhas: list[list[tuple[int, int]]] = []
         for nome, expressao in self.definicoes.items():
-            print(f"usando a definição de {nome}: {expressao}")
+            compilada = self.definicoes_compiladas.get((nome, expressao, motor))
+            if compilada is not None:
+                compiladas[nome] = compilada
+                intervalos_folhas.extend(compilada.intervalos_folhas)
+                continue
+
+            try:
+                with self.perfil.fase("parse", nome):
+                    er = ExpressaoRegular(expressao, macros=self.arvores_macros)
+                    folhas[nome] = er.intervalos_folhas(er.arvore())
+                    intervalos_folhas.extend(folhas[nome])
+            except Exception as e:
+                print(f"Erro ao ler a definição {nome}: {e}")
+                raise
+            expressoes[nome] = er
+
+        with self.perfil.fase("alfabeto") as medicao:
+            self.alfabeto = AlfabetoIntervalos(intervalos_folhas)
+            medicao.extras["atomos"] = len(self.alfabeto.atomos)
+
+        # AFDs reaproveitados só precisam ser traduzidos se a partição mudou
+        for nome, compilada in compiladas.items():
+            with self.perfil.fase("alfabeto", nome):
+                compilada.afd = self.handler_automatos.trocar_alfabeto(
+                    compilada.afd, self.alfabeto
+                )
+        if compiladas:
+            print(f"Definições reaproveitadas: {list(compiladas)}")
+
+        for nome, er in expressoes.items():
+            print(f"usando a definição de {nome}: {self.definicoes[nome]}")
+            er.alfabeto = self.alfabeto
 
             try:
-                t0 = time.time()
-                er = ExpressaoRegular(expressao)
-                t1 = time.time()
-                print(f"1/4 Parse: {t1 - t0}")
-                t0 = time.time()
-                afd = self.conversor.gerar_afd(er)
-                t1 = time.time()
-                print(f"2/4 Gerar AFD: {t1 - t0}")
-
-                t0 = time.time()
-                afd = self.handler_automatos.minimizar(afd)
-                t1 = time.time()
-                print(f"3/4 Minimizar: {t1 - t0}")
-
-                t0 = time.time()
-                afd_renomeado = self.renomear_estados_afd(afd, f"{nome}_")
-                t1 = time.time()
-                print(f"4/4 Renomear: {t1 - t0}")
-
-                for estado in afd_renomeado.estados_finais:
-                    self.mapa_estados_padroes[estado] = nome
-
-                afds_minimizados.append(afd_renomeado)
+                if isinstance(conversor, ConversorER_AFD):
+                    with self.perfil.fase("followpos", nome) as medicao:
+                        er.processar()
+                        medicao.posicoes = len(er.folhas)
+
+                with self.perfil.fase("estimativa", nome) as medicao:
+                    estimativa = conversor.estimar_estados(er)
+                    medicao.estados_depois = estimativa
+                if estimativa > self.limite_estados:
+                    print(
+                        f"[AVISO] Definição '{nome}' pode gerar ~{estimativa} estados "
+                        f"(limite: {self.limite_estados})"
+                    )
+
+                with self.perfil.fase("afd", nome) as medicao:
+                    afd = conversor.gerar_afd(er, self.limite_estados)
+                    medicao.estados_depois = len(afd.estados)
+                    medicao.transicoes_depois = len(afd.transicoes)
+
+                with self.perfil.fase("minimizar", nome) as medicao:
+                    medicao.estados_antes = len(afd.estados)
+                    medicao.transicoes_antes = len(afd.transicoes)
+                    afd = self.handler_automatos.minimizar(afd)
+                    medicao.estados_depois = len(afd.estados)
+                    medicao.transicoes_depois = len(afd.transicoes)
+
+                with self.perfil.fase("renomear", nome):
+                    afd_renomeado = self.renomear_estados_afd(afd, f"{nome}_")
+            except LimiteEstadosExcedido as e:
+                print(
+                    f"[AVISO] Definição '{nome}': {e}. "
+                    "Usando AFD construído sob demanda para esse token."
+                )
+                preguicosos[nome] = conversor.afd_preguicoso(er)
+                continue
             except Exception as e:
                 print(f"Erro ao gerar AFD para {nome}: {e}")
                 raise
 
+            compiladas[nome] = DefinicaoCompilada(afd_renomeado, folhas[nome])
+
+        # descarta definições removidas ou alteradas
+        self.definicoes_compiladas = {
+            (nome, expressao, motor): compiladas[nome]
+            for nome, expressao in self.definicoes.items()
+            if nome in compiladas
+        }
+
+        # a ordem das definições (prioridade) só importa daqui em diante
+        self.prioridades = {nome: i for i, nome in enumerate(self.definicoes)}
+        self.definicoes_preguicosas = {
+            nome: preguicosos[nome] for nome in self.definicoes if nome in preguicosos
+        }
+        afds_minimizados: list[Automato] = []
+        self.mapa_estados_padroes = {}
+        for nome in self.definicoes:
+            if nome not in compiladas:
+                continue
+            afd = compiladas[nome].afd
+            for estado in afd.estados_finais:
+                self.mapa_estados_padroes[estado] = nome
+            afds_minimizados.append(afd)
+
         # Unindo os AFDs
-        automato_unido = afds_minimizados[0]
-        for afd in afds_minimizados[1:]:
-            automato_unido = self.handler_automatos.uniao(automato_unido, afd)
+        with self.perfil.fase("uniao") as medicao:
+            if afds_minimizados:
+                automato_unido = afds_minimizados[0]
+            else:
+                q0 = Estado("q0")
+                automato_unido = Automato(
+                    {q0}, set(), {}, q0, set(), alfabeto=self.alfabeto
+                )
+            for afd in afds_minimizados[1:]:
+                automato_unido = self.handler_automatos.uniao(automato_unido, afd)
+            medicao.estados_depois = len(automato_unido.estados)
+            medicao.transicoes_depois = len(automato_unido.transicoes)
+
+        with self.perfil.fase("determinizar") as medicao:
+            medicao.estados_antes = len(automato_unido.estados)
+            medicao.transicoes_antes = len(automato_unido.transicoes)
+            try:
+                automato_unido, mapeamento = (
+                    self.handler_automatos.determinizar_com_mapeamento(
+                        automato_unido, self.limite_estados
+                    )
+                )
+            except LimiteEstadosExcedido as e:
+                raise LimiteEstadosExcedido(e.limite, "união das definições") from e
+            medicao.estados_depois = len(automato_unido.estados)
+            medicao.transicoes_depois = len(automato_unido.transicoes)
 
-        automato_unido, mapeamento = self.handler_automatos.determinizar_com_mapeamento(
-            automato_unido
-        )
-        self.atualizar_mapeamento(mapeamento)
+        with self.perfil.fase("mapeamento"):
+            self.atualizar_mapeamento(mapeamento)
 
         self.automato_unificado = automato_unido
+        self.preparar_lacos()
+
+        print("Tempo por fase:")
+        self.perfil.imprimir_resumo()
+
+        if caminho_cache is not None and self.definicoes_preguicosas:
+            print("Analisador com AFDs sob demanda não é salvo no cache")
+        elif caminho_cache is not None:
+            os.makedirs(os.path.dirname(caminho_cache) or ".", exist_ok=True)
+            self.salvar_analisador(caminho_cache, chave)
+            print(f"Analisador salvo no cache: {caminho_cache}")
+
+    def salvar_analisador(self, caminho: str, chave: str = ""):
+        """Salva o autômato unificado e o mapa de padrões como artefato compilado.
+
+        Args:
+            caminho: Arquivo de destino.
+            chave: Chave das definições (ver `chave_cache`).
+
+        Raises:
+            ValueError: Se o analisador ainda não foi gerado.
+        """
+        if self.automato_unificado is None:
+            raise ValueError("Automato unificado não foi gerado")
+
+        artefato = ArtefatoLexico.de_automato(
+            self.automato_unificado, self.mapa_estados_padroes, chave
+        )
+        artefato.salvar(caminho)
+
+    def carregar_analisador(self, caminho: str, chave: str | None = None):
+        """Carrega um analisador salvo por `salvar_analisador`.
+
+        Args:
+            caminho: Arquivo do artefato.
+            chave: Se informada, rejeita artefatos gerados com outra chave.
+
+        Raises:
+            ValueError: Se o artefato for inválido ou estiver desatualizado.
+        """
+        artefato = ArtefatoLexico.carregar(caminho, chave)
+        automato, mapa = artefato.para_automato()
+        self.automato_unificado = automato
+        self.preparar_lacos()
+        self.alfabeto = automato.alfabeto
+        self.mapa_estados_padroes = mapa
+        self.definicoes_preguicosas = {}
 
     def renomear_estados_afd(self, afd: Automato, prefixo: str) -> Automato:
         """Renomeia todos os estados de um AFD adicionando um prefixo.
@@ -309,8 +614,62 @@ class AnalisadorLexico:
             transicoes=novas_transicoes,
             estado_inicial=mapeamento[afd.estado_inicial],
             estados_finais={mapeamento[e] for e in afd.estados_finais},
+            alfabeto=afd.alfabeto,
         )
 
+    def preparar_lacos(self):
+        """Compila, para cada estado dominado por um laço, um padrão `re` do laço.
+
+        Estados como o de `id` depois do primeiro caractere, sequências de
+        dígitos ou de espaços voltam para si mesmos na maioria dos caracteres.
+        Em `tokenizar`, ao entrar em um desses estados, a sequência inteira é
+        consumida por um único `match` do padrão `[classe]*`, em C, em vez de
+        um caractere por vez. Um laço é dominante quando cobre pelo menos
+        metade dos caracteres com transição a partir do estado.
+        """
+        self.lacos = {}
+        if self.automato_unificado is None:
+            return
+
+        for estado, saidas in self.automato_unificado.transicoes_por_estado().items():
+            laco: list[tuple[int, int]] = []
+            total = 0
+            for simbolo, destinos in saidas:
+                inicio, fim = intervalos_simbolo(simbolo)
+                total += fim - inicio + 1
+                if destinos == {estado}:
+                    laco.append((inicio, fim))
+            cobertos = sum(fim - inicio + 1 for inicio, fim in laco)
+            if not laco or 2 * cobertos < total:
+                continue
+
+            classe = "".join(
+                re.escape(chr(inicio))
+                if inicio == fim
+                else f"{re.escape(chr(inicio))}-{re.escape(chr(fim))}"
+                for inicio, fim in normalizar(laco)
+            )
+            self.lacos[estado] = re.compile(f"[{classe}]*")
+
+    def criar_scanner_bytes(self) -> ScannerBytes:
+        """Cria um scanner sobre bytes (ex.: arquivo mapeado em memória).
+
+        Returns:
+            Scanner que produz tokens `(tipo, inicio, fim)` sem criar strings.
+
+        Raises:
+            ValueError: Se o analisador não foi gerado, se alguma definição
+                usa caracteres não ASCII ou é simulada por AFD sob demanda.
+        """
+        if self.automato_unificado is None:
+            raise ValueError("Automato unificado não foi gerado")
+        if self.definicoes_preguicosas:
+            raise ValueError(
+                "Definições com AFD sob demanda não podem usar o scanner de bytes: "
+                f"{list(self.definicoes_preguicosas)}"
+            )
+        return ScannerBytes(self.automato_unificado, self.mapa_estados_padroes)
+
     def analisar(self) -> list[tuple[str, str]]:
         """Realiza análise léxica de um arquivo fonte.
 
@@ -327,13 +686,16 @@ class AnalisadorLexico:
             if not linha or linha.lstrip().startswith("#"):
                 continue
 
+            falhas: set[tuple[Estado, int]] | None = (
+                set() if self.maximal_munch_linear else None
+            )
             coluna = 0
             while coluna < len(linha):
                 if linha[coluna].isspace():
                     coluna += 1
                     continue
 
-                token, consumido = self.tokenizar(linha, coluna)
+                token, consumido = self.tokenizar(linha, coluna, falhas)
                 tokens.append(token)
                 print(f"<{token[0]}, {token[1]}>")
 
@@ -350,14 +712,99 @@ class AnalisadorLexico:
         self.ultima_lista_tokens = tokens
         return tokens
 
-    def tokenizar(self, texto: str, inicio: int = 0) -> tuple[tuple[str, str], int]:
+    def analisar_stream(self) -> TokenStream:
+        """Realiza a análise léxica produzindo um `TokenStream` compacto.
+
+        Mesmas regras de `analisar` (espaços, comentários e parada no primeiro
+        erro), mas sem imprimir os tokens e guardando-os em colunas de inteiros
+        com os offsets no texto de entrada, em vez de uma tupla por token.
+
+        Returns:
+            Fluxo de tokens; o último tem tipo "erro!" se houve erro léxico.
+        """
+        fluxo = TokenStream(
+            "\n".join(linha.rstrip("\n") for linha in self.entrada_texto)
+        )
+        self.ultima_lista_tokens = fluxo
+        for _ in self.iterar_tokens(fluxo):
+            pass
+        return fluxo
+
+    def iterar_tokens(
+        self, fluxo: TokenStream | None = None
+    ) -> Iterator[tuple[str, str]]:
+        """Gera os tokens da entrada sob demanda, um por vez.
+
+        Mesmas regras de `analisar_stream`, mas cada token só é reconhecido
+        quando pedido: consumida por `ParserLL1.parsear`, a análise léxica
+        avança junto com a sintática e para no primeiro erro de sintaxe.
+
+        Args:
+            fluxo: Se informado, cada token é também registrado nele (com o
+                offset no texto), o que permite ao parser informar linha e
+                coluna nos erros. O texto do fluxo deve ser o da entrada.
+
+        Yields:
+            Tuplas (lexema, padrão); a última tem padrão "erro!" se houve
+            erro léxico.
+        """
+        inicio_linha = 0
+        for num_linha, linha in enumerate(self.entrada_texto, 1):
+            linha = linha.rstrip("\n")
+            offset = inicio_linha
+            inicio_linha += len(linha) + 1
+
+            if not linha or linha.lstrip().startswith("#"):
+                continue
+
+            falhas: set[tuple[Estado, int]] | None = (
+                set() if self.maximal_munch_linear else None
+            )
+            coluna = 0
+            while coluna < len(linha):
+                if linha[coluna].isspace():
+                    coluna += 1
+                    continue
+
+                (lexema, tipo), consumido = self.tokenizar(linha, coluna, falhas)
+                if fluxo is not None:
+                    fluxo.adicionar(tipo, offset + coluna, len(lexema), lexema)
+
+                if tipo == "erro!":
+                    print(
+                        f"Erro léxico na linha {num_linha}, coluna {coluna + 1}: "
+                        f"'{linha[coluna:]}'"
+                    )
+                    yield lexema, tipo
+                    return
+
+                yield lexema, tipo
+                coluna += consumido
+
+    def tokenizar(
+        self,
+        texto: str,
+        inicio: int = 0,
+        falhas: set[tuple[Estado, int]] | None = None,
+    ) -> tuple[tuple[str, str], int]:
         """Tokeniza um prefixo de texto usando o autômato unificado.
 
         Implementa longest match: consome o maior prefixo válido a partir de `inicio`.
 
+        Sem memória entre chamadas, cada token pode ler o texto até bem depois
+        do seu fim (ex.: padrões `a` e `a*b` sobre "aaaa...": cada `a` lê até o
+        fim da linha), o que torna a análise quadrática. Com `falhas`, as
+        configurações (estado, posição) das quais nenhum estado final foi
+        alcançado são memorizadas e a leitura para ao reencontrá-las, o que
+        mantém a análise de um texto inteiro linear.
+
+        Referência: Reps (1998), "Maximal-munch" tokenization in linear time.
+
         Args:
             texto: String a ser tokenizada.
             inicio: Posição inicial da leitura.
+            falhas: Configurações sem saída já encontradas neste mesmo `texto`,
+                atualizado pela chamada (opcional).
 
         Returns:
             Um par `((lexema, padrão), consumido)`.
@@ -370,19 +817,29 @@ class AnalisadorLexico:
             return ("", "erro!"), 0
 
         estado_atual = self.automato_unificado.estado_inicial
+        simbolo_de = self.automato_unificado.simbolo_de
+        lacos = self.lacos
 
         ultimo_estado_final = None
         ultima_posicao_valida = -1
+        # configurações lidas desde o último estado final
+        sem_final: list[tuple[Estado, int]] = []
+        # trechos consumidos pelo laço de um estado não final (ver registrar_falhas)
+        corridas: list[tuple[Estado, int, int]] = []
 
         i = inicio
         while i < len(texto):
-            simbolo = texto[i]
+            if falhas is not None:
+                if (estado_atual, i) in falhas:
+                    break
+                sem_final.append((estado_atual, i))
 
-            if simbolo.isspace():
-                break
+            simbolo = texto[i]
 
+            # caractere -> intervalo que o contém (busca binária); espaços só
+            # fazem parte do lexema se algum padrão os aceitar (ex.: strings)
             proximo = self.automato_unificado.transicoes.get(
-                (estado_atual, simbolo), set()
+                (estado_atual, simbolo_de(simbolo)), set()
             )
 
             if not proximo:
@@ -394,13 +851,49 @@ class AnalisadorLexico:
             if estado_atual in self.automato_unificado.estados_finais:
                 ultimo_estado_final = estado_atual
                 ultima_posicao_valida = i
+                sem_final.clear()
+                corridas.clear()
 
             i += 1
 
+            # consome de uma vez a sequência que mantém o estado no laço
+            laco = lacos.get(estado_atual)
+            if laco is not None:
+                if falhas is not None and (estado_atual, i) in falhas:
+                    break
+                fim_laco = laco.match(texto, i).end()
+                if fim_laco > i:
+                    if estado_atual in self.automato_unificado.estados_finais:
+                        ultima_posicao_valida = fim_laco - 1
+                    elif falhas is not None:
+                        corridas.append((estado_atual, i, fim_laco))
+                    i = fim_laco
+
+        if falhas is not None:
+            registrar_falhas(falhas, sem_final, corridas)
+
+        padrao = None
+        fim = -1
         if ultimo_estado_final is not None:
             fim = ultima_posicao_valida + 1
-            lexema = texto[inicio:fim]
             padrao = self.mapa_estados_padroes.get(ultimo_estado_final, "desconhecido")
+
+        # definições fora do autômato unificado disputam o maior lexema; em
+        # empate vence a definida primeiro
+        for nome, afd_preguicoso in self.definicoes_preguicosas.items():
+            comprimento = afd_preguicoso.maior_prefixo(texto, inicio)
+            if comprimento <= 0:
+                continue
+            fim_preguicoso = inicio + comprimento
+            if fim_preguicoso > fim or (
+                fim_preguicoso == fim
+                and self.prioridades.get(nome, 0)
+                < self.prioridades.get(padrao, len(self.prioridades))
+            ):
+                fim, padrao = fim_preguicoso, nome
+
+        if padrao is not None:
+            lexema = texto[inicio:fim]
             return (lexema, padrao), max(fim - inicio, 1)
 
         fim = inicio + 1
@@ -451,19 +944,25 @@ class AnalisadorLexico:
 
         self.mapa_estados_padroes = novo_mapa
 
-    def salvar_tokens(self, tokens: list[tuple[str, str]], arquivo_saida: str):
+    def salvar_tokens(
+        self, tokens: list[tuple[str, str]] | TokenStream, arquivo_saida: str
+    ):
         """Salva lista de tokens em arquivo.
 
         Formato de saída: uma linha por token
         <lexema, tipo>
+        ou, se os tokens têm posição de origem (`TokenStream`),
+        <lexema, tipo> @linha:coluna
 
         Args:
-            tokens: Lista de tuplas (lexema, tipo)
+            tokens: Lista de tuplas (lexema, tipo) ou fluxo de tokens
             arquivo_saida: Caminho do arquivo de saída
         """
-        with open(arquivo_saida, "w") as f:
-            for lexema, tipo in tokens:
-                f.write(f"<{lexema}, {tipo}>\n")
+        posicoes = isinstance(tokens, TokenStream) and tokens.com_posicoes
+        with open(arquivo_saida, "w", encoding="utf-8") as f:
+            for i, (lexema, tipo) in enumerate(tokens):
+                posicao = tokens.posicao(i) if posicoes else None
+                f.write(formatar_token(lexema, tipo, posicao) + "\n")
 
         print(f"Tokens salvos em '{arquivo_saida}'")
 
@@ -1,4 +1,4 @@
-from typing import List, Set
+from typing import Iterable, Iterator, List, Set
 
 from src.expressaoregular import MAPA_OPERADORES, OPERADORES_UNITARIOS
 from src.gramaticas import (
@@ -12,8 +12,10 @@ from src.gramaticas import (
 )
 from src.ll.analisador_ll1 import AnalisadorLL1
 from src.ll.parser_ll1 import ParserLL1
+from src.perfil import Perfilador
 from src.tabela_simbolos import CategoriaLexica, Escopo
 from src.sdd import SDD
+from src.token_stream import PADRAO_POSICAO, TokenStream
 
 
 class AnalisadorSintatico:
@@ -32,6 +34,7 @@ class AnalisadorSintatico:
         self.codigo_intermediario: str = ""
         self.sdd: SDD | None = None
         self.erros_semanticos: list[str] = []
+        self.perfil: Perfilador = Perfilador()
 
     def ler_gramatica(self, arquivo: str):
         """Lê gramática livre de contexto de um arquivo.
@@ -55,7 +58,8 @@ class AnalisadorSintatico:
         simbolo_inicial: NaoTerminal | None = None
         numero_producao = 0
 
-        with open(arquivo, "r") as f:
+        self.perfil.limpar()
+        with self.perfil.fase("gramatica", arquivo) as medicao, open(arquivo, "r") as f:
             for num_linha, linha in enumerate(f, 1):
                 linha = linha.strip()
 
@@ -112,6 +116,8 @@ class AnalisadorSintatico:
 
                 print(f"Produção {producao.numero}: {producao}")
 
+        medicao.extras["producoes"] = len(producoes)
+
         print(f"\nTotal: {len(producoes)} produções carregadas")
         print(f"Símbolo inicial: {simbolo_inicial}")
         print(f"Não-terminais: {sorted([str(nt) for nt in nao_terminais])}")
@@ -125,6 +131,17 @@ class AnalisadorSintatico:
             simbolo_inicial,
         )
 
+        if self.gramatica.nao_alcancaveis():
+            print(
+                "[AVISO] Não-terminais inalcançáveis a partir de "
+                f"{simbolo_inicial}: {self.gramatica.nao_alcancaveis()}"
+            )
+        if self.gramatica.sem_producoes():
+            print(
+                "[AVISO] Não-terminais sem produções: "
+                f"{self.gramatica.sem_producoes()}"
+            )
+
     def _limpar_simbolo(self, simbolo_str: str) -> str:
         """Remove delimitadores < > de um símbolo.
 
@@ -228,7 +245,7 @@ class AnalisadorSintatico:
         if not self.gramatica:
             raise ValueError("Gramática não foi carregada ainda")
 
-        if not self._handler:
+        if not self._handler or self._handler.gramatica is not self.gramatica:
             self._handler = HandlerGramatica(self.gramatica)
 
         return self._handler
@@ -271,13 +288,21 @@ class AnalisadorSintatico:
         Returns:
             Lista de tokens processados e mapeados
         """
+        return list(self._iterar_tokens_processados(tokens))
+
+    def _iterar_tokens_processados(
+        self, tokens: Iterable[tuple[str, str]]
+    ) -> Iterator[tuple[str, str]]:
+        """Versão sob demanda de `_processar_tokens`, para alimentar o parser.
+
+        Os escopos são atualizados à medida que os tokens são consumidos.
+        """
         # Construir mapa automático: lexema → terminal
         mapa_lexema_terminal = {}
         for terminal in self.gramatica.terminais:
             if len(terminal.nome) <= 2 and not terminal.nome.isalnum():
                 mapa_lexema_terminal[terminal.nome] = terminal.nome
 
-        tokens_processados = []
         for lexema, tipo_lexico in tokens:
             if tipo_lexico in CategoriaLexica.categorias_processaveis():
                 _, categoria = self.escopo_atual.tabela.categorizar_token(
@@ -312,14 +337,12 @@ class AnalisadorSintatico:
                             f"Token 'break' fora de loop em escopo {self.escopo_atual.numero}"
                         )
 
-                tokens_processados.append((lexema, tipo_gramatica))
+                yield lexema, tipo_gramatica
             else:
                 if lexema in mapa_lexema_terminal:
-                    tokens_processados.append((lexema, lexema))
+                    yield lexema, lexema
                 else:
-                    tokens_processados.append((lexema, tipo_lexico))
-
-        return tokens_processados
+                    yield lexema, tipo_lexico
 
     def _normalizar_lexema(self, lexema: str) -> str:
         """Normaliza lexema Unicode de volta para ASCII.
@@ -345,22 +368,33 @@ class AnalisadorSintatico:
 
         return mapa_reverso.get(lexema, lexema)
 
-    def _ler_tokens_arquivo(self, arquivo: str) -> list[tuple[str, str]]:
+    def _ler_tokens_arquivo(self, arquivo: str) -> TokenStream:
         """Lê tokens de um arquivo no formato <lexema, tipo>.
 
+        Cada linha pode terminar com a posição de origem do token, no formato
+        <lexema, tipo> @linha:coluna (como grava `salvar_tokens`). As posições
+        só são usadas se todos os tokens as tiverem.
+
         Args:
             arquivo: Caminho do arquivo de tokens
 
         Returns:
-            Lista de tuplas (lexema, tipo)
+            Fluxo de tuplas (lexema, tipo), com posições se disponíveis
         """
         tokens = []
+        posicoes: list[tuple[int, int]] | None = []
         with open(arquivo, "r") as f:
             for linha in f:
                 linha = linha.strip()
                 if not linha or linha.startswith("#"):
                     continue
 
+                posicao = None
+                casamento = PADRAO_POSICAO.fullmatch(linha)
+                if casamento:
+                    linha = casamento.group(1)
+                    posicao = (int(casamento.group(2)), int(casamento.group(3)))
+
                 # Formato esperado: <lexema, tipo>
                 if linha.startswith("<") and linha.endswith(">"):
                     conteudo = linha[1:-1]  # Remove < e >
@@ -371,12 +405,16 @@ class AnalisadorSintatico:
                             # Normalizar lexema para ASCII
                             lexema = self._normalizar_lexema(lexema)
                             tokens.append((lexema, tipo))
+                            if posicao is None:
+                                posicoes = None
+                            elif posicoes is not None:
+                                posicoes.append(posicao)
 
         print(f"Tokens carregados com successo do arquivo [{arquivo}]")
 
-        return tokens
+        return TokenStream.de_tuplas(tokens, posicoes if tokens else None)
 
-    def _aplicar_sdd(self, tokens_brutos: list[tuple[str, str]]):
+    def _aplicar_sdd(self, tokens_brutos: list[tuple[str, str]] | TokenStream):
         """Aplica as regras SDD após a aceitação sintática.
 
         Atualmente o SDD cobre a propagação de tipos em declarações,
@@ -392,25 +430,58 @@ class AnalisadorSintatico:
         self.tabela_simbolos = self.escopo_global.tabela
         self.erros_semanticos = self.sdd.erros
 
-    def analisar_ll1(self, arquivo_tokens: str, completo: bool = False) -> bool:
+    def analisar_ll1(
+        self,
+        arquivo_tokens: str | TokenStream,
+        completo: bool = False,
+        caminho_tabela: str | None = None,
+    ) -> bool:
+        """Analisa os tokens com o parser LL(1) e, se aceitos, aplica o SDD.
+
+        Args:
+            arquivo_tokens: Arquivo de tokens no formato <lexema, tipo>, ou os
+                tokens já produzidos pelo analisador léxico (`TokenStream`).
+            completo: Se True, retorna também handler, analisador e parser.
+            caminho_tabela: Arquivo de cache da tabela LL(1) comprimida. Se
+                informado, o parse usa a tabela comprimida, carregada desse
+                arquivo quando ele é da mesma gramática (ver `ParserLL1`).
+        """
         self.erros_semanticos = []
         self._criar_tabela_simbolos()
 
-        tokens_brutos = self._ler_tokens_arquivo(arquivo_tokens)
-        tokens = self._processar_tokens(tokens_brutos)
+        if isinstance(arquivo_tokens, str):
+            tokens_brutos = self._ler_tokens_arquivo(arquivo_tokens)
+        else:
+            tokens_brutos = arquivo_tokens
 
         handler = self._obter_handler()
-        handler.calcular_firsts()
-        handler.calcular_follows()
+        with self.perfil.fase("first"):
+            handler.calcular_firsts()
+        with self.perfil.fase("follow"):
+            handler.calcular_follows()
 
         if not self.gramatica:
             return False
 
         analisador_ll1 = AnalisadorLL1(self.gramatica, handler)
-        tabela = analisador_ll1.construir_tabela()
-
-        parser = ParserLL1(tabela, self.gramatica)
-        resultado = parser.parsear(tokens)
+        with self.perfil.fase("tabela_ll1") as medicao:
+            tabela = analisador_ll1.construir_tabela()
+            medicao.extras["entradas"] = len(tabela.tabela)
+
+        # Tokens processados sob demanda: um erro de sintaxe interrompe o
+        # processamento (escopos e tabela de símbolos) dos tokens restantes
+        tokens = self._iterar_tokens_processados(tokens_brutos)
+        parser = ParserLL1(
+            tabela,
+            self.gramatica,
+            comprimida=caminho_tabela is not None,
+            caminho_comprimida=caminho_tabela,
+        )
+        alvo = arquivo_tokens if isinstance(arquivo_tokens, str) else "<stream>"
+        fluxo = tokens_brutos if isinstance(tokens_brutos, TokenStream) else None
+        with self.perfil.fase("parse", alvo) as medicao:
+            resultado = parser.parsear(tokens, fluxo)
+            medicao.extras["tokens"] = parser.tokens_lidos
 
         if resultado:
             self._aplicar_sdd(tokens_brutos)
@@ -0,0 +1,221 @@
+import hashlib
+import json
+import mmap
+import os
+from array import array
+from dataclasses import dataclass
+
+from src.automatos import Automato, Estado
+from src.intervalos import AlfabetoIntervalos, Intervalo, intervalos_simbolo
+
+# Incrementar sempre que a geração do analisador mudar de forma que altere o
+# autômato produzido; artefatos de versões anteriores passam a ser ignorados.
+VERSAO_MOTOR = 1
+
+MAGICO = b"LEXAFD01"
+SEM_TRANSICAO = -1
+
+
+def chave_cache(macros: dict[str, str], definicoes: dict[str, str], motor: str) -> str:
+    """Calcula a chave de cache de um conjunto de definições.
+
+    Combina o conteúdo das definições (na ordem, que define a prioridade dos
+    tokens), as macros, o motor de conversão e `VERSAO_MOTOR`.
+
+    Returns:
+        Hash SHA-256 em hexadecimal.
+    """
+    conteudo = json.dumps(
+        {
+            "versao": VERSAO_MOTOR,
+            "motor": motor,
+            "macros": list(macros.items()),
+            "definicoes": list(definicoes.items()),
+        },
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(conteudo.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class ArtefatoLexico:
+    """Forma compacta e persistível do autômato unificado do analisador léxico.
+
+    Os estados são numerados de 0 a `num_estados - 1` (0 é o inicial) e os
+    símbolos de 0 a `len(simbolos) - 1`. A tabela de transições é densa, com
+    uma linha por estado: `tabela[estado * len(simbolos) + simbolo]` é o
+    destino, ou `SEM_TRANSICAO`.
+
+    Formato do arquivo: `MAGICO`, tamanho do cabeçalho (8 bytes, little
+    endian), cabeçalho JSON e, alinhada em 8 bytes, a tabela em inteiros de
+    32 bits. Assim a tabela pode ser mapeada em memória na carga, sem cópia.
+    """
+
+    chave: str
+    num_estados: int
+    simbolos: list[str | Intervalo]
+    finais: dict[int, str]
+    tabela: array | memoryview
+
+    @classmethod
+    def de_automato(
+        cls, automato: Automato, mapa_estados_padroes: dict[Estado, str], chave: str
+    ) -> "ArtefatoLexico":
+        """Compacta um AFD e o mapa de estados finais para padrões.
+
+        Args:
+            automato: Autômato unificado (determinístico).
+            mapa_estados_padroes: Padrão reconhecido por cada estado final.
+            chave: Chave de cache das definições que geraram o autômato.
+        """
+        indices: dict[Estado, int] = {automato.estado_inicial: 0}
+        for estado in sorted(automato.estados, key=lambda e: e.nome):
+            indices.setdefault(estado, len(indices))
+
+        simbolos = sorted(automato.simbolos, key=intervalos_simbolo)
+        indice_simbolo = {s: i for i, s in enumerate(simbolos)}
+
+        tabela = array("i", [SEM_TRANSICAO]) * (len(indices) * len(simbolos))
+        for (origem, simbolo), destinos in automato.transicoes.items():
+            if destinos:
+                posicao = indices[origem] * len(simbolos) + indice_simbolo[simbolo]
+                tabela[posicao] = indices[next(iter(destinos))]
+
+        finais = {
+            indices[e]: mapa_estados_padroes.get(e, "desconhecido")
+            for e in automato.estados_finais
+        }
+        return cls(chave, len(indices), simbolos, finais, tabela)
+
+    def para_automato(self) -> tuple[Automato, dict[Estado, str]]:
+        """Reconstrói o autômato unificado e o mapa de estados finais.
+
+        Returns:
+            Par (autômato, mapa estado final → padrão).
+        """
+        estados = [Estado(f"q{i}") for i in range(self.num_estados)]
+        largura = len(self.simbolos)
+
+        transicoes: dict[tuple[Estado, str], set[Estado]] = {}
+        for origem in range(self.num_estados):
+            linha = origem * largura
+            for j, simbolo in enumerate(self.simbolos):
+                destino = self.tabela[linha + j]
+                if destino != SEM_TRANSICAO:
+                    transicoes[(estados[origem], simbolo)] = {estados[destino]}
+
+        intervalos = [s for s in self.simbolos if isinstance(s, Intervalo)]
+        alfabeto = (
+            AlfabetoIntervalos([[(s.inicio, s.fim)] for s in intervalos])
+            if intervalos
+            else None
+        )
+
+        automato = Automato(
+            estados=set(estados),
+            simbolos=set(self.simbolos),
+            transicoes=transicoes,
+            estado_inicial=estados[0],
+            estados_finais={estados[i] for i in self.finais},
+            alfabeto=alfabeto,
+        )
+        mapa = {estados[i]: padrao for i, padrao in self.finais.items()}
+        return automato, mapa
+
+    def salvar(self, caminho: str):
+        """Grava o artefato em disco (escrita atômica via arquivo temporário)."""
+        cabecalho = json.dumps(
+            {
+                "versao": VERSAO_MOTOR,
+                "chave": self.chave,
+                "num_estados": self.num_estados,
+                # caracteres como string, intervalos como [inicio, fim]
+                "simbolos": [
+                    [s.inicio, s.fim] if isinstance(s, Intervalo) else s
+                    for s in self.simbolos
+                ],
+                "finais": [[i, p] for i, p in sorted(self.finais.items())],
+            },
+            ensure_ascii=False,
+        ).encode("utf-8")
+
+        inicio_tabela = len(MAGICO) + 8 + len(cabecalho)
+        preenchimento = b"\0" * (-inicio_tabela % 8)
+
+        temporario = f"{caminho}.tmp"
+        with open(temporario, "wb") as f:
+            f.write(MAGICO)
+            f.write(len(cabecalho).to_bytes(8, "little"))
+            f.write(cabecalho)
+            f.write(preenchimento)
+            tabela = array("i", self.tabela)
+            if tabela.itemsize != 4:
+                raise ValueError("Plataforma sem inteiros de 32 bits em array('i')")
+            f.write(tabela.tobytes())
+        os.replace(temporario, caminho)
+
+    @classmethod
+    def carregar(cls, caminho: str, chave: str | None = None) -> "ArtefatoLexico":
+        """Carrega um artefato, mapeando a tabela de transições em memória.
+
+        Args:
+            caminho: Arquivo gravado por `salvar`.
+            chave: Se informada, exige que o artefato tenha essa chave.
+
+        Raises:
+            ValueError: Se o arquivo for inválido, de outra versão ou de outra
+                chave (artefato desatualizado).
+        """
+        with open(caminho, "rb") as f:
+            mapa = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            if mapa[: len(MAGICO)] != MAGICO:
+                raise ValueError(f"Arquivo não é um artefato léxico: {caminho}")
+
+            tamanho = int.from_bytes(mapa[len(MAGICO) : len(MAGICO) + 8], "little")
+            inicio_cabecalho = len(MAGICO) + 8
+            cabecalho = json.loads(
+                mapa[inicio_cabecalho : inicio_cabecalho + tamanho].decode("utf-8")
+            )
+
+            if cabecalho["versao"] != VERSAO_MOTOR:
+                raise ValueError(
+                    f"Artefato de versão {cabecalho['versao']}, "
+                    f"esperada {VERSAO_MOTOR}"
+                )
+            if chave is not None and cabecalho["chave"] != chave:
+                raise ValueError(
+                    "Artefato desatualizado: chave das definições difere"
+                )
+
+            simbolos: list[str | Intervalo] = [
+                Intervalo(*s) if isinstance(s, list) else s
+                for s in cabecalho["simbolos"]
+            ]
+            finais = {i: p for i, p in cabecalho["finais"]}
+
+            # confere o tamanho antes do cast, que falharia com TypeError se
+            # o arquivo fosse cortado no meio de um inteiro
+            inicio_tabela = inicio_cabecalho + tamanho
+            inicio_tabela += -inicio_tabela % 8
+            esperado = cabecalho["num_estados"] * len(simbolos) * 4
+            if len(mapa) - inicio_tabela != esperado:
+                raise ValueError(f"Tabela de transições truncada: {caminho}")
+        except (KeyError, TypeError) as e:
+            mapa.close()
+            raise ValueError(
+                f"Cabeçalho de artefato inválido ({e!r}): {caminho}"
+            ) from e
+        except ValueError:
+            mapa.close()
+            raise
+
+        tabela = memoryview(mapa)[inicio_tabela:].cast("i")
+        return cls(
+            chave=cabecalho["chave"],
+            num_estados=cabecalho["num_estados"],
+            simbolos=simbolos,
+            finais=finais,
+            tabela=tabela,
+        )
@@ -1,9 +1,26 @@
 from dataclasses import dataclass
 from typing import override
 
+from src.intervalos import AlfabetoIntervalos, Intervalo
+
 EPSILON = "&"
 
 
+class LimiteEstadosExcedido(ValueError):
+    """Construção de um autômato interrompida por exceder o limite de estados.
+
+    Attributes:
+        limite: Número máximo de estados permitido.
+        definicao: Nome da definição regular em construção, se conhecido.
+    """
+
+    def __init__(self, limite: int, definicao: str = ""):
+        self.limite = limite
+        self.definicao = definicao
+        alvo = f" em '{definicao}'" if definicao else ""
+        super().__init__(f"Limite de {limite} estados excedido{alvo}")
+
+
 @dataclass(frozen=True)
 class Estado:
     """Representa um estado de autômato finito."""
@@ -19,15 +36,21 @@ class Estado:
 
 
 class Automato:
-    """Autômato finito (determinístico ou não-determinístico) com suporte a ε-transições."""
+    """Autômato finito (determinístico ou não-determinístico) com suporte a ε-transições.
+
+    Os símbolos são caracteres ou, quando o autômato possui um `alfabeto`,
+    intervalos disjuntos de codepoints (`Intervalo`). No segundo caso cada
+    caractere lido é primeiro traduzido para o intervalo que o contém.
+    """
     def __init__(
         self,
         estados: set[Estado],
-        simbolos: set[str],
+        simbolos: set[str] | set[Intervalo],
         transicoes: dict[tuple[Estado, str], set[Estado]],
         estado_inicial: Estado,
         estados_finais: set[Estado],
         nome_token: str = "",
+        alfabeto: AlfabetoIntervalos | None = None,
     ):
         self.estados: set[Estado] = set(estados)
         self.simbolos: set[str] = set(simbolos)
@@ -37,6 +60,7 @@ class Automato:
         self.estado_inicial: Estado = estado_inicial
         self.estados_finais: set[Estado] = set(estados_finais)
         self.nome_token = nome_token
+        self.alfabeto: AlfabetoIntervalos | None = alfabeto
 
         # Validações:
         if len(self.estados):
@@ -110,6 +134,17 @@ class Automato:
             novos_estados.update(self.transicoes.get((e, simbolo), set()))
         return novos_estados
 
+    def transicoes_por_estado(self) -> dict[Estado, list[tuple[str, set[Estado]]]]:
+        """Agrupa as transições pelo estado de origem.
+
+        Returns:
+            Dicionário estado → lista de (símbolo, destinos) que saem dele.
+        """
+        saidas: dict[Estado, list[tuple[str, set[Estado]]]] = {}
+        for (origem, simbolo), destinos in self.transicoes.items():
+            saidas.setdefault(origem, []).append((simbolo, destinos))
+        return saidas
+
     def processar(self, palavra: str) -> bool:
         """Simula o autômato para reconhecer uma palavra.
         
@@ -120,12 +155,24 @@ class Automato:
             True se a palavra é aceita pelo autômato, False caso contrário.
         """
         estados_atuais = self.epsilon_fecho({self.estado_inicial})
-        for simbolo in palavra:
+        for caractere in palavra:
+            simbolo = self.simbolo_de(caractere)
             estados_atuais = self.epsilon_fecho(
                 self.transiciona(estados_atuais, simbolo)
             )
         return any(estado in self.estados_finais for estado in estados_atuais)
 
+    def simbolo_de(self, caractere: str) -> str | Intervalo | None:
+        """Traduz um caractere lido para o símbolo usado nas transições.
+
+        Returns:
+            O próprio caractere, o intervalo que o contém (se o autômato usa
+            intervalos) ou None se nenhum intervalo o contém.
+        """
+        if self.alfabeto is None:
+            return caractere
+        return self.alfabeto.atomo(caractere)
+
     def alcanca(
         self, estados_atuais: set[Estado], estados_destino: set[Estado]
     ) -> bool:
@@ -209,7 +256,14 @@ class HandlerAutomatos:
         while f"q_uniao_{i}" in nomes_existentes:
             i += 1
         qnovo = Estado(f"q_uniao_{i}")
-        automato_uniao = Automato({qnovo}, set(), {}, qnovo, set())
+        automato_uniao = Automato(
+            {qnovo},
+            set(),
+            {},
+            qnovo,
+            set(),
+            alfabeto=automato1.alfabeto or automato2.alfabeto,
+        )
 
         automato_uniao.adicionar_estados(automato1.estados)
         automato_uniao.adicionar_estados(automato2.estados)
@@ -242,83 +296,56 @@ class HandlerAutomatos:
         """
         return "".join(sorted(e.nome for e in estados))
 
-    def determinizar(self, automato: Automato) -> Automato:
+    def determinizar(
+        self, automato: Automato, limite_estados: int | None = None
+    ) -> Automato:
         """Converte um AFND em AFD usando construção de subconjuntos.
         
         Args:
             automato: Autômato finito não-determinístico.
+            limite_estados: Número máximo de estados do AFD (opcional).
             
         Returns:
             Autômato finito determinístico equivalente.
-        """
-        if automato.is_deterministico():
-            return automato
-
-        conjunto_inicial_novo: set[Estado] = automato.epsilon_fecho(
-            {automato.estado_inicial}
-        )
-        q_inicial_novo: Estado = Estado(self.junta_nome_estados(conjunto_inicial_novo))
 
-        dicionario_estados: dict[frozenset[Estado], Estado] = {
-            frozenset(conjunto_inicial_novo): q_inicial_novo
-        }
-
-        automato_determinizado: Automato = Automato(
-            {q_inicial_novo}, automato.simbolos - {EPSILON}, {}, q_inicial_novo, set()
+        Raises:
+            LimiteEstadosExcedido: Se o AFD passar de `limite_estados` estados.
+        """
+        automato_determinizado, _ = self.determinizar_com_mapeamento(
+            automato, limite_estados
         )
+        return automato_determinizado
 
-        nao_processados: list[frozenset[Estado]] = [frozenset(conjunto_inicial_novo)]
-        processados: set[frozenset[Estado]] = set()
-
-        while nao_processados:
-            conjunto_atual = nao_processados.pop()
-
-            if conjunto_atual in processados:
-                continue
-
-            processados.add(conjunto_atual)
-
-            estado_atual = dicionario_estados[frozenset(conjunto_atual)]
-
-            for simbolo in automato_determinizado.simbolos:
-                conjunto_destino: set[Estado] = set()
-
-                for estado_afd in conjunto_atual:
-                    destinos = automato.transicoes.get((estado_afd, simbolo), set())
-                    conjunto_destino.update(destinos)
-
-                conjunto_destino = automato.epsilon_fecho(conjunto_destino)
-
-                if not conjunto_destino:
-                    continue
-
-                if frozenset(conjunto_destino) not in dicionario_estados:
-                    estado_novo = Estado(self.junta_nome_estados(conjunto_destino))
-                    dicionario_estados[frozenset(conjunto_destino)] = estado_novo
-
-                    automato_determinizado.adicionar_estados({estado_novo})
-                    nao_processados.append(frozenset(conjunto_destino))
+    def determinizar_com_mapeamento(
+        self, automato: Automato, limite_estados: int | None = None
+    ) -> tuple[Automato, dict[Estado, frozenset[Estado]]]:
+        """Determiniza o autômato e informa quais estados originais cada novo estado representa.
 
-                estado_destino = dicionario_estados[frozenset(conjunto_destino)]
+        Para cada subconjunto, percorre apenas as transições existentes de seus
+        estados, agrupadas por símbolo, em vez de testar todo o alfabeto (que,
+        com intervalos, pode ter muitos símbolos sem transição a partir do
+        subconjunto).
 
-                automato_determinizado.adicionar_transicoes(
-                    {(estado_atual, simbolo): {estado_destino}}
-                )
-
-        for conjunto, estado in dicionario_estados.items():
-            if any(e in automato.estados_finais for e in conjunto):
-                automato_determinizado.adicionar_estados_finais({estado})
+        Args:
+            automato: Autômato finito não-determinístico.
+            limite_estados: Número máximo de estados do AFD (opcional). A
+                construção de subconjuntos pode gerar exponencialmente mais
+                estados que o AFND; o limite a interrompe antes de esgotar
+                tempo e memória.
 
-        return automato_determinizado
+        Returns:
+            Par (AFD equivalente, mapeamento estado do AFD → conjunto original).
 
-    def determinizar_com_mapeamento(
-        self, automato: Automato
-    ) -> tuple[Automato, dict[Estado, frozenset[Estado]]]:
+        Raises:
+            LimiteEstadosExcedido: Se o AFD passar de `limite_estados` estados.
+        """
         mapeamento: dict[Estado, frozenset[Estado]] = {}
         if automato.is_deterministico():
             mapeamento = {estado: frozenset([estado]) for estado in automato.estados}
             return automato, mapeamento
 
+        saidas = automato.transicoes_por_estado()
+
         conjunto_inicial_novo: set[Estado] = automato.epsilon_fecho(
             {automato.estado_inicial}
         )
@@ -329,7 +356,12 @@ class HandlerAutomatos:
         }
 
         automato_determinizado: Automato = Automato(
-            {q_inicial_novo}, automato.simbolos - {EPSILON}, {}, q_inicial_novo, set()
+            {q_inicial_novo},
+            automato.simbolos - {EPSILON},
+            {},
+            q_inicial_novo,
+            set(),
+            alfabeto=automato.alfabeto,
         )
 
         nao_processados: list[frozenset[Estado]] = [frozenset(conjunto_inicial_novo)]
@@ -345,19 +377,24 @@ class HandlerAutomatos:
 
             estado_atual = dicionario_estados[frozenset(conjunto_atual)]
 
-            for simbolo in automato_determinizado.simbolos:
-                conjunto_destino: set[Estado] = set()
-
-                for estado_afd in conjunto_atual:
-                    destinos = automato.transicoes.get((estado_afd, simbolo), set())
-                    conjunto_destino.update(destinos)
+            destinos_por_simbolo: dict[str, set[Estado]] = {}
+            for estado_afd in conjunto_atual:
+                for simbolo, destinos in saidas.get(estado_afd, []):
+                    if simbolo != EPSILON:
+                        destinos_por_simbolo.setdefault(simbolo, set()).update(destinos)
 
-                conjunto_destino = automato.epsilon_fecho(conjunto_destino)
+            for simbolo, destinos in destinos_por_simbolo.items():
+                conjunto_destino = automato.epsilon_fecho(destinos)
 
                 if not conjunto_destino:
                     continue
 
                 if frozenset(conjunto_destino) not in dicionario_estados:
+                    if (
+                        limite_estados is not None
+                        and len(dicionario_estados) >= limite_estados
+                    ):
+                        raise LimiteEstadosExcedido(limite_estados)
                     estado_novo = Estado(self.junta_nome_estados(conjunto_destino))
                     dicionario_estados[frozenset(conjunto_destino)] = estado_novo
 
@@ -390,22 +427,18 @@ class HandlerAutomatos:
         Returns:
             Novo autômato contendo apenas estados alcançáveis.
         """
+        saidas = automato.transicoes_por_estado()
         alcancados: set[Estado] = {automato.estado_inicial}
-        processados: set[Estado] = set()
         processando: list[Estado] = [automato.estado_inicial]
         transicoes: dict[tuple[Estado, str], set[Estado]] = dict()
 
         while processando:
-            estado_atual: Estado = processando.pop(0)
-            processados.add(estado_atual)
-            for simbolo in automato.simbolos:
-                estados_alcancados: set[Estado] = automato.transiciona(
-                    {estado_atual}, simbolo
-                )
+            estado_atual: Estado = processando.pop()
+            for simbolo, estados_alcancados in saidas.get(estado_atual, []):
                 if estados_alcancados:
-                    transicoes[estado_atual, simbolo] = estados_alcancados
+                    transicoes[estado_atual, simbolo] = set(estados_alcancados)
                     for estado_alcancado in estados_alcancados:
-                        if estado_alcancado not in processados:
+                        if estado_alcancado not in alcancados:
                             alcancados.add(estado_alcancado)
                             processando.append(estado_alcancado)
 
@@ -417,12 +450,16 @@ class HandlerAutomatos:
             transicoes,
             automato.estado_inicial,
             estados_finais_alcancaveis,
+            alfabeto=automato.alfabeto,
         )
 
         return automato_alcancavel
 
     def remove_estados_mortos(self, automato: Automato) -> Automato:
         """Remove estados mortos (que não alcançam estados finais).
+
+        Os estados vivos são obtidos por uma única busca reversa a partir dos
+        estados finais.
         
         Args:
             automato: Autômato a ser processado.
@@ -430,11 +467,19 @@ class HandlerAutomatos:
         Returns:
             Novo autômato contendo apenas estados vivos.
         """
-        estados_vivos: set[Estado] = set()
+        antecessores: dict[Estado, set[Estado]] = {}
+        for (origem, _), destinos in automato.transicoes.items():
+            for destino in destinos:
+                antecessores.setdefault(destino, set()).add(origem)
 
-        for estado in automato.estados:
-            if automato.alcanca({estado}, automato.estados_finais):
-                estados_vivos.add(estado)
+        estados_vivos: set[Estado] = set(automato.estados_finais)
+        processando: list[Estado] = list(automato.estados_finais)
+        while processando:
+            estado_atual = processando.pop()
+            for antecessor in antecessores.get(estado_atual, set()):
+                if antecessor not in estados_vivos:
+                    estados_vivos.add(antecessor)
+                    processando.append(antecessor)
 
         transicoes: dict[tuple[Estado, str], set[Estado]] = {}
 
@@ -451,12 +496,17 @@ class HandlerAutomatos:
             transicoes,
             automato.estado_inicial,
             finais_vivos,
+            alfabeto=automato.alfabeto,
         )
 
         return automato_vivo
 
     def remove_estados_equivalentes(self, automato: Automato) -> Automato:
         """Remove estados equivalentes usando particionamento iterativo.
+
+        A assinatura de cada estado considera apenas as transições existentes
+        (pares símbolo → grupo do destino), então o custo por rodada é
+        proporcional ao número de transições e não a estados × alfabeto.
         
         Args:
             automato: Autômato determinístico.
@@ -470,6 +520,8 @@ class HandlerAutomatos:
         if len(automato.estados) <= 1:
             return automato
 
+        saidas = automato.transicoes_por_estado()
+
         # Criação dos novos grupos
         finais: set[Estado] = automato.estados_finais
         nao_finais: set[Estado] = automato.estados - finais
@@ -482,34 +534,23 @@ class HandlerAutomatos:
             dividindo = False
             novos_grupos = []
 
+            indice_grupo: dict[Estado, int] = {
+                estado: i for i, grupo in enumerate(grupos) for estado in grupo
+            }
+
             for grupo in grupos:
-                representacoes: dict[tuple[int | None, ...], set[Estado]] = {}
+                representacoes: dict[frozenset[tuple[str, int]], set[Estado]] = {}
 
                 for estado in grupo:
-                    chave: list[int | None] = []
-
-                    for simbolo in automato.simbolos:
-                        destinos: set[Estado] = automato.transicoes.get(
-                            (estado, simbolo), set()
-                        )
-
-                        if not destinos:
-                            chave.append(None)
-                            continue
-
-                        destino: Estado = next(iter(destinos))
-
-                        indice_destino: int | None = next(
-                            (i for i, p in enumerate(grupos) if destino in p),
-                            None,
-                        )
-
-                        chave.append(indice_destino)
-                    tuple_chave: tuple[int | None, ...] = tuple(chave)
+                    chave: frozenset[tuple[str, int]] = frozenset(
+                        (simbolo, indice_grupo[next(iter(destinos))])
+                        for simbolo, destinos in saidas.get(estado, [])
+                        if destinos
+                    )
 
-                    if tuple_chave not in representacoes:
-                        representacoes[tuple_chave] = set()
-                    representacoes[tuple_chave].add(estado)
+                    if chave not in representacoes:
+                        representacoes[chave] = set()
+                    representacoes[chave].add(estado)
 
                 novos_grupos.extend(representacoes.values())
 
@@ -549,6 +590,7 @@ class HandlerAutomatos:
             novas_transicoes,
             novo_inicial,
             novos_finais,
+            alfabeto=automato.alfabeto,
         )
 
     def minimizar(self, automato: Automato) -> Automato:
@@ -572,11 +614,96 @@ class HandlerAutomatos:
         automato = self.remove_estados_equivalentes(automato)
         return automato
 
+    def equivalentes(self, afd1: Automato, afd2: Automato) -> bool:
+        """Verifica se dois AFDs reconhecem a mesma linguagem.
+
+        Percorre os pares de estados alcançáveis no autômato produto (uma
+        transição ausente leva ao estado morto, representado por None) e
+        procura um par em que só um dos lados é final.
+
+        Args:
+            afd1: Primeiro autômato determinístico.
+            afd2: Segundo autômato determinístico.
+
+        Returns:
+            True se as linguagens são iguais.
+        """
+
+        def proximo(afd: Automato, estado: Estado | None, simbolo) -> Estado | None:
+            if estado is None:
+                return None
+            destinos = afd.transicoes.get((estado, simbolo))
+            return next(iter(destinos)) if destinos else None
+
+        simbolos = afd1.simbolos | afd2.simbolos
+        visitados: set[tuple[Estado | None, Estado | None]] = set()
+        pendentes = [(afd1.estado_inicial, afd2.estado_inicial)]
+        while pendentes:
+            par = pendentes.pop()
+            if par in visitados:
+                continue
+            visitados.add(par)
+            estado1, estado2 = par
+            if (estado1 in afd1.estados_finais) != (estado2 in afd2.estados_finais):
+                return False
+            for simbolo in simbolos:
+                destino = (
+                    proximo(afd1, estado1, simbolo),
+                    proximo(afd2, estado2, simbolo),
+                )
+                if destino != (None, None):
+                    pendentes.append(destino)
+        return True
+
+    def trocar_alfabeto(
+        self, automato: Automato, alfabeto: AlfabetoIntervalos
+    ) -> Automato:
+        """Reescreve as transições de um autômato sobre outra partição em intervalos.
+
+        Cada átomo do novo alfabeto herda as transições do átomo antigo que
+        contém seu início. Vale sempre que o novo alfabeto for construído a
+        partir de um conjunto de folhas que inclui as folhas que geraram o
+        autômato: nenhum átomo novo mistura caracteres que o autômato distingue.
+
+        Args:
+            automato: Autômato cujos símbolos são átomos de `automato.alfabeto`.
+            alfabeto: Novo alfabeto.
+
+        Returns:
+            Autômato equivalente sobre os átomos de `alfabeto`.
+        """
+        antigo = automato.alfabeto
+        if antigo is None or antigo.atomos == alfabeto.atomos:
+            automato.alfabeto = alfabeto
+            return automato
+
+        correspondentes: dict[Intervalo, list[Intervalo]] = {}
+        for atomo in alfabeto.atomos:
+            atomo_antigo = antigo.atomo(chr(atomo.inicio))
+            if atomo_antigo is not None:
+                correspondentes.setdefault(atomo_antigo, []).append(atomo)
+
+        transicoes: dict[tuple[Estado, str], set[Estado]] = {}
+        for (origem, simbolo), destinos in automato.transicoes.items():
+            for atomo in correspondentes.get(simbolo, []):
+                transicoes[(origem, atomo)] = set(destinos)
+
+        return Automato(
+            estados=automato.estados,
+            simbolos={s for _, s in transicoes},
+            transicoes=transicoes,
+            estado_inicial=automato.estado_inicial,
+            estados_finais=automato.estados_finais,
+            nome_token=automato.nome_token,
+            alfabeto=alfabeto,
+        )
+
     # Essa função não é mais usada, já que é feito uma tabela direto na CLI com rich (remover?)
     def print_tabela(self, automato: Automato):
         # Ordenar estados e símbolos para apresentação consistente
         estados_ord = sorted(automato.estados, key=lambda e: e.nome)
-        simbolos_ord = sorted(automato.simbolos)
+        simbolos_automato = {str(s): s for s in automato.simbolos}
+        simbolos_ord = sorted(simbolos_automato)
 
         # Calcular largura das colunas
         largura_estado = max(len(str(e.nome)) for e in estados_ord)
@@ -586,7 +713,7 @@ class HandlerAutomatos:
         for s in simbolos_ord:
             max_len = len(s)
             for e in estados_ord:
-                destinos = automato.transicoes.get((e, s), set())
+                destinos = automato.transicoes.get((e, simbolos_automato[s]), set())
                 if destinos:
                     destinos_str = ", ".join(sorted(str(d.nome) for d in destinos))
                     max_len = max(max_len, len(destinos_str))
@@ -631,7 +758,9 @@ class HandlerAutomatos:
 
             transicoes_linha = []
             for s in simbolos_ord:
-                destinos = automato.transicoes.get((estado, s), set())
+                destinos = automato.transicoes.get(
+                    (estado, simbolos_automato[s]), set()
+                )
                 if destinos:
                     destinos_str = ", ".join(sorted(str(d.nome) for d in destinos))
                     transicoes_linha.append(f"{destinos_str:^{larguras_simbolos[s]}}")
@@ -52,8 +52,7 @@ def interface_lexico_execucao(analisador):
                 input("ENTER para continuar...")
                 continue
             try:
-                tokens = analisador.analisar()
-                analisador.ultima_lista_tokens = tokens
+                tokens = analisador.analisar_stream()
                 console.print(
                     f"[green]Análise concluída! {len(tokens)} tokens gerados.[/green]"
                 )
@@ -89,9 +88,7 @@ def interface_lexico_execucao(analisador):
             try:
                 output_path.parent.mkdir(parents=True, exist_ok=True)
 
-                with output_path.open("w", encoding="utf-8") as f:
-                    for token in tokens:
-                        f.write(f"<{token[0]}, {token[1]}>\n")
+                analisador.salvar_tokens(tokens, output_path)
                 console.print(f"[green]Tokens exportados para {output_path}[/green]")
             except Exception as e:
                 console.print(f"[red]Erro ao exportar: {e}[/red]")
@@ -143,6 +140,8 @@ def interface_lexico_projeto(analisador):
                 )
                 table.add_column("Nome")
                 table.add_column("Expressão Regular")
+                for nome, er in analisador.macros.items():
+                    table.add_row(f"{{{nome}}}", er)
                 for nome, er in analisador.definicoes.items():
                     table.add_row(nome, er)
                 console.print(table)
@@ -154,8 +153,13 @@ def interface_lexico_projeto(analisador):
             console.print(f"[green]ER '{nome}' adicionada![/green]")
             input("ENTER para continuar...")
         elif op == "4":
+            motor = Prompt.ask(
+                "Motor de conversão ER → AFD",
+                choices=list(analisador.conversores),
+                default="followpos",
+            )
             try:
-                analisador.gerar_analisador()
+                analisador.gerar_analisador(motor)
                 console.print("[green]Analisador léxico gerado com sucesso![/green]")
             except Exception as e:
                 console.print(f"[red]Erro ao gerar analisador: {e}[/red]")
@@ -239,10 +243,10 @@ def interface_lexico_projeto(analisador):
                     # Cabeçalho: Estado + cada símbolo
                     table.add_column("Estado", justify="center", style="bold")
 
-                    simbolos_ord = sorted(afd.simbolos)
+                    simbolos_ord = sorted(afd.simbolos, key=str)
 
                     for s in simbolos_ord:
-                        table.add_column(s, justify="center")
+                        table.add_column(str(s), justify="center")
 
                     # Ordenar estados
                     estados_ord = sorted(afd.estados, key=lambda e: e.nome)
@@ -285,10 +289,10 @@ def interface_lexico_projeto(analisador):
                 )
 
                 table.add_column("Estado", justify="center", style="bold")
-                simbolos_ord = sorted(afd.simbolos)
+                simbolos_ord = sorted(afd.simbolos, key=str)
 
                 for s in simbolos_ord:
-                    table.add_column(s, justify="center")
+                    table.add_column(str(s), justify="center")
 
                 estados_ord = sorted(afd.estados, key=lambda e: e.nome)
 
@@ -326,9 +330,9 @@ def interface_lexico_projeto(analisador):
                 )
 
                 table.add_column("Estado", justify="center", style="bold")
-                simbolos_ord = sorted(afd.simbolos)
+                simbolos_ord = sorted(afd.simbolos, key=str)
                 for s in simbolos_ord:
-                    table.add_column(s, justify="center")
+                    table.add_column(str(s), justify="center")
 
                 estados_ord = sorted(afd.estados, key=lambda e: e.nome)
                 for estado in estados_ord:
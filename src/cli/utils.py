@@ -8,6 +8,8 @@ from typing import Any
 
 console = Console()
 
+TAMANHO_PAGINA_DERIVACAO = 100
+
 
 def selecionar_arquivo_definicao(analisador):
     pasta = "tests/arquivos_definicao"
@@ -475,21 +477,51 @@ def mostrar_resultado_slr(handler, analisador_slr, parser, resultado):
         console.print(Panel("[bold red]ERRO SINTÁTICO[/bold red]", expand=False))
 
     console.print()
+    mostrar_derivacao(parser)
+
+    console.print()
+    input("Pressione ENTER para continuar...")
+
+
+def _tabela_derivacao() -> Table:
     tabela_deriv = Table(
-        title="Derivação (Rightmost)",
+        title="Derivação (Leftmost)",
         header_style="bold blue",
         show_lines=True,
         expand=False,
     )
     tabela_deriv.add_column("#", style="bright_cyan", justify="center")
     tabela_deriv.add_column("Produção aplicada", style="white")
-    deriv = getattr(parser, "derivacao", None)
-    if deriv:
-        for i, p in enumerate(deriv, 1):
-            tabela_deriv.add_row(str(i), str(p))
-    else:
+    return tabela_deriv
+
+
+def mostrar_derivacao(parser):
+    """Mostra a derivação em páginas de TAMANHO_PAGINA_DERIVACAO passos.
+
+    Só as produções da página exibida são formatadas, então derivações
+    longas não custam tempo nem memória além do que é mostrado.
+    """
+    total = len(getattr(parser, "indices_derivacao", ()))
+    if not total:
+        tabela_deriv = _tabela_derivacao()
         tabela_deriv.add_row("-", "Nenhuma derivação disponível")
-    console.print(tabela_deriv)
+        console.print(tabela_deriv)
+        return
 
-    console.print()
-    input("Pressione ENTER para continuar...")
+    for inicio in range(0, total, TAMANHO_PAGINA_DERIVACAO):
+        tabela_deriv = _tabela_derivacao()
+        for numero, producao in parser.pagina_derivacao(
+            inicio, TAMANHO_PAGINA_DERIVACAO
+        ):
+            tabela_deriv.add_row(str(numero), producao)
+        console.print(tabela_deriv)
+
+        restantes = total - inicio - TAMANHO_PAGINA_DERIVACAO
+        if restantes > 0:
+            escolha = Prompt.ask(
+                f"[bold green]Mais {restantes} passos. Continuar?[/bold green]",
+                choices=["s", "n"],
+                default="s",
+            )
+            if escolha == "n":
+                return
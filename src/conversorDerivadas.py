@@ -0,0 +1,451 @@
+from src.automatos import Automato, Estado, LimiteEstadosExcedido
+from src.expressaoregular import ExpressaoRegular, NodoER
+
+EPSILON = "&"
+
+# Termos são tuplas imutáveis (e portanto hasheáveis), cujo primeiro elemento
+# identifica o operador. Termos iguais representam o mesmo estado do AFD.
+VAZIO = ("∅",)
+VAZIA = ("ε",)
+Termo = tuple
+
+
+class ConversorDerivadas_AFD:
+    """
+    Conversor de Expressão Regular para AFD por derivadas de Brzozowski.
+
+    Cada estado do AFD é uma expressão regular (termo) e a transição de r por
+    um símbolo a leva à derivada ∂a(r). Os termos são normalizados por
+    construtores inteligentes (união associativa, comutativa e idempotente,
+    remoção de ∅ e ε neutros, r** = r*, ¬¬r = r), o que garante um número
+    finito de estados e produz AFDs normalmente próximos do mínimo.
+
+    Além das operações das ERs do analisador, suporta interseção e complemento
+    diretamente sobre os termos (`intersecao` e `complemento`).
+
+    Referências:
+    - Brzozowski (1964), Derivatives of Regular Expressions.
+    - Owens, Reppy e Turon (2009), Regular-expression derivatives re-examined.
+    """
+
+    def __init__(self):
+        self.cache_derivadas: dict[tuple[Termo, str], Termo] = {}
+
+    def gerar_afd(
+        self, regex: ExpressaoRegular, limite_estados: int | None = None
+    ) -> Automato:
+        """Gera um AFD a partir de uma expressão regular usando derivadas.
+
+        Mesma interface de `ConversorER_AFD.gerar_afd`, podendo substituí-lo
+        na geração do analisador léxico.
+
+        Args:
+            regex: Expressão regular ainda não processada.
+            limite_estados: Número máximo de estados do AFD (opcional).
+
+        Returns:
+            AFD que reconhece a linguagem da expressão.
+
+        Raises:
+            LimiteEstadosExcedido: Se o AFD passar de `limite_estados` estados.
+        """
+        termo = self.termo_regex(regex)
+        afd = self.gerar_afd_termo(termo, limite_estados=limite_estados)
+        afd.alfabeto = regex.alfabeto
+        return afd
+
+    def termo_regex(self, regex: ExpressaoRegular) -> Termo:
+        """Converte uma expressão regular (sem processá-la) no termo inicial."""
+        raiz: NodoER = regex.arvore()
+        regex.atomizar(raiz)
+
+        # remove o marcador de fim (#) adicionado por ExpressaoRegular; se a
+        # simplificação reduziu a expressão a ε, sobra só o marcador
+        if raiz.tipo == "SIMBOLO" and raiz.valor == "#":
+            return VAZIA
+        if raiz.tipo == "." and raiz.nodo_esquerda and raiz.nodo_direita:
+            direita = raiz.nodo_direita
+            if direita.tipo == "SIMBOLO" and direita.valor == "#":
+                raiz = raiz.nodo_esquerda
+        return self.converter_nodo(raiz)
+
+    def estimar_estados(self, regex: ExpressaoRegular) -> int:
+        """Estima, sem construir o AFD, quantos estados ele pode ter.
+
+        Equivalente por termos de `ConversorER_AFD.estimar_estados`, sem
+        calcular followpos: em uma concatenação `r*.s1.s2...`, se `s1` pode
+        começar por um símbolo de `r`, cada derivada precisa lembrar quais
+        das saídas do fecho ainda estão em andamento, o que leva a até 2^k
+        estados, onde k é o comprimento fixo de `s1.s2...` até o próximo
+        fecho. Também é um indicador de risco, não um limite exato.
+
+        Args:
+            regex: Expressão regular (não é processada).
+
+        Returns:
+            Número estimado de estados.
+        """
+        termo = self.termo_regex(regex)
+        k = 0
+        pendentes = [termo]
+        while pendentes:
+            atual = pendentes.pop()
+            operador = atual[0]
+            if operador == ".":
+                partes = []
+                while atual[0] == ".":
+                    partes.append(atual[1])
+                    atual = atual[2]
+                partes.append(atual)
+                pendentes.extend(partes)
+                k = max(k, self._saida_ambigua(partes))
+            elif operador in ["|", "&"]:
+                pendentes.extend(atual[1])
+            elif operador in ["*", "¬"]:
+                pendentes.append(atual[1])
+
+        folhas = self._contar_simbolos(termo)
+        return max(folhas, 2 ** min(k, 62))
+
+    def _saida_ambigua(self, partes: list[Termo]) -> int:
+        """Maior k de uma saída ambígua de fecho em uma concatenação."""
+        maior = 0
+        for i, parte in enumerate(partes[:-1]):
+            if parte[0] != "*":
+                continue
+            simbolos_fecho = self.simbolos(parte)
+            seguinte = partes[i + 1]
+            primeiros = set().union(*self._conjuntos_relevantes(seguinte))
+            if not simbolos_fecho & primeiros:
+                continue
+            k = 0
+            for resto in partes[i + 1:]:
+                comprimento = self._comprimento_fixo(resto)
+                if comprimento is None:
+                    break
+                k += comprimento
+            maior = max(maior, k)
+        return maior
+
+    def _comprimento_fixo(self, r: Termo) -> int | None:
+        """Maior número de símbolos de `r` sem fechos, ou None se houver fecho."""
+        operador = r[0]
+        if operador == "sim":
+            return 1
+        if operador == ".":
+            esquerda = self._comprimento_fixo(r[1])
+            direita = self._comprimento_fixo(r[2])
+            if esquerda is None or direita is None:
+                return None
+            return esquerda + direita
+        if operador == "|":
+            comprimentos = [self._comprimento_fixo(t) for t in r[1]]
+            if None in comprimentos:
+                return None
+            return max(comprimentos)
+        if operador == "ε":
+            return 0
+        return None
+
+    def _contar_simbolos(self, r: Termo) -> int:
+        operador = r[0]
+        if operador == "sim":
+            return 1
+        if operador == ".":
+            return self._contar_simbolos(r[1]) + self._contar_simbolos(r[2])
+        if operador in ["|", "&"]:
+            return sum(self._contar_simbolos(t) for t in r[1])
+        if operador in ["*", "¬"]:
+            return self._contar_simbolos(r[1])
+        return 0
+
+    def afd_preguicoso(self, regex: ExpressaoRegular) -> "AFDPreguicosoDerivadas":
+        """AFD por derivadas construído sob demanda, usado acima do limite de estados."""
+        return AFDPreguicosoDerivadas(self.termo_regex(regex), regex.alfabeto)
+
+    def gerar_afd_termo(
+        self,
+        termo: Termo,
+        alfabeto: set[str] | None = None,
+        limite_estados: int | None = None,
+    ) -> Automato:
+        """Constrói o AFD de um termo explorando suas derivadas.
+
+        Args:
+            termo: Termo inicial.
+            alfabeto: Símbolos do autômato. Por padrão, os símbolos que aparecem
+                no termo (relevante para o complemento).
+            limite_estados: Número máximo de estados do AFD (opcional).
+
+        Returns:
+            AFD cujos estados são as derivadas alcançáveis de `termo`.
+
+        Raises:
+            LimiteEstadosExcedido: Se o AFD passar de `limite_estados` estados.
+        """
+        if alfabeto is None:
+            alfabeto = self.simbolos(termo)
+
+        indices: dict[Termo, int] = {termo: 0}
+        pendentes: list[Termo] = [termo]
+        transicoes: dict[tuple[int, str], int] = {}
+
+        while pendentes:
+            atual = pendentes.pop()
+            origem = indices[atual]
+
+            # uma derivada por classe de símbolos equivalentes
+            for classe in self.classes(atual, alfabeto):
+                destino = self.derivada(atual, next(iter(classe)))
+                if destino == VAZIO:
+                    continue
+                if destino not in indices:
+                    if limite_estados is not None and len(indices) >= limite_estados:
+                        raise LimiteEstadosExcedido(limite_estados)
+                    indices[destino] = len(indices)
+                    pendentes.append(destino)
+                for simbolo in classe:
+                    transicoes[(origem, simbolo)] = indices[destino]
+
+        estados = {i: Estado(f"d{i}") for i in indices.values()}
+
+        return Automato(
+            estados=set(estados.values()),
+            simbolos=set(alfabeto),
+            transicoes={
+                (estados[origem], simbolo): {estados[destino]}
+                for (origem, simbolo), destino in transicoes.items()
+            },
+            estado_inicial=estados[0],
+            estados_finais={estados[i] for t, i in indices.items() if self.anulavel(t)},
+        )
+
+    def converter_nodo(self, nodo: NodoER) -> Termo:
+        """Converte uma árvore `NodoER` em termo normalizado."""
+        if nodo.tipo == "CLASSE" and nodo.classe is not None:
+            return self.simbolo(nodo.classe)
+        if nodo.tipo == "SIMBOLO":
+            if nodo.valor == EPSILON or nodo.valor is None:
+                return VAZIA
+            return self.simbolo(frozenset([nodo.valor]))
+        if nodo.tipo == "*" and nodo.nodo_esquerda:
+            return self.fecho(self.converter_nodo(nodo.nodo_esquerda))
+        if nodo.nodo_esquerda and nodo.nodo_direita:
+            esquerda = self.converter_nodo(nodo.nodo_esquerda)
+            direita = self.converter_nodo(nodo.nodo_direita)
+            if nodo.tipo == "|":
+                return self.uniao(esquerda, direita)
+            if nodo.tipo == ".":
+                return self.concatenacao(esquerda, direita)
+        raise ValueError(f"Nodo de expressão regular inválido: {nodo.tipo}")
+
+    # Construtores inteligentes
+
+    def simbolo(self, simbolos: frozenset[str]) -> Termo:
+        return ("sim", frozenset(simbolos)) if simbolos else VAZIO
+
+    def concatenacao(self, r: Termo, s: Termo) -> Termo:
+        if r == VAZIO or s == VAZIO:
+            return VAZIO
+        if r == VAZIA:
+            return s
+        if s == VAZIA:
+            return r
+        if r[0] == ".":
+            # (r1.r2).s → r1.(r2.s)
+            return self.concatenacao(r[1], self.concatenacao(r[2], s))
+        return (".", r, s)
+
+    def uniao(self, *termos: Termo) -> Termo:
+        alternativas: set[Termo] = set()
+        simbolos: set[str] = set()
+        for termo in termos:
+            partes = termo[1] if termo[0] == "|" else (termo,)
+            for parte in partes:
+                if parte == VAZIO:
+                    continue
+                if parte == ("¬", VAZIO):
+                    return parte
+                if parte[0] == "sim":
+                    simbolos |= parte[1]
+                else:
+                    alternativas.add(parte)
+        if simbolos:
+            alternativas.add(self.simbolo(frozenset(simbolos)))
+        if not alternativas:
+            return VAZIO
+        if len(alternativas) == 1:
+            return next(iter(alternativas))
+        return ("|", frozenset(alternativas))
+
+    def intersecao(self, *termos: Termo) -> Termo:
+        partes_intersecao: set[Termo] = set()
+        for termo in termos:
+            partes = termo[1] if termo[0] == "&" else (termo,)
+            for parte in partes:
+                if parte == VAZIO:
+                    return VAZIO
+                if parte == ("¬", VAZIO):
+                    continue
+                partes_intersecao.add(parte)
+        if not partes_intersecao:
+            return ("¬", VAZIO)
+        if len(partes_intersecao) == 1:
+            return next(iter(partes_intersecao))
+        return ("&", frozenset(partes_intersecao))
+
+    def fecho(self, r: Termo) -> Termo:
+        if r == VAZIO or r == VAZIA:
+            return VAZIA
+        if r[0] == "*":
+            return r
+        return ("*", r)
+
+    def complemento(self, r: Termo) -> Termo:
+        if r[0] == "¬":
+            return r[1]
+        return ("¬", r)
+
+    # Derivadas
+
+    def anulavel(self, r: Termo) -> bool:
+        """Indica se ε pertence à linguagem de `r`."""
+        operador = r[0]
+        if operador in ["ε", "*"]:
+            return True
+        if operador in ["∅", "sim"]:
+            return False
+        if operador == ".":
+            return self.anulavel(r[1]) and self.anulavel(r[2])
+        if operador == "|":
+            return any(self.anulavel(t) for t in r[1])
+        if operador == "&":
+            return all(self.anulavel(t) for t in r[1])
+        return not self.anulavel(r[1])
+
+    def derivada(self, r: Termo, a: str) -> Termo:
+        """Calcula ∂a(r), a derivada de `r` em relação ao símbolo `a`."""
+        chave = (r, a)
+        if chave in self.cache_derivadas:
+            return self.cache_derivadas[chave]
+
+        operador = r[0]
+        if operador in ["∅", "ε"]:
+            resultado = VAZIO
+        elif operador == "sim":
+            resultado = VAZIA if a in r[1] else VAZIO
+        elif operador == ".":
+            resultado = self.concatenacao(self.derivada(r[1], a), r[2])
+            if self.anulavel(r[1]):
+                resultado = self.uniao(resultado, self.derivada(r[2], a))
+        elif operador == "*":
+            resultado = self.concatenacao(self.derivada(r[1], a), r)
+        elif operador == "|":
+            resultado = self.uniao(*(self.derivada(t, a) for t in r[1]))
+        elif operador == "&":
+            resultado = self.intersecao(*(self.derivada(t, a) for t in r[1]))
+        else:
+            resultado = self.complemento(self.derivada(r[1], a))
+
+        self.cache_derivadas[chave] = resultado
+        return resultado
+
+    def classes(self, r: Termo, alfabeto: set[str]) -> list[frozenset[str]]:
+        """Particiona o alfabeto em classes de símbolos com a mesma derivada.
+
+        Símbolos de uma mesma classe levam `r` ao mesmo termo, então basta
+        calcular a derivada por um representante de cada classe.
+        """
+        if not alfabeto:
+            return []
+
+        particao: set[frozenset[str]] = {frozenset(alfabeto)}
+        for conjunto in self._conjuntos_relevantes(r):
+            nova_particao: set[frozenset[str]] = set()
+            for bloco in particao:
+                for parte in (bloco & conjunto, bloco - conjunto):
+                    if parte:
+                        nova_particao.add(parte)
+            particao = nova_particao
+        return list(particao)
+
+    def _conjuntos_relevantes(self, r: Termo) -> list[frozenset[str]]:
+        operador = r[0]
+        if operador == "sim":
+            return [r[1]]
+        if operador == ".":
+            conjuntos = self._conjuntos_relevantes(r[1])
+            if self.anulavel(r[1]):
+                conjuntos = conjuntos + self._conjuntos_relevantes(r[2])
+            return conjuntos
+        if operador in ["|", "&"]:
+            return [c for t in r[1] for c in self._conjuntos_relevantes(t)]
+        if operador in ["*", "¬"]:
+            return self._conjuntos_relevantes(r[1])
+        return []
+
+    def simbolos(self, r: Termo) -> set[str]:
+        """Retorna todos os símbolos que aparecem em `r`."""
+        operador = r[0]
+        if operador == "sim":
+            return set(r[1])
+        if operador == ".":
+            return self.simbolos(r[1]) | self.simbolos(r[2])
+        if operador in ["|", "&"]:
+            return set().union(*(self.simbolos(t) for t in r[1]))
+        if operador in ["*", "¬"]:
+            return self.simbolos(r[1])
+        return set()
+
+
+class AFDPreguicosoDerivadas:
+    """AFD por derivadas construído sob demanda.
+
+    Contraparte de `AFDPreguicoso` para o motor de derivadas: os estados são
+    termos e cada transição é a derivada, calculada só quando a entrada a
+    percorre. As derivadas usam um conversor próprio, cujo cache é
+    descartado junto com o de transições ao atingir `limite_cache`, então a
+    memória fica limitada qualquer que seja o tamanho do AFD completo.
+    """
+
+    def __init__(self, termo: Termo, alfabeto=None, limite_cache: int = 4096):
+        self.alfabeto = alfabeto
+        self.inicial = termo
+        self.conversor = ConversorDerivadas_AFD()
+        self.limite_cache = limite_cache
+        self.cache: dict[tuple[Termo, str], Termo] = {}
+        self.finais: dict[Termo, bool] = {}
+
+    def transicao(self, estado: Termo, simbolo: str) -> Termo:
+        """Derivada de `estado` em relação a `simbolo`."""
+        chave = (estado, simbolo)
+        destino = self.cache.get(chave)
+        if destino is None:
+            if len(self.cache) >= self.limite_cache:
+                self.cache.clear()
+                self.finais.clear()
+                self.conversor.cache_derivadas.clear()
+            destino = self.conversor.derivada(estado, simbolo)
+            self.cache[chave] = destino
+        return destino
+
+    def aceita(self, estado: Termo) -> bool:
+        final = self.finais.get(estado)
+        if final is None:
+            final = self.finais[estado] = self.conversor.anulavel(estado)
+        return final
+
+    def maior_prefixo(self, texto: str, inicio: int = 0) -> int:
+        """Comprimento do maior prefixo de `texto[inicio:]` aceito, ou -1."""
+        estado = self.inicial
+        maior = 0 if self.aceita(estado) else -1
+        for i in range(inicio, len(texto)):
+            simbolo = (
+                self.alfabeto.atomo(texto[i]) if self.alfabeto is not None else texto[i]
+            )
+            estado = self.transicao(estado, simbolo)
+            if estado == VAZIO:
+                break
+            if self.aceita(estado):
+                maior = i - inicio + 1
+        return maior
@@ -1,9 +1,24 @@
-from src.automatos import Automato, Estado
+from src.automatos import Automato, Estado, LimiteEstadosExcedido
 from src.expressaoregular import ExpressaoRegular, NodoER
 
 EPSILON = "&"
 
 
+def simbolos_posicoes(regex: ExpressaoRegular) -> list[tuple[str, ...]]:
+    """Símbolos (caracteres ou intervalos) de cada posição de uma ER processada.
+
+    Returns:
+        Lista indexada pela posição; posições de ε e # não têm símbolos.
+    """
+    simbolos_posicao: list[tuple[str, ...]] = [()] * (max(regex.folhas) + 1)
+    for p, nodo in regex.folhas.items():
+        if nodo.tipo == "CLASSE" and nodo.classe is not None:
+            simbolos_posicao[p] = tuple(nodo.classe)
+        elif nodo.valor is not None and nodo.valor not in [EPSILON, "#"]:
+            simbolos_posicao[p] = (nodo.valor,)
+    return simbolos_posicao
+
+
 class ConversorER_AFD:
     """
     Conversor de Expressão Regular para Autômato Finito Determinístico.
@@ -15,7 +30,9 @@ class ConversorER_AFD:
     Referência: Aho et al. (2006), Seção 3.9, Algoritmo 3.36, pp. 159-167.
     """
 
-    def gerar_afd(self, regex: ExpressaoRegular) -> Automato:
+    def gerar_afd(
+        self, regex: ExpressaoRegular, limite_estados: int | None = None
+    ) -> Automato:
         """Gera um AFD diretamente de uma expressão regular usando o algoritmo de construção direta.
 
         Passos:
@@ -26,6 +43,17 @@ class ConversorER_AFD:
         5. Estado inicial = firstpos(raiz)
         6. Estados finais = aqueles que contêm a posição de #
         7. Transições: δ(S, a) = ∪{followpos(p) | p ∈ S e símbolo[p] = a}
+
+        Os estados ainda não processados ficam em uma lista de trabalho, e as
+        posições de cada estado são agrupadas por símbolo em uma única passada,
+        de modo que só os símbolos presentes no estado geram transições.
+
+        Args:
+            regex: Expressão regular.
+            limite_estados: Número máximo de estados do AFD (opcional).
+
+        Raises:
+            LimiteEstadosExcedido: Se o AFD passar de `limite_estados` estados.
         """
         raiz: NodoER = regex.processar()
         if not raiz.firstpos:
@@ -35,34 +63,37 @@ class ConversorER_AFD:
                 transicoes={},
                 estado_inicial=Estado("q0"),
                 estados_finais={Estado("q0")} if raiz.nullable else set(),
+                alfabeto=regex.alfabeto,
             )
         q0: frozenset[int] = frozenset(raiz.firstpos)
         estados: set[frozenset[int]] = {q0}
-        marcados: set[frozenset[int]] = set()
-
-        entradas = {
-            nodo.valor
-            for nodo in regex.folhas.values()
-            if nodo.valor is not None and nodo.valor not in [EPSILON, "#"]
-        }
+        nao_marcados: list[frozenset[int]] = [q0]
 
-        transicoes: dict[tuple[frozenset[int], str], frozenset[int]] = {}
+        simbolos_posicao = simbolos_posicoes(regex)
 
-        while estados - marcados:
-            T = next(s for s in estados if s not in marcados)
-            marcados.add(T)
+        entradas = {a for simbolos in simbolos_posicao for a in simbolos}
 
-            for a in entradas:
-                U = set()
-                for p in T:
-                    if regex.folhas[p].valor == a:
-                        U.update(regex.folhas[p].followpos)
-                U = frozenset(U)
+        transicoes: dict[tuple[frozenset[int], str], frozenset[int]] = {}
 
-                if U and a:
-                    if U not in estados:
-                        estados.add(U)
-                    transicoes[(T, a)] = U
+        while nao_marcados:
+            T = nao_marcados.pop()
+
+            # agrupa as posições de T por símbolo em uma única passada
+            destinos: dict[str, set[int]] = {}
+            for p in T:
+                for a in simbolos_posicao[p]:
+                    destinos.setdefault(a, set()).update(regex.folhas[p].followpos)
+
+            for a, posicoes in destinos.items():
+                U = frozenset(posicoes)
+                if not U:
+                    continue
+                if U not in estados:
+                    if limite_estados is not None and len(estados) >= limite_estados:
+                        raise LimiteEstadosExcedido(limite_estados)
+                    estados.add(U)
+                    nao_marcados.append(U)
+                transicoes[(T, a)] = U
 
         # calculo dos estados finais
         pos_hash = next(p for p, nodo in regex.folhas.items() if nodo.valor == "#")
@@ -85,6 +116,7 @@ class ConversorER_AFD:
             transicoes=transicoes_convertidas,
             estado_inicial=estado_inicial,
             estados_finais=estados_finais,
+            alfabeto=regex.alfabeto,
         )
 
     def gerar_nomes(self, estados: frozenset[int] | None) -> str:
@@ -102,3 +134,122 @@ class ConversorER_AFD:
             return "∅"
         else:
             return "{" + ",".join(str(i) for i in sorted(estados)) + "}"
+
+    def estimar_estados(self, regex: ExpressaoRegular) -> int:
+        """Estima, sem construir o AFD, quantos estados ele pode ter.
+
+        A explosão de estados acontece quando, dentro de um fecho, um símbolo
+        pode tanto continuar no fecho quanto sair dele por uma posição fora
+        de fecho (ex.: `(a|b)*a(a|b)(a|b)`): o AFD precisa lembrar, para cada
+        um dos próximos k símbolos, se a saída foi tentada, o que leva a até
+        2^k estados, onde k é o comprimento da maior sequência de posições
+        fora de fecho que começa nessa saída ambígua.
+
+        A estimativa é um indicador de risco, não um limite exato: expressões
+        como `(a|b)*abbb` também são apontadas, mas têm AFD mínimo pequeno.
+
+        Args:
+            regex: Expressão regular (é processada, se ainda não foi).
+
+        Returns:
+            Número estimado de estados.
+        """
+        raiz = regex.processar()
+        simbolos_posicao = simbolos_posicoes(regex)
+
+        # posições dentro de algum fecho
+        em_fecho: set[int] = set()
+        pendentes: list[tuple[NodoER, bool]] = [(raiz, False)]
+        while pendentes:
+            nodo, dentro = pendentes.pop()
+            dentro = dentro or nodo.tipo == "*"
+            if nodo.tipo in ["SIMBOLO", "CLASSE"] and dentro:
+                em_fecho.add(nodo.pos)
+            for filho in (nodo.nodo_esquerda, nodo.nodo_direita):
+                if filho:
+                    pendentes.append((filho, dentro))
+
+        # saídas ambíguas: posições fora de fecho que competem, no mesmo
+        # conjunto de seguintes, com posições de fecho de símbolo em comum
+        saidas: set[int] = set()
+        conjuntos = [raiz.firstpos] + [n.followpos for n in regex.folhas.values()]
+        for seguintes in conjuntos:
+            simbolos_fecho = {
+                a for q in seguintes if q in em_fecho for a in simbolos_posicao[q]
+            }
+            if not simbolos_fecho:
+                continue
+            for p in seguintes:
+                if p not in em_fecho and simbolos_fecho.intersection(simbolos_posicao[p]):
+                    saidas.add(p)
+
+        # fora de fecho, followpos só aponta para posições maiores (sem ciclos)
+        cadeia: dict[int, int] = {}
+        for p in sorted(regex.folhas, reverse=True):
+            if p in em_fecho or not simbolos_posicao[p]:
+                cadeia[p] = 0
+                continue
+            seguintes = [cadeia.get(s, 0) for s in regex.folhas[p].followpos if s > p]
+            cadeia[p] = 1 + max(seguintes, default=0)
+
+        k = max((cadeia[p] for p in saidas), default=0)
+        return max(len(regex.folhas), 2 ** min(k, 62))
+
+    def afd_preguicoso(self, regex: ExpressaoRegular) -> "AFDPreguicoso":
+        """AFD por posições construído sob demanda, usado acima do limite de estados."""
+        return AFDPreguicoso(regex)
+
+
+class AFDPreguicoso:
+    """AFD construído sob demanda a partir das posições de uma ER.
+
+    Usado no lugar do AFD completo quando este excede o limite de estados:
+    os estados são conjuntos de posições, como em `ConversorER_AFD.gerar_afd`,
+    mas cada transição só é calculada quando a entrada a percorre. As
+    transições calculadas ficam em um cache que é descartado ao atingir
+    `limite_cache`, então a memória é limitada qualquer que seja o tamanho do
+    AFD completo; o custo por caractere fica proporcional ao número de
+    posições ativas.
+    """
+
+    def __init__(self, regex: ExpressaoRegular, limite_cache: int = 4096):
+        raiz = regex.processar()
+        self.alfabeto = regex.alfabeto
+        self.inicial: frozenset[int] = frozenset(raiz.firstpos)
+        self.simbolos_posicao = simbolos_posicoes(regex)
+        self.followpos: dict[int, frozenset[int]] = {
+            p: frozenset(nodo.followpos) for p, nodo in regex.folhas.items()
+        }
+        self.pos_hash = next(p for p, nodo in regex.folhas.items() if nodo.valor == "#")
+        self.limite_cache = limite_cache
+        self.cache: dict[tuple[frozenset[int], str], frozenset[int]] = {}
+
+    def transicao(self, estado: frozenset[int], simbolo: str) -> frozenset[int]:
+        """Conjunto de posições alcançado a partir de `estado` por `simbolo`."""
+        chave = (estado, simbolo)
+        destino = self.cache.get(chave)
+        if destino is None:
+            posicoes: set[int] = set()
+            for p in estado:
+                if simbolo in self.simbolos_posicao[p]:
+                    posicoes |= self.followpos[p]
+            destino = frozenset(posicoes)
+            if len(self.cache) >= self.limite_cache:
+                self.cache.clear()
+            self.cache[chave] = destino
+        return destino
+
+    def maior_prefixo(self, texto: str, inicio: int = 0) -> int:
+        """Comprimento do maior prefixo de `texto[inicio:]` aceito, ou -1."""
+        estado = self.inicial
+        maior = 0 if self.pos_hash in estado else -1
+        for i in range(inicio, len(texto)):
+            simbolo = (
+                self.alfabeto.atomo(texto[i]) if self.alfabeto is not None else texto[i]
+            )
+            estado = self.transicao(estado, simbolo)
+            if not estado:
+                break
+            if self.pos_hash in estado:
+                maior = i - inicio + 1
+        return maior
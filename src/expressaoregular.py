@@ -3,6 +3,14 @@ from __future__ import annotations
 from dataclasses import dataclass, field
 from typing import override
 
+from src.intervalos import (
+    AlfabetoIntervalos,
+    Intervalo,
+    intervalos_simbolo,
+    ler_grupo,
+    normalizar,
+)
+
 EPSILON = "&"
 MAPA_OPERADORES = {
     ">=": "≥",
@@ -33,7 +41,7 @@ class NodoER:
     Referência: Aho et al. (2006), Seção 3.9, Figura 3.60.
 
     Attributes:
-        tipo: Tipo do nodo ("SIMBOLO", "|", ".", "*").
+        tipo: Tipo do nodo ("SIMBOLO", "CLASSE", "|", ".", "*").
         valor: Símbolo para folhas, None para operadores.
         pos: Posição única da folha na expressão.
         nullable: True se o nodo pode gerar string vazia.
@@ -42,6 +50,7 @@ class NodoER:
         followpos: Conjunto de posições que podem seguir esta posição.
         nodo_esquerda: Subárvore esquerda (para operadores binários e unários).
         nodo_direita: Subárvore direita (para operadores binários).
+        classe: Conjunto de símbolos de uma folha do tipo "CLASSE".
     """
 
     # valor nodo
@@ -59,12 +68,15 @@ class NodoER:
     nodo_esquerda: NodoER | None = None
     nodo_direita: NodoER | None = None
 
+    # conjunto de símbolos (caracteres ou intervalos) de uma folha do tipo CLASSE
+    classe: frozenset[str | Intervalo] | None = None
+
     def calcula_posicoes(self) -> None:
         """
         Calcula nullable, firstpos e lastpos para um nodo da árvore da ER.
 
         As regras são:
-        - Para folha (símbolo): nullable = false (exceto ε), firstpos = lastpos = {pos}
+        - Para folha (símbolo ou classe): nullable = false (exceto ε), firstpos = lastpos = {pos}
         - Para união (|): nullable = c1.nullable OU c2.nullable
         - Para concatenação (.): nullable = c1.nullable E c2.nullable
         - Para fecho (*): nullable = true
@@ -78,6 +90,10 @@ class NodoER:
                 self.nullable = False
                 self.firstpos = {self.pos}
                 self.lastpos = {self.pos}
+        elif self.tipo == "CLASSE":
+            self.nullable = False
+            self.firstpos = {self.pos}
+            self.lastpos = {self.pos}
         elif self.tipo == "|":
             if self.nodo_esquerda and self.nodo_direita:
                 self.nullable = (
@@ -132,6 +148,8 @@ class NodoER:
             if self.valor == EPSILON:
                 return EPSILON
             return f"{self.valor}({self.pos})"
+        elif self.tipo == "CLASSE" and self.classe is not None:
+            return f"[{''.join(sorted(str(s) for s in self.classe))}]({self.pos})"
         elif self.tipo == "*":
             return f"({self.nodo_esquerda})*"
         elif self.tipo == "|":
@@ -142,6 +160,215 @@ class NodoER:
             return self.tipo
 
 
+class SimplificadorER:
+    """Reescritas algébricas sobre a árvore de uma expressão regular.
+
+    Aplicada antes do cálculo de nullable/firstpos/lastpos/followpos, reduz o
+    número de posições (folhas) da árvore e, com isso, o tamanho dos
+    conjuntos followpos e dos estados da construção direta do AFD. O número
+    de estados não diminui: a construção por subconjuntos já reúne posições
+    redundantes (ex.: as duas de `a|a`) em um mesmo estado. Todas as
+    reescritas preservam a linguagem reconhecida:
+
+    - r|r → r e (r|s)|t → r|s|t (uniões achatadas e sem duplicatas)
+    - a|b|c → [abc] (alternativas de um único símbolo viram uma classe)
+    - ab|ac → a(b|c) (fatoração à esquerda de prefixos comuns)
+    - r|ε → r quando r já é anulável; r.ε → r
+    - (r*)* → r*, (r|ε)* → r*, (r*|s)* → (r|s)*, ε* → ε, r*.r* → r*
+    """
+
+    def simplificar(self, nodo: NodoER) -> NodoER:
+        """Retorna uma nova árvore, equivalente a `nodo`, simplificada.
+
+        As folhas da nova árvore ainda não possuem posições válidas; elas são
+        atribuídas por `ExpressaoRegular.numerar_posicoes`.
+
+        Args:
+            nodo: Raiz da árvore original (não é modificada).
+
+        Returns:
+            Raiz da árvore simplificada.
+        """
+        if nodo.tipo == "|":
+            return self._simplificar_uniao(self._alternativas(nodo))
+        if nodo.tipo == ".":
+            return self._simplificar_concatenacao(
+                [self.simplificar(f) for f in self._fatores(nodo)]
+            )
+        if nodo.tipo == "*" and nodo.nodo_esquerda:
+            return self._simplificar_fecho(self.simplificar(nodo.nodo_esquerda))
+        if nodo.tipo == "CLASSE" and nodo.classe is not None:
+            return self._classe(nodo.classe)
+        return NodoER("SIMBOLO", nodo.valor)
+
+    def _alternativas(self, nodo: NodoER) -> list[NodoER]:
+        """Achata uniões aninhadas, simplificando cada alternativa."""
+        if nodo.tipo == "|" and nodo.nodo_esquerda and nodo.nodo_direita:
+            return self._alternativas(nodo.nodo_esquerda) + self._alternativas(
+                nodo.nodo_direita
+            )
+        simplificado = self.simplificar(nodo)
+        if simplificado.tipo == "|":
+            return self._alternativas(simplificado)
+        return [simplificado]
+
+    def _fatores(self, nodo: NodoER) -> list[NodoER]:
+        """Achata concatenações aninhadas em uma lista de fatores."""
+        if nodo.tipo == "." and nodo.nodo_esquerda and nodo.nodo_direita:
+            return self._fatores(nodo.nodo_esquerda) + self._fatores(nodo.nodo_direita)
+        return [nodo]
+
+    def _simplificar_uniao(self, alternativas: list[NodoER]) -> NodoER:
+        """Deduplica, agrupa em classes e fatora alternativas de uma união."""
+        tinha_epsilon = False
+        unicas: dict[str, NodoER] = {}
+        for alternativa in alternativas:
+            if self._eh_epsilon(alternativa):
+                tinha_epsilon = True
+                continue
+            unicas.setdefault(self.chave(alternativa), alternativa)
+
+        # alternativas de um único símbolo se juntam na primeira delas
+        restantes: list[NodoER] = []
+        simbolos: set[str | Intervalo] = set()
+        indice_classe: int | None = None
+        for alternativa in unicas.values():
+            simbolos_alternativa = self._simbolos(alternativa)
+            if simbolos_alternativa is None:
+                restantes.append(alternativa)
+                continue
+            if indice_classe is None:
+                indice_classe = len(restantes)
+                restantes.append(alternativa)
+            simbolos |= simbolos_alternativa
+        if indice_classe is not None:
+            restantes[indice_classe] = self._classe(frozenset(simbolos))
+
+        restantes = self._fatorar(restantes)
+
+        if tinha_epsilon and not any(self.anulavel(r) for r in restantes):
+            restantes.append(NodoER("SIMBOLO", EPSILON))
+
+        if not restantes:
+            return NodoER("SIMBOLO", EPSILON)
+
+        nodo = restantes[0]
+        for alternativa in restantes[1:]:
+            nodo = NodoER("|", nodo_esquerda=nodo, nodo_direita=alternativa)
+        return nodo
+
+    def _fatorar(self, alternativas: list[NodoER]) -> list[NodoER]:
+        """Fatora à esquerda alternativas que começam pelo mesmo fator."""
+        grupos: dict[str, list[list[NodoER]]] = {}
+        for alternativa in alternativas:
+            fatores = self._fatores(alternativa)
+            grupos.setdefault(self.chave(fatores[0]), []).append(fatores)
+
+        resultado: list[NodoER] = []
+        for grupo in grupos.values():
+            if len(grupo) == 1:
+                resultado.append(self._simplificar_concatenacao(grupo[0]))
+                continue
+
+            sufixos = [self._simplificar_concatenacao(f[1:]) for f in grupo]
+            resultado.append(
+                self._simplificar_concatenacao(
+                    [grupo[0][0], self._simplificar_uniao(sufixos)]
+                )
+            )
+        return resultado
+
+    def _simplificar_concatenacao(self, fatores: list[NodoER]) -> NodoER:
+        """Remove ε e junta fechos repetidos de uma sequência de fatores."""
+        resultado: list[NodoER] = []
+        for fator in fatores:
+            for f in self._fatores(fator):
+                if self._eh_epsilon(f):
+                    continue
+                # r*.r* → r*
+                if (
+                    f.tipo == "*"
+                    and resultado
+                    and resultado[-1].tipo == "*"
+                    and self.chave(resultado[-1]) == self.chave(f)
+                ):
+                    continue
+                resultado.append(f)
+
+        if not resultado:
+            return NodoER("SIMBOLO", EPSILON)
+
+        nodo = resultado[0]
+        for fator in resultado[1:]:
+            nodo = NodoER(".", nodo_esquerda=nodo, nodo_direita=fator)
+        return nodo
+
+    def _simplificar_fecho(self, filho: NodoER) -> NodoER:
+        """Aplica as reescritas de fecho sobre um filho já simplificado."""
+        if self._eh_epsilon(filho) or filho.tipo == "*":
+            return filho
+
+        if filho.tipo == "|":
+            # dentro do fecho, ε e fechos das alternativas são redundantes
+            alternativas = []
+            for alternativa in self._alternativas(filho):
+                if self._eh_epsilon(alternativa):
+                    continue
+                if alternativa.tipo == "*" and alternativa.nodo_esquerda:
+                    alternativa = alternativa.nodo_esquerda
+                alternativas.append(alternativa)
+            filho = self._simplificar_uniao(alternativas)
+            if self._eh_epsilon(filho) or filho.tipo == "*":
+                return filho
+
+        return NodoER("*", nodo_esquerda=filho)
+
+    def _classe(self, simbolos: frozenset[str | Intervalo]) -> NodoER:
+        if len(simbolos) == 1 and isinstance(next(iter(simbolos)), str):
+            return NodoER("SIMBOLO", next(iter(simbolos)))
+        return NodoER("CLASSE", classe=simbolos)
+
+    def _simbolos(self, nodo: NodoER) -> frozenset[str | Intervalo] | None:
+        """Símbolos de uma folha que consome um caractere, ou None."""
+        if nodo.tipo == "CLASSE":
+            return nodo.classe
+        if nodo.tipo == "SIMBOLO" and nodo.valor not in [EPSILON, "#", None]:
+            return frozenset([nodo.valor])
+        return None
+
+    def _eh_epsilon(self, nodo: NodoER) -> bool:
+        return nodo.tipo == "SIMBOLO" and nodo.valor == EPSILON
+
+    def anulavel(self, nodo: NodoER) -> bool:
+        """Indica se a subárvore gera a string vazia."""
+        if nodo.tipo == "SIMBOLO":
+            return nodo.valor == EPSILON
+        if nodo.tipo == "*":
+            return True
+        esquerda = nodo.nodo_esquerda is not None and self.anulavel(nodo.nodo_esquerda)
+        direita = nodo.nodo_direita is not None and self.anulavel(nodo.nodo_direita)
+        if nodo.tipo == "|":
+            return esquerda or direita
+        if nodo.tipo == ".":
+            return esquerda and direita
+        return False
+
+    def chave(self, nodo: NodoER) -> str:
+        """Representação estrutural de uma subárvore, independente de posições."""
+        if nodo.tipo == "SIMBOLO":
+            return repr(nodo.valor)
+        if nodo.tipo == "CLASSE" and nodo.classe is not None:
+            return "[" + repr(sorted(str(s) for s in nodo.classe)) + "]"
+        if nodo.tipo == "*" and nodo.nodo_esquerda:
+            return f"({self.chave(nodo.nodo_esquerda)})*"
+        if nodo.nodo_esquerda and nodo.nodo_direita:
+            return (
+                f"({self.chave(nodo.nodo_esquerda)}{nodo.tipo}"
+                f"{self.chave(nodo.nodo_direita)})"
+            )
+        return nodo.tipo
+
+
 class ExpressaoRegular:
     """Processador de expressões regulares para construção direta de AFD.
 
@@ -152,24 +379,44 @@ class ExpressaoRegular:
     Referência: Aho et al. (2006), Seção 3.9, pp. 159-167.
     """
 
-    def __init__(self, expressao: str) -> None:
+    def __init__(
+        self,
+        expressao: str,
+        simplificar: bool = True,
+        alfabeto: AlfabetoIntervalos | None = None,
+        macros: dict[str, NodoER] | None = None,
+    ) -> None:
         """Inicializa processador de ER.
 
         Adiciona concatenação explícita e marcador de fim (#) automaticamente.
 
         Args:
             expressao: String contendo a expressão regular.
+            simplificar: Se True, aplica `SimplificadorER` à árvore antes do
+                cálculo das posições.
+            alfabeto: Partição em intervalos compartilhada com outras
+                expressões. Se None, a expressão só usa intervalos quando
+                contém grupos `[...]`, com uma partição própria.
+            macros: Subárvores já construídas de definições auxiliares,
+                referenciadas na expressão como `{nome}`.
         """
+        self.macros: dict[str, NodoER] = macros or {}
         # Adiciona concatenação explícita com # para marcar fim da expressão
-        expressao = expressao
-        self.expressao: list[str] = list(f"({self.formatar_expressao(expressao)}).#")
+        self.expressao: list[str] = ["(", *self.formatar_expressao(expressao), ")", ".", "#"]
         self.posicao: int = 1
         self.folhas: dict[int, NodoER] = {}
+        self.simplificar: bool = simplificar
+        self.alfabeto: AlfabetoIntervalos | None = alfabeto
+        self.raiz: NodoER | None = None
+        self.processada: bool = False
 
-    def formatar_expressao(self, expressao: str) -> str:
+    def formatar_expressao(self, expressao: str) -> list[str]:
         """
         Insere concatenação explícita (.) onde necessário,
         tratando corretamente sequências escapadas como \\.
+
+        Grupos `[...]` e referências `{nome}` a macros conhecidas são mantidos
+        como um único token.
         """
 
         def eh_literal(token: str) -> bool:
@@ -211,6 +458,32 @@ class ExpressaoRegular:
                 i += 2
                 continue
 
+            fim = -1
+            if atual == "[":
+                fim = i + 1
+                while fim < len(expressao) and expressao[fim] != "]":
+                    fim += 2 if expressao[fim] == "\\" else 1
+                if fim >= len(expressao):
+                    raise ValueError(f"Grupo não fechado: {expressao[i:]}")
+            elif atual == "{":
+                fim = expressao.find("}", i)
+                if expressao[i + 1 : fim] not in self.macros:
+                    fim = -1  # chave literal
+
+            if fim != -1:
+
+                if anterior is not None and (
+                    eh_literal(anterior)
+                    or anterior in [")", "*", "+", "?"]
+                    or anterior == "ESCAPED"
+                ):
+                    resultado.append(".")
+
+                resultado.append(expressao[i : fim + 1])
+                anterior = "ESCAPED"
+                i = fim + 1
+                continue
+
             if anterior is not None:
                 anterior_simbolo = (
                     eh_literal(anterior)
@@ -227,7 +500,7 @@ class ExpressaoRegular:
             anterior = atual
             i += 1
 
-        return "".join(resultado)
+        return resultado
 
     def parse(self) -> NodoER:
         """
@@ -325,6 +598,19 @@ class ExpressaoRegular:
             _ = self.consume(")")
             return nodo
 
+        if atual is not None and len(atual) > 1 and atual.startswith("["):
+            # Grupo de caracteres: uma folha com os intervalos do grupo
+            token = self.consume(None)
+            nodo = NodoER("CLASSE", pos=self.posicao, classe=ler_grupo(token[1:-1]))
+            self.folhas[self.posicao] = nodo
+            self.posicao += 1
+            return nodo
+
+        if atual is not None and len(atual) > 1 and atual.startswith("{"):
+            # Referência a macro: cópia da subárvore já construída, com novas posições
+            token = self.consume(None)
+            return self.copiar_subarvore(self.macros[token[1:-1]])
+
         if atual == "\\":
             # Símbolo escapado
             _ = self.consume("\\")
@@ -383,11 +669,13 @@ class ExpressaoRegular:
         Returns:
             Nova subárvore com mesma estrutura mas novas posições para símbolos.
         """
-        if nodo.tipo == "SIMBOLO":
+        if nodo.tipo in ["SIMBOLO", "CLASSE"]:
             # Epsilon mantém posição -1, outros símbolos recebem nova posição
             if nodo.valor == EPSILON:
                 return NodoER("SIMBOLO", EPSILON, -1)
-            novo: NodoER = NodoER("SIMBOLO", nodo.valor, self.posicao)
+            novo: NodoER = NodoER(
+                nodo.tipo, nodo.valor, self.posicao, classe=nodo.classe
+            )
             self.folhas[self.posicao] = novo
             self.posicao += 1
             return novo
@@ -404,6 +692,87 @@ class ExpressaoRegular:
             nodo.tipo, nodo.valor, nodo_esquerda=esquerda, nodo_direita=direita
         )
 
+    def intervalos_folhas(self, raiz: NodoER) -> list[list[tuple[int, int]]]:
+        """Intervalos de codepoints cobertos por cada folha que consome símbolo."""
+        conjuntos: list[list[tuple[int, int]]] = []
+        pendentes: list[NodoER] = [raiz]
+        while pendentes:
+            nodo = pendentes.pop()
+            if nodo.tipo == "CLASSE" and nodo.classe is not None:
+                conjuntos.append(normalizar([intervalos_simbolo(s) for s in nodo.classe]))
+            elif nodo.tipo == "SIMBOLO" and nodo.valor not in [EPSILON, "#", None]:
+                conjuntos.append([intervalos_simbolo(nodo.valor)])
+            pendentes.extend(
+                filho for filho in (nodo.nodo_esquerda, nodo.nodo_direita) if filho
+            )
+        return conjuntos
+
+    def atomizar(self, raiz: NodoER) -> bool:
+        """Troca os símbolos das folhas pelos átomos de `self.alfabeto`.
+
+        Sem alfabeto compartilhado, só atua se a expressão tiver grupos com
+        intervalos, criando uma partição própria. Depois disso todas as folhas
+        são do tipo CLASSE e seus símbolos são `Intervalo`s disjuntos.
+
+        Returns:
+            True se a árvore passou a usar intervalos.
+        """
+        if self.alfabeto is None:
+            if not any(
+                isinstance(s, Intervalo)
+                for nodo in self._folhas_arvore(raiz)
+                for s in (nodo.classe or ())
+            ):
+                return False
+            self.alfabeto = AlfabetoIntervalos(self.intervalos_folhas(raiz))
+
+        for nodo in self._folhas_arvore(raiz):
+            if nodo.tipo == "CLASSE" and nodo.classe is not None:
+                intervalos = normalizar([intervalos_simbolo(s) for s in nodo.classe])
+            elif nodo.valor not in [EPSILON, "#", None]:
+                intervalos = [intervalos_simbolo(nodo.valor)]
+            else:
+                continue
+            nodo.tipo = "CLASSE"
+            nodo.valor = None
+            nodo.classe = self.alfabeto.atomos_de(intervalos)
+        return True
+
+    def _folhas_arvore(self, raiz: NodoER) -> list[NodoER]:
+        folhas: list[NodoER] = []
+        pendentes: list[NodoER] = [raiz]
+        while pendentes:
+            nodo = pendentes.pop()
+            if nodo.tipo in ["SIMBOLO", "CLASSE"]:
+                folhas.append(nodo)
+            pendentes.extend(
+                filho for filho in (nodo.nodo_esquerda, nodo.nodo_direita) if filho
+            )
+        return folhas
+
+    def numerar_posicoes(self, raiz: NodoER | None) -> None:
+        """Atribui novas posições às folhas da árvore, da esquerda para a direita.
+
+        Usado após a simplificação, que cria novos nodos e descarta parte das
+        folhas originais. Reconstrói `self.folhas`.
+        """
+        self.folhas = {}
+        self.posicao = 1
+
+        pendentes: list[NodoER] = [raiz] if raiz else []
+        while pendentes:
+            nodo = pendentes.pop()
+            if nodo.tipo in ["SIMBOLO", "CLASSE"]:
+                if nodo.valor != EPSILON:
+                    nodo.pos = self.posicao
+                    self.folhas[self.posicao] = nodo
+                    self.posicao += 1
+                continue
+            if nodo.nodo_direita:
+                pendentes.append(nodo.nodo_direita)
+            if nodo.nodo_esquerda:
+                pendentes.append(nodo.nodo_esquerda)
+
     def calcular_followpos(self, raiz: NodoER | None) -> None:
         """
         Calcula o conjunto followpos de todos os nodos da árvore.
@@ -439,18 +808,52 @@ class ExpressaoRegular:
             self.visitar(n.nodo_direita)
             n.calcula_posicoes()
 
+    def arvore(self) -> NodoER:
+        """Retorna a árvore da ER aumentada, já simplificada se configurado.
+
+        A árvore é construída uma única vez e reaproveitada nas chamadas seguintes.
+        """
+        if self.raiz is None:
+            raiz = self.parse()
+            if self.simplificar:
+                raiz = SimplificadorER().simplificar(raiz)
+            self.raiz = raiz
+        return self.raiz
+
+    def subarvore(self) -> NodoER:
+        """Retorna a árvore da ER sem o marcador de fim (#).
+
+        Usada para compilar macros, cujas subárvores são copiadas para dentro
+        das expressões que as referenciam.
+        """
+        raiz = self.arvore()
+        if raiz.tipo == "." and raiz.nodo_esquerda:
+            return raiz.nodo_esquerda
+        # a expressão inteira se reduziu a ε
+        return NodoER("SIMBOLO", EPSILON)
+
     def processar(self) -> NodoER:
         """
         Processa a expressão regular e retorna a raiz da árvore construída.
 
         Passos:
         1. Constrói árvore da ER aumentada (adiciona # no final)
-        2. Calcula nullable, firstpos, lastpos para cada nodo
-        3. Calcula followpos para cada posição
+        2. Simplifica a árvore (opcional)
+        3. Troca os símbolos das folhas por intervalos, se houver alfabeto
+        4. Calcula nullable, firstpos, lastpos para cada nodo
+        5. Calcula followpos para cada posição
+
+        Chamadas seguintes retornam a mesma árvore sem recalcular.
         """
-        raiz = self.parse()
+        raiz = self.arvore()
+        if self.processada:
+            return raiz
+
+        if self.atomizar(raiz) or self.simplificar:
+            self.numerar_posicoes(raiz)
 
         self.visitar(raiz)
         self.calcular_followpos(raiz)
+        self.processada = True
 
         return raiz
@@ -1,5 +1,6 @@
 from .simbolos import Simbolo, Terminal, NaoTerminal, Epsilon, EPSILON, NAO_TERMINAL_ESCAPE
 from .producao import Producao
+from .indice_simbolos import BIT_EPSILON, BIT_FIM, IndiceSimbolos, VisaoConjuntos
 from .gramatica import Gramatica
 from .handler_gramatica import HandlerGramatica
 
@@ -12,5 +13,9 @@ __all__ = [
     'Epsilon',
     'Producao',
     'Gramatica',
+    'IndiceSimbolos',
+    'VisaoConjuntos',
+    'BIT_EPSILON',
+    'BIT_FIM',
     'HandlerGramatica',
 ]
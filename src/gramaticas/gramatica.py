@@ -1,25 +1,35 @@
 from typing import List
 from .simbolos import Terminal, NaoTerminal
 from .producao import Producao
+from .indice_simbolos import IndiceSimbolos
 
 
 class Gramatica:
     """Representa uma gramática livre de contexto completa.
-    
+
     Agrupa todos os componentes de uma GLC:
     - Produções
     - Símbolos terminais e não-terminais
     - Símbolo inicial
-    
+
     Referência: Aho et al. (2006), Seção 4.1, Definição 4.1, pp. 191-194.
-    
+
+    Além dos componentes, mantém índices construídos uma única vez e usados
+    pelas análises no lugar de varreduras das produções: produções por
+    cabeça, ocorrências de cada não-terminal, alcançáveis e anuláveis. Editar
+    as produções por `adicionar_producao`, `remover_producao` ou atribuindo
+    `producoes` invalida os índices (e incrementa `versao`); quem alterar a
+    lista diretamente deve chamar `invalidar_indices`.
+
     Attributes:
         producoes: Lista de produções da gramática.
         terminais: Conjunto de símbolos terminais.
         nao_terminais: Conjunto de símbolos não-terminais.
         simbolo_inicial: Símbolo inicial da gramática.
+        simbolos: Ids inteiros densos de todos os símbolos (ver IndiceSimbolos).
+        versao: Incrementada a cada edição das produções.
     """
-    
+
     def __init__(
         self,
         producoes: List[Producao],
@@ -28,29 +38,172 @@ class Gramatica:
         simbolo_inicial: NaoTerminal,
     ):
         """Inicializa uma gramática.
-        
+
         Args:
             producoes: Lista de produções.
             terminais: Conjunto de símbolos terminais.
             nao_terminais: Conjunto de símbolos não-terminais.
             simbolo_inicial: Símbolo inicial.
         """
-        self.producoes = producoes
+        self._producoes = producoes
         self.terminais = terminais
         self.nao_terminais = nao_terminais
         self.simbolo_inicial = simbolo_inicial
+        self.simbolos = IndiceSimbolos.de_gramatica(self)
+        self.versao = 0
+
+        self._producoes_por_cabeca: dict[NaoTerminal, List[Producao]] = {}
+        self._ocorrencias: dict[NaoTerminal, List[tuple[Producao, int]]] = {}
+        self._alcancaveis: set[NaoTerminal] = set()
+        self._anulaveis: set[NaoTerminal] = set()
+        self._indices_validos = False
+        self._construir_indices()
+
+    @property
+    def producoes(self) -> List[Producao]:
+        return self._producoes
+
+    @producoes.setter
+    def producoes(self, producoes: List[Producao]):
+        self._producoes = producoes
+        self.invalidar_indices()
+
+    def adicionar_producao(self, producao: Producao):
+        """Acrescenta uma produção, registrando seus símbolos na gramática."""
+        self._producoes.append(producao)
+        self.nao_terminais.add(producao.cabeca)
+        for simbolo in producao.corpo:
+            if isinstance(simbolo, NaoTerminal):
+                self.nao_terminais.add(simbolo)
+            else:
+                self.terminais.add(simbolo)
+        self.invalidar_indices()
+
+    def remover_producao(self, producao: Producao):
+        """Remove uma produção (os símbolos continuam declarados)."""
+        self._producoes.remove(producao)
+        self.invalidar_indices()
+
+    def invalidar_indices(self):
+        """Marca os índices como desatualizados; são refeitos no próximo uso."""
+        self._indices_validos = False
+        self.versao += 1
+
+    def _construir_indices(self):
+        """Constrói todos os índices em uma passada pelas produções."""
+        por_cabeca: dict[NaoTerminal, List[Producao]] = {
+            nt: [] for nt in self.nao_terminais
+        }
+        ocorrencias: dict[NaoTerminal, List[tuple[Producao, int]]] = {
+            nt: [] for nt in self.nao_terminais
+        }
+
+        for producao in self._producoes:
+            self.simbolos.internar(producao.cabeca)
+            por_cabeca.setdefault(producao.cabeca, []).append(producao)
+            for posicao, simbolo in enumerate(producao.corpo):
+                self.simbolos.internar(simbolo)
+                if isinstance(simbolo, NaoTerminal):
+                    ocorrencias.setdefault(simbolo, []).append((producao, posicao))
+
+        self._producoes_por_cabeca = por_cabeca
+        self._ocorrencias = ocorrencias
+        self._alcancaveis = self._calcular_alcancaveis()
+        self._anulaveis = self._calcular_anulaveis()
+        self._indices_validos = True
+
+    def _garantir_indices(self):
+        if not self._indices_validos:
+            self._construir_indices()
+
+    def _calcular_alcancaveis(self) -> set[NaoTerminal]:
+        """Não-terminais alcançáveis a partir do símbolo inicial."""
+        alcancaveis = {self.simbolo_inicial}
+        fila = [self.simbolo_inicial]
+        while fila:
+            nt = fila.pop()
+            for producao in self._producoes_por_cabeca.get(nt, ()):
+                for simbolo in producao.corpo:
+                    if isinstance(simbolo, NaoTerminal) and simbolo not in alcancaveis:
+                        alcancaveis.add(simbolo)
+                        fila.append(simbolo)
+        return alcancaveis
+
+    def _calcular_anulaveis(self) -> set[NaoTerminal]:
+        """Não-terminais que derivam ε, em tempo linear.
+
+        Cada produção guarda quantos símbolos do corpo ainda não se sabe
+        serem anuláveis (produções com terminal nunca ficam anuláveis). Quando
+        um não-terminal se torna anulável, só as suas ocorrências são
+        visitadas; a produção que chega a zero torna sua cabeça anulável.
+        """
+        pendentes: dict[Producao, int] = {}
+        anulaveis: set[NaoTerminal] = set()
+        fila: List[NaoTerminal] = []
+
+        for producao in self._producoes:
+            if any(isinstance(s, Terminal) for s in producao.corpo):
+                continue
+            pendentes[producao] = len(producao.corpo)
+            if not producao.corpo and producao.cabeca not in anulaveis:
+                anulaveis.add(producao.cabeca)
+                fila.append(producao.cabeca)
+
+        while fila:
+            nt = fila.pop()
+            for producao, _ in self._ocorrencias.get(nt, ()):
+                if producao not in pendentes:
+                    continue
+                pendentes[producao] -= 1
+                if pendentes[producao] == 0 and producao.cabeca not in anulaveis:
+                    anulaveis.add(producao.cabeca)
+                    fila.append(producao.cabeca)
+
+        return anulaveis
+
+    @property
+    def producoes_por_cabeca(self) -> dict[NaoTerminal, List[Producao]]:
+        self._garantir_indices()
+        return self._producoes_por_cabeca
+
+    @property
+    def ocorrencias(self) -> dict[NaoTerminal, List[tuple[Producao, int]]]:
+        """Para cada não-terminal, as (produção, posição no corpo) em que aparece."""
+        self._garantir_indices()
+        return self._ocorrencias
+
+    @property
+    def alcancaveis(self) -> set[NaoTerminal]:
+        self._garantir_indices()
+        return self._alcancaveis
+
+    @property
+    def anulaveis(self) -> set[NaoTerminal]:
+        self._garantir_indices()
+        return self._anulaveis
 
     def obter_producoes(self, nao_terminal: NaoTerminal) -> List[Producao]:
         """Obtém todas as produções com determinado não-terminal na cabeça.
-        
+
         Args:
             nao_terminal: Não-terminal para buscar produções.
-            
+
         Returns:
             Lista de produções com o não-terminal como cabeça.
         """
-        return [p for p in self.producoes if p.cabeca == nao_terminal]
-    
+        return list(self.producoes_por_cabeca.get(nao_terminal, ()))
+
+    def nao_alcancaveis(self) -> List[NaoTerminal]:
+        """Não-terminais que não aparecem em nenhuma derivação do símbolo inicial."""
+        return sorted(self.nao_terminais - self.alcancaveis, key=str)
+
+    def sem_producoes(self) -> List[NaoTerminal]:
+        """Não-terminais usados em algum corpo mas sem produção própria."""
+        return sorted(
+            (nt for nt, prods in self.producoes_por_cabeca.items() if not prods),
+            key=str,
+        )
+
     def __repr__(self) -> str:
         """Representação textual da gramática."""
         linhas = [
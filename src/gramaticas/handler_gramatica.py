@@ -1,7 +1,9 @@
 from typing import List, Union
 
 from .gramatica import Gramatica
-from .simbolos import Epsilon, NaoTerminal, Terminal
+from .indice_simbolos import BIT_EPSILON, BIT_FIM, VisaoConjuntos
+from .producao import Producao
+from .simbolos import NaoTerminal, Terminal
 
 
 class HandlerGramatica:
@@ -11,6 +13,11 @@ class HandlerGramatica:
     - FIRST: conjunto de terminais que podem iniciar strings derivadas de um símbolo
     - FOLLOW: conjunto de terminais que podem aparecer imediatamente após um não-terminal
 
+    Os conjuntos são calculados sobre os ids de `gramatica.simbolos` e
+    guardados como máscaras de bits (`first_bits`, `follow_bits`); ε e $
+    ocupam os bits reservados `BIT_EPSILON` e `BIT_FIM`. `first_cache` e
+    `follow_cache` são visões que convertem as máscaras em `set[Terminal]`
+    apenas quando consultadas (ex.: para exibição).
     """
 
     def __init__(self, gramatica: Gramatica):
@@ -20,36 +27,163 @@ class HandlerGramatica:
             gramatica: Objeto Gramatica contendo produções e símbolos.
         """
         self.gramatica = gramatica
+        self.simbolos = gramatica.simbolos
 
-        # Caches para FIRST e FOLLOW
-        self.first_cache: dict[Union[Terminal, NaoTerminal], set[Terminal]] = {}
-        self.follow_cache: dict[NaoTerminal, set[Terminal]] = {}
+        # Caches para FIRST e FOLLOW (máscaras de bits por não-terminal)
+        self.first_bits: dict[NaoTerminal, int] = {}
+        self.follow_bits: dict[NaoTerminal, int] = {}
+        self.first_cache = VisaoConjuntos(self.simbolos, self.first_bits)
+        self.follow_cache = VisaoConjuntos(self.simbolos, self.follow_bits)
+        self.anulaveis: set[NaoTerminal] = set()
+
+        # FIRST(corpo[i:]) de cada produção, para i = 0..len(corpo)
+        self.first_sufixos: dict[Producao, list[int]] = {}
+
+        # Por id de não-terminal, preenchidos por calcular_firsts
+        self._anulavel: list[bool] = []
+        self._firsts: list[int] = []
+
+        # Versão da gramática usada nos caches (ver Gramatica.versao)
+        self._versao = gramatica.versao
+
+    def _verificar_versao(self):
+        """Descarta os caches se as produções da gramática foram editadas."""
+        if self._versao != self.gramatica.versao:
+            self.limpar_cache()
+            self._versao = self.gramatica.versao
+
+    def _codificar_producoes(self) -> list[tuple[int, list[int]]]:
+        """Produções como (id da cabeça, códigos do corpo).
+
+        No corpo, um não-terminal de id `n` é codificado como `n` e um
+        terminal de id `t` como `~t` (negativo).
+        """
+        simbolos = self.simbolos
+        return [
+            (
+                simbolos.internar(prod.cabeca),
+                [
+                    simbolos.internar(s)
+                    if isinstance(s, NaoTerminal)
+                    else ~simbolos.internar(s)
+                    for s in prod.corpo
+                ],
+            )
+            for prod in self.gramatica.producoes
+        ]
 
     def _calcular_first_sequencia(
         self, sequencia: List[Union[Terminal, NaoTerminal]]
     ) -> set[Terminal]:
         """Calcula FIRST de uma sequência de símbolos Y1 Y2 ... Yk."""
-        if not sequencia:
-            return {Epsilon()}
+        return self.simbolos.conjunto(self.first_sequencia_bits(sequencia))
 
-        result = set()
-        epsilon = Epsilon()
+    def first_sequencia_bits(
+        self, sequencia: List[Union[Terminal, NaoTerminal]]
+    ) -> int:
+        """FIRST de uma sequência Y1 Y2 ... Yk como máscara de bits."""
+        self._verificar_versao()
+        if not self.first_bits:
+            self.calcular_firsts()
 
+        resultado = 0
         for simbolo in sequencia:
-            if isinstance(simbolo, Terminal):
-                result.add(simbolo)
-                return result
+            first_simbolo = self.get_first_bits(simbolo)
+            resultado |= first_simbolo & ~BIT_EPSILON
+            if not first_simbolo & BIT_EPSILON:
+                return resultado
+
+        # Todos derivam epsilon
+        return resultado | BIT_EPSILON
 
-            # Não-terminal: pegar do cache
-            first_simbolo = self.first_cache.get(simbolo, set())
-            result.update(s for s in first_simbolo if s != epsilon)
+    def calcular_anulaveis(self) -> set[NaoTerminal]:
+        """Obtém os não-terminais que derivam ε (índice `Gramatica.anulaveis`)."""
+        anulaveis = self.gramatica.anulaveis
+        self._anulavel = [nt in anulaveis for nt in self.simbolos.nao_terminais]
+        self.anulaveis = set(anulaveis)
+        return self.anulaveis
 
-            if epsilon not in first_simbolo:
-                return result
+    @staticmethod
+    def _componentes_fortes(dependencias: list[set[int]]) -> List[List[int]]:
+        """Componentes fortemente conexas do grafo de dependências (Tarjan).
 
-        # Todos derivam epsilon
-        result.add(epsilon)
-        return result
+        Versão iterativa, para não esbarrar no limite de recursão em
+        gramáticas grandes.
+
+        Args:
+            dependencias: Para cada vértice (id), os vértices dos quais depende.
+
+        Returns:
+            Componentes em ordem topológica das dependências: cada componente
+            aparece depois de todas as componentes das quais depende.
+        """
+        indice = [-1] * len(dependencias)
+        menor = [0] * len(dependencias)
+        na_pilha = [False] * len(dependencias)
+        pilha: list[int] = []
+        componentes: List[List[int]] = []
+        proximo = 0
+
+        for raiz in range(len(dependencias)):
+            if indice[raiz] >= 0:
+                continue
+
+            indice[raiz] = menor[raiz] = proximo
+            proximo += 1
+            pilha.append(raiz)
+            na_pilha[raiz] = True
+            caminho = [(raiz, iter(dependencias[raiz]))]
+
+            while caminho:
+                v, sucessores = caminho[-1]
+                for w in sucessores:
+                    if indice[w] < 0:
+                        indice[w] = menor[w] = proximo
+                        proximo += 1
+                        pilha.append(w)
+                        na_pilha[w] = True
+                        caminho.append((w, iter(dependencias[w])))
+                        break
+                    if na_pilha[w]:
+                        menor[v] = min(menor[v], indice[w])
+                else:
+                    caminho.pop()
+                    if caminho:
+                        pai = caminho[-1][0]
+                        menor[pai] = min(menor[pai], menor[v])
+
+                    if menor[v] == indice[v]:
+                        componente = []
+                        while True:
+                            w = pilha.pop()
+                            na_pilha[w] = False
+                            componente.append(w)
+                            if w == v:
+                                break
+                        componentes.append(componente)
+
+        return componentes
+
+    def _propagar(self, base: list[int], dependencias: list[set[int]]) -> list[int]:
+        """Resolve conjuntos da forma X ⊇ base(X) ∪ ⋃ {R(Y) : Y ∈ dependências(X)}.
+
+        Os membros de uma componente fortemente conexa têm o mesmo conjunto,
+        e as componentes são resolvidas em ordem topológica, então cada
+        aresta do grafo é visitada uma única vez (em vez de uma varredura da
+        gramática inteira por rodada até o ponto fixo).
+        """
+        resultado = [0] * len(base)
+
+        for componente in self._componentes_fortes(dependencias):
+            conjunto = 0
+            for nt in componente:
+                conjunto |= base[nt]
+                for dep in dependencias[nt]:
+                    conjunto |= resultado[dep]
+            for nt in componente:
+                resultado[nt] = conjunto
+
+        return resultado
 
     def calcular_firsts(self):
         """
@@ -61,64 +195,107 @@ class HandlerGramatica:
                 i. Se ε ∈ FIRST(Y1), então FIRST(Y2) ∈ FIRST(X)
                 ii. Se ε ∈ FIRST(Y2), ...
                 iii. Se ε ∈ FIRST(Yk) e ... e ε ∈ FIRST(Y1) , então ε ∈ FIRST(X)
-        """
-        # Inicializar FIRST para todos X ∈ N
-        for nt in self.gramatica.nao_terminais:
-            self.first_cache[nt] = set()
-
-        e = Epsilon()
-        m = True
 
-        # Iterar até ponto fixo
-        while m:
-            m = False
-
-            for prod in self.gramatica.producoes:
-                X = prod.cabeca
-                corpo = prod.corpo
-                prev_cache = len(self.first_cache[X])
+        Com os anuláveis já conhecidos, cada produção X ::= Y1...Yk é lida uma
+        única vez: os terminais alcançados após um prefixo anulável entram na
+        base de X, e os não-terminais viram arestas X → Yi do grafo de
+        dependências, resolvido por componentes fortemente conexas.
+        """
+        self._verificar_versao()
+        self.calcular_anulaveis()
+        anulavel = self._anulavel
+        producoes = self._codificar_producoes()
+
+        base = [0] * len(anulavel)
+        dependencias: list[set[int]] = [set() for _ in anulavel]
+
+        for X, corpo in producoes:
+            for Yi in corpo:
+                if Yi < 0:
+                    # Regra 1: Se Yi ∈ T então Yi ∈ FIRST(X)
+                    base[X] |= 1 << ~Yi
+                    break
+
+                # Regra 2(c): FIRST(Yi) - {ε} ⊆ FIRST(X)
+                if Yi != X:
+                    dependencias[X].add(Yi)
+                if not anulavel[Yi]:
+                    break
+
+        firsts = self._propagar(base, dependencias)
+
+        # Regras 2(b) e 2(c)(iii): ε ∈ FIRST(X) se X é anulável
+        self._firsts = [
+            first | BIT_EPSILON if sim else first
+            for first, sim in zip(firsts, anulavel)
+        ]
+        self.first_bits.clear()
+        self.first_bits.update(zip(self.simbolos.nao_terminais, self._firsts))
 
-                # Regra 2(b): Se X ::= ε ∈ P
-                if not corpo:
-                    self.first_cache[X].add(e)
+        return self.first_cache
 
-                # Regra 2(a) e 2(c): Se X ::= Y1Y2...Yk ∈ P
-                else:
-                    for Yi in corpo:
-                        if isinstance(Yi, Terminal):
-                            # Regra 1: Se Yi ∈ T então Yi ∈ FIRST(X)
-                            self.first_cache[X].add(Yi)
-                            break
-                        else:
-                            # Yi ∈ N
-                            # Regra 2(c): Adicionar FIRST(Yi) - {ε} a FIRST(X)
-                            first_Yi = self.first_cache[Yi]
-                            for s in first_Yi:
-                                if s != e:
-                                    self.first_cache[X].add(s)
-
-                            # Se ε ∉ FIRST(Yi), parar
-                            if e not in first_Yi:
-                                break
-                    else:
-                        # Regra 2(c)(iii): Todos Yi derivam ε, então ε ∈ FIRST(X)
-                        self.first_cache[X].add(e)
+    def get_first_bits(self, simbolo: Union[Terminal, NaoTerminal]) -> int:
+        """Retorna FIRST de um símbolo como máscara de bits."""
+        if isinstance(simbolo, Terminal):
+            return self.simbolos.bit(simbolo)
 
-                if len(self.first_cache[X]) > prev_cache:
-                    m = True
+        # Calcular todos os FIRSTs se cache vazio
+        self._verificar_versao()
+        if not self.first_bits:
+            self.calcular_firsts()
 
-        return self.first_cache
+        return self.first_bits.get(simbolo, 0)
 
     def get_first(self, simbolo: Union[Terminal, NaoTerminal]) -> set[Terminal]:
         """Retorna FIRST de um símbolo (usa cache se disponível)."""
         if isinstance(simbolo, Terminal):
             return {simbolo}
 
-        # Calcular todos os FIRSTs se cache vazio
-        if not self.first_cache:
+        return self.simbolos.conjunto(self.get_first_bits(simbolo))
+
+    def calcular_first_sufixos(self) -> dict[Producao, list[int]]:
+        """Calcula FIRST(corpo[i:]) para toda produção e toda posição i.
+
+        Cada corpo é percorrido uma única vez, da direita para a esquerda. O
+        bit ε de cada máscara indica se o sufixo é anulável, e a última
+        posição (sufixo vazio) vale sempre `BIT_EPSILON`.
+
+        Returns:
+            Para cada produção, a lista de máscaras com len(corpo) + 1 itens.
+        """
+        self._verificar_versao()
+        if not self.first_bits:
             self.calcular_firsts()
+        firsts = self._firsts
+
+        self.first_sufixos.clear()
+        for prod, (_, corpo) in zip(
+            self.gramatica.producoes, self._codificar_producoes()
+        ):
+            sufixos = [BIT_EPSILON] * (len(corpo) + 1)
+            atual = BIT_EPSILON
+            for i in range(len(corpo) - 1, -1, -1):
+                simbolo = corpo[i]
+                first_simbolo = firsts[simbolo] if simbolo >= 0 else 1 << ~simbolo
+                if first_simbolo & BIT_EPSILON:
+                    atual |= first_simbolo & ~BIT_EPSILON
+                else:
+                    atual = first_simbolo
+                sufixos[i] = atual
+            self.first_sufixos[prod] = sufixos
+
+        return self.first_sufixos
 
-        return self.first_cache.get(simbolo, set()).copy()
+    def get_first_sufixo(self, producao: Producao, posicao: int = 0) -> int:
+        """FIRST(corpo[posicao:]) de uma produção, como máscara de bits."""
+        self._verificar_versao()
+        if not self.first_sufixos:
+            self.calcular_first_sufixos()
+
+        sufixos = self.first_sufixos.get(producao)
+        if sufixos is None:
+            return self.first_sequencia_bits(producao.corpo[posicao:])
+        return sufixos[posicao]
 
     def calcular_follows(self):
         """
@@ -128,63 +305,57 @@ class HandlerGramatica:
         3. Se A ::= αB (ou A ::= αBβ, onde ε ∈ FIRST(β)) ∈ P, então
         adicione FOLLOW(A) em FOLLOW(B)
         FIRST(β) → FIRST(da sequência β)
+
+        As ocorrências de cada B vêm do índice `Gramatica.ocorrencias` e
+        FIRST(β) da tabela de sufixos (`calcular_first_sufixos`): a regra 2
+        preenche a base de B e a regra 3 vira uma aresta B → A do grafo de
+        dependências.
         """
-        # Inicializar FOLLOW para todos os não-terminais
-        for nt in self.gramatica.nao_terminais:
-            self.follow_cache[nt] = set()
+        self._verificar_versao()
+        if not self.first_sufixos:
+            self.calcular_first_sufixos()
+        ids = self.simbolos.ids_nao_terminais
+
+        base = [0] * len(self._firsts)
+        dependencias: list[set[int]] = [set() for _ in self._firsts]
 
         # Regra 1: Se S é o símbolo inicial, então $ ∈ FOLLOW(S)
-        self.follow_cache[self.gramatica.simbolo_inicial].add(Terminal("$"))
-
-        e = Epsilon()
-        m = True
-
-        # Iterar até ponto fixo
-        while m:
-            m = False
-
-            # Para cada produção A ::= αBβ ∈ P
-            for prod in self.gramatica.producoes:
-                A = prod.cabeca
-                corpo = prod.corpo
-
-                # Para cada não-terminal B em corpo
-                for i, B in enumerate(corpo):
-                    if not isinstance(B, NaoTerminal):
-                        continue
-
-                    prev_cache = len(self.follow_cache[B])
-                    beta = corpo[i + 1 :]  # Resto após B
-
-                    if beta:
-                        # Regra 2: Se A ::= αBβ ∈ P e β ≠ ε
-                        # Adicionar FIRST(β) - {ε} a FOLLOW(B)
-                        first_beta = self._calcular_first_sequencia(beta)
-                        self.follow_cache[B].update(s for s in first_beta if s != e)
-
-                        # Regra 3: Se A ::= αBβ ∈ P onde ε ∈ FIRST(β)
-                        # Adicionar FOLLOW(A) a FOLLOW(B)
-                        if e in first_beta:
-                            self.follow_cache[B].update(self.follow_cache[A])
-                    else:
-                        # Regra 3: Se A ::= αB ∈ P
-                        # Adicionar FOLLOW(A) a FOLLOW(B)
-                        self.follow_cache[B].update(self.follow_cache[A])
-
-                    if len(self.follow_cache[B]) > prev_cache:
-                        m = True
+        base[ids[self.gramatica.simbolo_inicial]] |= BIT_FIM
+
+        for B, ocorrencias in self.gramatica.ocorrencias.items():
+            b = ids[B]
+            for prod, i in ocorrencias:
+                first_beta = self.first_sufixos[prod][i + 1]
+                # Regra 2: FIRST(β) - {ε} ⊆ FOLLOW(B)
+                base[b] |= first_beta & ~BIT_EPSILON
+                # Regra 3: ε ∈ FIRST(β) ⇒ FOLLOW(A) ⊆ FOLLOW(B)
+                if first_beta & BIT_EPSILON and prod.cabeca != B:
+                    dependencias[b].add(ids[prod.cabeca])
+
+        self.follow_bits.clear()
+        self.follow_bits.update(
+            zip(self.simbolos.nao_terminais, self._propagar(base, dependencias))
+        )
 
         return self.follow_cache
 
-    def get_follow(self, simbolo: NaoTerminal) -> set[Terminal]:
-        """Retorna FOLLOW de um não terminal (usa cache se disponível)."""
-        # Calcular todos os FIRSTs se cache vazio
-        if not self.follow_cache:
+    def get_follow_bits(self, simbolo: NaoTerminal) -> int:
+        """Retorna FOLLOW de um não terminal como máscara de bits."""
+        self._verificar_versao()
+        if not self.follow_bits:
             self.calcular_follows()
 
-        return self.follow_cache.get(simbolo, set()).copy()
+        return self.follow_bits.get(simbolo, 0)
+
+    def get_follow(self, simbolo: NaoTerminal) -> set[Terminal]:
+        """Retorna FOLLOW de um não terminal (usa cache se disponível)."""
+        return self.simbolos.conjunto(self.get_follow_bits(simbolo))
 
     def limpar_cache(self):
         """Limpa os caches de FIRST e FOLLOW."""
-        self.first_cache.clear()
-        self.follow_cache.clear()
+        self.first_bits.clear()
+        self.follow_bits.clear()
+        self.first_sufixos.clear()
+        self.anulaveis.clear()
+        self._anulavel = []
+        self._firsts = []
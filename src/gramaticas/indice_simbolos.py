@@ -0,0 +1,118 @@
+from typing import Iterable, Iterator, Mapping, Union
+
+from .simbolos import Epsilon, NaoTerminal, Terminal
+
+# Bits reservados nos conjuntos de terminais
+ID_EPSILON = 0
+ID_FIM = 1
+BIT_EPSILON = 1 << ID_EPSILON
+BIT_FIM = 1 << ID_FIM
+
+
+class IndiceSimbolos:
+    """Tabela de símbolos da gramática: cada símbolo recebe um id inteiro denso.
+
+    Terminais e não-terminais têm espaços de ids separados, ambos a partir de
+    0. Entre os terminais, ε e $ ocupam os ids reservados `ID_EPSILON` e
+    `ID_FIM`, então um conjunto de terminais pode ser guardado como um `int`
+    em que o bit `i` representa o terminal de id `i` (ver `mascara` e
+    `conjunto`).
+
+    Cada símbolo é guardado uma única vez: `terminais[i]` e `nao_terminais[i]`
+    são as instâncias canônicas, inclusive `epsilon` e `fim`.
+    """
+
+    def __init__(self):
+        self.epsilon = Epsilon()
+        self.fim = Terminal("$")
+        self.terminais: list[Terminal] = [self.epsilon, self.fim]
+        self.ids_terminais: dict[Terminal, int] = {
+            self.epsilon: ID_EPSILON,
+            self.fim: ID_FIM,
+        }
+        self.nao_terminais: list[NaoTerminal] = []
+        self.ids_nao_terminais: dict[NaoTerminal, int] = {}
+
+    @classmethod
+    def de_gramatica(cls, gramatica) -> "IndiceSimbolos":
+        """Interna os símbolos de uma gramática em ordem determinística.
+
+        O símbolo inicial recebe o id 0; os demais seguem a ordem de
+        aparição nas produções, e símbolos declarados que não aparecem em
+        nenhuma produção vêm por último, em ordem alfabética.
+        """
+        indice = cls()
+        indice.internar(gramatica.simbolo_inicial)
+        for producao in gramatica.producoes:
+            indice.internar(producao.cabeca)
+            for simbolo in producao.corpo:
+                indice.internar(simbolo)
+        for simbolo in sorted(gramatica.nao_terminais, key=str):
+            indice.internar(simbolo)
+        for simbolo in sorted(gramatica.terminais, key=str):
+            indice.internar(simbolo)
+        return indice
+
+    def internar(self, simbolo: Union[Terminal, NaoTerminal]) -> int:
+        """Retorna o id do símbolo, atribuindo o próximo id livre se for novo."""
+        if isinstance(simbolo, NaoTerminal):
+            ids, simbolos = self.ids_nao_terminais, self.nao_terminais
+        else:
+            ids, simbolos = self.ids_terminais, self.terminais
+
+        id_simbolo = ids.get(simbolo)
+        if id_simbolo is None:
+            id_simbolo = ids[simbolo] = len(simbolos)
+            simbolos.append(simbolo)
+        return id_simbolo
+
+    def canonico(
+        self, simbolo: Union[Terminal, NaoTerminal]
+    ) -> Union[Terminal, NaoTerminal]:
+        """Instância única do símbolo guardada na tabela."""
+        if isinstance(simbolo, NaoTerminal):
+            return self.nao_terminais[self.internar(simbolo)]
+        return self.terminais[self.internar(simbolo)]
+
+    def bit(self, terminal: Terminal) -> int:
+        return 1 << self.internar(terminal)
+
+    def mascara(self, terminais: Iterable[Terminal]) -> int:
+        """Converte um conjunto de terminais na máscara de bits equivalente."""
+        mascara = 0
+        for terminal in terminais:
+            mascara |= 1 << self.internar(terminal)
+        return mascara
+
+    def iterar(self, mascara: int) -> Iterator[Terminal]:
+        """Terminais de uma máscara, em ordem crescente de id."""
+        while mascara:
+            menor = mascara & -mascara
+            yield self.terminais[menor.bit_length() - 1]
+            mascara ^= menor
+
+    def conjunto(self, mascara: int) -> set[Terminal]:
+        """Converte uma máscara de bits no conjunto de terminais (para exibição)."""
+        return set(self.iterar(mascara))
+
+
+class VisaoConjuntos(Mapping):
+    """Visão somente leitura de máscaras por não-terminal como `set[Terminal]`.
+
+    Mantém a interface de dicionário de conjuntos (ex.: `first_cache`) para
+    quem exibe os conjuntos, sem guardar os conjuntos: cada acesso converte
+    a máscara correspondente.
+    """
+
+    def __init__(self, indice: IndiceSimbolos, mascaras: dict[NaoTerminal, int]):
+        self.indice = indice
+        self.mascaras = mascaras
+
+    def __getitem__(self, simbolo: NaoTerminal) -> set[Terminal]:
+        return self.indice.conjunto(self.mascaras[simbolo])
+
+    def __iter__(self) -> Iterator[NaoTerminal]:
+        return iter(self.mascaras)
+
+    def __len__(self) -> int:
+        return len(self.mascaras)
@@ -0,0 +1,215 @@
+import re
+from bisect import bisect_right
+from dataclasses import dataclass
+from functools import cache
+from typing import override
+
+MAX_CODEPOINT = 0x10FFFF
+ESCAPES = {"t": "\t", "n": "\n", "r": "\r"}
+
+
+@dataclass(frozen=True, order=True)
+class Intervalo:
+    """Intervalo fechado de codepoints [inicio, fim] usado como símbolo de autômato.
+
+    Permite que uma única transição represente milhares de caracteres (por
+    exemplo, todas as letras Unicode ou um grupo negado `[^"]`).
+    """
+
+    inicio: int
+    fim: int
+
+    def contem(self, caractere: str) -> bool:
+        return self.inicio <= ord(caractere) <= self.fim
+
+    @override
+    def __str__(self):
+        if self.inicio == self.fim:
+            return chr(self.inicio)
+        return f"{chr(self.inicio)}-{chr(self.fim)}"
+
+    @override
+    def __repr__(self):
+        return f"Intervalo({self.inicio:#x}, {self.fim:#x})"
+
+
+def normalizar(intervalos: list[tuple[int, int]]) -> list[tuple[int, int]]:
+    """Ordena e junta intervalos sobrepostos ou adjacentes."""
+    resultado: list[tuple[int, int]] = []
+    for inicio, fim in sorted(intervalos):
+        if resultado and inicio <= resultado[-1][1] + 1:
+            resultado[-1] = (resultado[-1][0], max(resultado[-1][1], fim))
+        else:
+            resultado.append((inicio, fim))
+    return resultado
+
+
+def complementar(intervalos: list[tuple[int, int]]) -> list[tuple[int, int]]:
+    """Complemento de uma lista normalizada de intervalos sobre todo o Unicode."""
+    resultado: list[tuple[int, int]] = []
+    proximo = 0
+    for inicio, fim in intervalos:
+        if inicio > proximo:
+            resultado.append((proximo, inicio - 1))
+        proximo = fim + 1
+    if proximo <= MAX_CODEPOINT:
+        resultado.append((proximo, MAX_CODEPOINT))
+    return resultado
+
+
+@cache
+def categoria_unicode(nome: str) -> tuple[tuple[int, int], ...]:
+    """Intervalos de uma categoria Unicode: "L" (letras) ou "N" (dígitos/números).
+
+    Calculado uma única vez por categoria, percorrendo todos os codepoints.
+    """
+    testes = {"L": str.isalpha, "N": str.isnumeric}
+    if nome not in testes:
+        raise ValueError(f"Categoria Unicode desconhecida: \\p{{{nome}}}")
+
+    # um byte por codepoint (1 se pertence à categoria), percorrido em C
+    pertence = bytes(map(testes[nome], map(chr, range(MAX_CODEPOINT + 1))))
+    intervalos = [(m.start(), m.end() - 1) for m in re.finditer(b"\x01+", pertence)]
+    return tuple(intervalos)
+
+
+def ler_grupo(conteudo: str) -> frozenset[Intervalo]:
+    """Converte o conteúdo de um grupo `[...]` em intervalos de codepoints.
+
+    Suporta ranges (a-z, À-ÿ), escapes (\\t, \\n, \\r, \\], \\-, ...),
+    categorias Unicode (\\p{L}, \\p{N}) e negação (^ no início).
+
+    Args:
+        conteudo: Texto entre os colchetes.
+
+    Returns:
+        Conjunto de intervalos disjuntos e não adjacentes.
+
+    Raises:
+        ValueError: Se o grupo for vazio ou tiver um range invertido.
+    """
+    negado = conteudo.startswith("^")
+    if negado:
+        conteudo = conteudo[1:]
+
+    # cada item é (caractere, veio_de_escape)
+    itens: list[tuple[str, bool]] = []
+    intervalos: list[tuple[int, int]] = []
+    i = 0
+    while i < len(conteudo):
+        if conteudo[i] == "\\" and i + 1 < len(conteudo):
+            escape = conteudo[i + 1]
+            if escape == "p" and conteudo[i + 2 : i + 3] == "{":
+                fim = conteudo.find("}", i + 3)
+                if fim == -1:
+                    raise ValueError(f"Categoria Unicode não fechada: [{conteudo}]")
+                intervalos.extend(categoria_unicode(conteudo[i + 3 : fim]))
+                i = fim + 1
+                continue
+            itens.append((ESCAPES.get(escape, escape), True))
+            i += 2
+            continue
+        itens.append((conteudo[i], False))
+        i += 1
+
+    j = 0
+    while j < len(itens):
+        caractere, _ = itens[j]
+        # range x-y: o '-' não pode estar escapado nem nas pontas
+        if j + 2 < len(itens) and itens[j + 1] == ("-", False):
+            fim_range, _ = itens[j + 2]
+            if ord(caractere) > ord(fim_range):
+                raise ValueError(
+                    f"Range inválido: '{caractere}-{fim_range}' "
+                    f"('{caractere}' vem depois de '{fim_range}')"
+                )
+            intervalos.append((ord(caractere), ord(fim_range)))
+            j += 3
+        else:
+            intervalos.append((ord(caractere), ord(caractere)))
+            j += 1
+
+    intervalos = normalizar(intervalos)
+    if negado:
+        intervalos = complementar(intervalos)
+
+    if not intervalos:
+        raise ValueError(f"Grupo vazio ou inválido: [{conteudo}]")
+
+    return frozenset(Intervalo(inicio, fim) for inicio, fim in intervalos)
+
+
+def intervalos_simbolo(simbolo: str | Intervalo) -> tuple[int, int]:
+    """Intervalo coberto por um símbolo de folha (caractere ou Intervalo)."""
+    if isinstance(simbolo, Intervalo):
+        return simbolo.inicio, simbolo.fim
+    return ord(simbolo), ord(simbolo)
+
+
+class AlfabetoIntervalos:
+    """Partição do espaço de codepoints em intervalos atômicos (classes de caracteres).
+
+    Construída a partir de todos os conjuntos de símbolos usados pelas folhas
+    das expressões: cada átomo é um intervalo máximo de codepoints que nenhuma
+    folha distingue. Os autômatos usam os átomos como símbolos, então a
+    determinização e a minimização trabalham sobre poucos intervalos em vez de
+    um símbolo por caractere.
+
+    A busca de um caractere usa uma tabela direta para ASCII e busca binária
+    sobre o início dos átomos para o restante.
+    """
+
+    def __init__(self, conjuntos: list[list[tuple[int, int]]]):
+        """Constrói a partição.
+
+        Args:
+            conjuntos: Intervalos cobertos por cada folha das expressões.
+        """
+        fronteiras: set[int] = set()
+        cobertos: list[tuple[int, int]] = []
+        for conjunto in conjuntos:
+            for inicio, fim in conjunto:
+                fronteiras.add(inicio)
+                fronteiras.add(fim + 1)
+                cobertos.append((inicio, fim))
+        cobertos = normalizar(cobertos)
+
+        pontos = sorted(fronteiras)
+        self.atomos: list[Intervalo] = []
+        k = 0
+        for inicio, proximo in zip(pontos, pontos[1:]):
+            while k < len(cobertos) and cobertos[k][1] < inicio:
+                k += 1
+            # só interessam átomos cobertos por alguma folha
+            if k < len(cobertos) and cobertos[k][0] <= inicio:
+                self.atomos.append(Intervalo(inicio, proximo - 1))
+
+        self.inicios: list[int] = [a.inicio for a in self.atomos]
+        self.tabela_ascii: list[Intervalo | None] = [
+            self._buscar(codigo) for codigo in range(128)
+        ]
+
+    def _buscar(self, codigo: int) -> Intervalo | None:
+        indice = bisect_right(self.inicios, codigo) - 1
+        if indice >= 0 and self.atomos[indice].fim >= codigo:
+            return self.atomos[indice]
+        return None
+
+    def atomo(self, caractere: str) -> Intervalo | None:
+        """Retorna o átomo que contém o caractere, ou None se nenhum contém."""
+        codigo = ord(caractere)
+        if codigo < 128:
+            return self.tabela_ascii[codigo]
+        return self._buscar(codigo)
+
+    def atomos_de(self, intervalos: list[tuple[int, int]]) -> frozenset[Intervalo]:
+        """Átomos que compõem a união de intervalos dada."""
+        resultado: set[Intervalo] = set()
+        for inicio, fim in intervalos:
+            indice = bisect_right(self.inicios, inicio) - 1
+            indice = max(indice, 0)
+            while indice < len(self.atomos) and self.atomos[indice].inicio <= fim:
+                if self.atomos[indice].fim >= inicio:
+                    resultado.add(self.atomos[indice])
+                indice += 1
+        return frozenset(resultado)
@@ -0,0 +1,159 @@
+from array import array
+from typing import Iterator
+
+from src.gramaticas import NaoTerminal, Terminal
+from src.ll.tabela_ll1 import SEM_PRODUCAO, TabelaLL1Compilada
+
+NENHUM = -1
+
+
+class ArvoreSintatica:
+    """Árvore sintática concreta guardada em colunas paralelas (arena).
+
+    Cada nó é um índice; suas informações ficam na mesma posição de cada
+    coluna `array('i')`, sem um objeto Python por nó (seis inteiros de 32
+    bits, 24 bytes por nó):
+
+    - `simbolos`: id de pilha do símbolo (ver `TabelaLL1Compilada`: abaixo
+      de `num_terminais` é terminal, senão não-terminal);
+    - `producoes`: produção usada para expandir o nó, ou `SEM_PRODUCAO`
+      (folhas e nós não expandidos);
+    - `pais`, `primeiros_filhos`, `proximos_irmaos`: ligações, ou `NENHUM`;
+    - `tokens`: índice na entrada do token casado por uma folha terminal,
+      ou `NENHUM`.
+
+    O nó 0 é a raiz (símbolo inicial). Os filhos de um nó estão na ordem do
+    corpo da produção e têm índices consecutivos; produções ε não criam
+    filhos.
+    """
+
+    def __init__(self, compilada: TabelaLL1Compilada, nao_terminais: list[NaoTerminal]):
+        """Cria uma árvore com apenas a raiz.
+
+        Args:
+            compilada: Tabela que define os ids de símbolo e de produção.
+            nao_terminais: Não-terminais por id (`gramatica.simbolos`).
+        """
+        self.compilada = compilada
+        self.nao_terminais = nao_terminais
+
+        # Corpos na ordem original e colunas de NENHUM por tamanho de corpo,
+        # prontos para um `extend` sem listas temporárias a cada expansão
+        self._corpos = [array("i", corpo[::-1]) for corpo in compilada.corpos_reversos]
+        maior = max(map(len, self._corpos), default=0)
+        self._vazias = [array("i", [NENHUM]) * k for k in range(maior + 1)]
+
+        self.simbolos = array("i", [compilada.inicial])
+        self.producoes = array("i", [SEM_PRODUCAO])
+        self.pais = array("i", [NENHUM])
+        self.primeiros_filhos = array("i", [NENHUM])
+        self.proximos_irmaos = array("i", [NENHUM])
+        self.tokens = array("i", [NENHUM])
+
+    def expandir(self, no: int, producao: int) -> int:
+        """Registra a expansão de `no` e cria os filhos do corpo.
+
+        Args:
+            no: Nó do não-terminal expandido.
+            producao: Índice da produção.
+
+        Returns:
+            Índice do primeiro filho; os demais seguem em ordem.
+        """
+        self.producoes[no] = producao
+        primeiro = len(self.simbolos)
+        corpo = self._corpos[producao]
+        quantidade = len(corpo)
+        if not quantidade:
+            return primeiro
+
+        vazia = self._vazias[quantidade]
+        self.simbolos.extend(corpo)
+        self.producoes.extend(vazia)  # SEM_PRODUCAO == NENHUM
+        self.pais.extend(array("i", (no,)) * quantidade)
+        self.primeiros_filhos.extend(vazia)
+        self.proximos_irmaos.extend(range(primeiro + 1, primeiro + quantidade))
+        self.proximos_irmaos.append(NENHUM)
+        self.tokens.extend(vazia)
+        self.primeiros_filhos[no] = primeiro
+        return primeiro
+
+    def __len__(self) -> int:
+        return len(self.simbolos)
+
+    def simbolo(self, no: int) -> Terminal | NaoTerminal:
+        id_pilha = self.simbolos[no]
+        num_terminais = self.compilada.num_terminais
+        if id_pilha < num_terminais:
+            return self.compilada.terminais[id_pilha]
+        return self.nao_terminais[id_pilha - num_terminais]
+
+    def eh_folha(self, no: int) -> bool:
+        return self.simbolos[no] < self.compilada.num_terminais
+
+    def filhos(self, no: int) -> Iterator[int]:
+        filho = self.primeiros_filhos[no]
+        while filho != NENHUM:
+            yield filho
+            filho = self.proximos_irmaos[filho]
+
+    def percorrer(self, no: int = 0) -> Iterator[int]:
+        """Nós da subárvore de `no` em pré-ordem (pilha explícita, sem recursão)."""
+        pilha = [no]
+        while pilha:
+            atual = pilha.pop()
+            yield atual
+            pilha.extend(reversed(list(self.filhos(atual))))
+
+    def nos_de(self, nao_terminal: NaoTerminal) -> list[int]:
+        """Nós de um não-terminal, em ordem de aparição na entrada."""
+        id_pilha = self.compilada.num_terminais + self.nao_terminais.index(nao_terminal)
+        return [no for no, simbolo in enumerate(self.simbolos) if simbolo == id_pilha]
+
+    def intervalo_tokens(self, no: int) -> tuple[int, int] | None:
+        """Índices do primeiro e do último token cobertos pela subárvore.
+
+        Returns:
+            O par (primeiro, último), ou None se a subárvore não cobre tokens
+            (ex.: derivou ε).
+        """
+        cobertos = [
+            self.tokens[n] for n in self.percorrer(no) if self.tokens[n] != NENHUM
+        ]
+        if not cobertos:
+            return None
+        return cobertos[0], cobertos[-1]
+
+    def tamanho_bytes(self) -> int:
+        """Memória das colunas da árvore."""
+        return sum(
+            coluna.itemsize * len(coluna)
+            for coluna in (
+                self.simbolos,
+                self.producoes,
+                self.pais,
+                self.primeiros_filhos,
+                self.proximos_irmaos,
+                self.tokens,
+            )
+        )
+
+    def imprimir(self, tokens: list[tuple[str, str]] | None = None, no: int = 0):
+        """Imprime a subárvore de `no` com recuo por profundidade.
+
+        Args:
+            tokens: Entrada do parse; se informada, as folhas mostram o lexema.
+            no: Raiz da subárvore a imprimir.
+        """
+        pilha = [(no, 0)]
+        while pilha:
+            atual, profundidade = pilha.pop()
+            texto = str(self.simbolo(atual))
+            indice_token = self.tokens[atual]
+            if tokens is not None and indice_token != NENHUM:
+                texto += f"  '{tokens[indice_token][0]}'"
+            print(f"{'  ' * profundidade}{texto}")
+            pilha.extend(
+                (filho, profundidade + 1)
+                for filho in reversed(list(self.filhos(atual)))
+            )
@@ -0,0 +1,319 @@
+import importlib.util
+import os
+import sys
+from types import ModuleType
+
+from src.gramaticas import Gramatica, NaoTerminal, Terminal
+from src.ll.tabela_comprimida import chave_gramatica
+from src.ll.tabela_ll1 import SEM_PRODUCAO, TabelaLL1
+
+# Incrementar sempre que o código gerado mudar; módulos gerados por versões
+# anteriores passam a ser recusados na carga.
+VERSAO_GERADOR = 2
+
+# Linhas com até este número de entradas despacham por cadeia de if; as
+# maiores, por dicionário tipo de token → função da produção.
+LIMITE_CADEIA_IF = 6
+
+CABECALHO = '''"""Parser descendente recursivo gerado a partir da tabela LL(1).
+
+Gerado por src/ll/gerador_descendente.py; não editar à mão.
+"""
+
+from array import array
+
+VERSAO_GERADOR = {versao}
+CHAVE = {chave!r}
+'''
+
+# Parte fixa do módulo gerado: erros, reconstrução da árvore e a classe que
+# expõe a mesma interface de ParserLL1.
+EXECUCAO = '''
+
+class ErroSintatico(Exception):
+    def __init__(self, posicao, derivacao, esperado=None, nao_terminal=None):
+        super().__init__()
+        self.posicao = posicao
+        self.passo = len(derivacao) + posicao + 1
+        self.esperado = esperado
+        self.nao_terminal = nao_terminal
+
+
+def _esperado(i, d, terminal):
+    return ErroSintatico(i, d, esperado=terminal)
+
+
+def _sem_producao(i, d, nao_terminal):
+    return ErroSintatico(i, d, nao_terminal=nao_terminal)
+
+
+def no_arvore(producao, filhos):
+    """Ação padrão de `avaliar`: nó (cabeça, filhos); folhas são os tokens."""
+    return CABECAS[producao], filhos
+
+
+def avaliar(derivacao, tokens, acao=no_arvore):
+    """Percorre a árvore descrita pela derivação mais à esquerda.
+
+    Chama `acao(producao, filhos)` ao fechar cada produção, com os valores
+    dos filhos na ordem do corpo (tokens para terminais, o retorno da ação
+    para não-terminais), e retorna o valor da raiz. Usa uma pilha explícita,
+    então a profundidade da árvore não é limitada pela recursão do Python.
+    """
+    if not derivacao:
+        return None
+
+    posicao = 0
+    proxima = 1
+    pilha = [(derivacao[0], 0, [])]
+    while True:
+        producao, j, filhos = pilha[-1]
+        corpo = CORPOS_TERMINAIS[producao]
+        if j == len(corpo):
+            pilha.pop()
+            valor = acao(producao, filhos)
+            if not pilha:
+                return valor
+            pilha[-1][2].append(valor)
+            continue
+
+        pilha[-1] = (producao, j + 1, filhos)
+        if corpo[j]:
+            filhos.append(tokens[posicao])
+            posicao += 1
+        else:
+            pilha.append((derivacao[proxima], 0, []))
+            proxima += 1
+
+
+class ParserDescendente:
+    """Parser gerado, com a interface de ParserLL1 (parsear, derivacao)."""
+
+    def __init__(self):
+        self.derivacao_indices = array("i")
+
+    @property
+    def derivacao(self):
+        return [PRODUCOES[p] for p in self.derivacao_indices]
+
+    def parsear(self, tokens, fluxo=None):
+        tipos = [tipo for _, tipo in tokens]
+        if not tokens or tokens[-1][1] not in ["$", "EOF"]:
+            tipos.append("$")  # Fim de entrada
+
+        d = self.derivacao_indices = array("i")
+        try:
+            i = INICIAL(tipos, 0, d)
+            if tipos[i] != "$":
+                raise _esperado(i, d, "$")
+            return True
+        except ErroSintatico as erro:
+            encontrado = tokens[erro.posicao][1] if erro.posicao < len(tokens) else "$"
+            local = fluxo.descrever_posicao(erro.posicao) if fluxo else ""
+            if erro.esperado is not None:
+                print(
+                    f"Erro de sintaxe: esperado '{erro.esperado}', "
+                    f"encontrado '{encontrado}'{local} no passo {erro.passo}."
+                )
+            else:
+                print(
+                    f"Erro de sintaxe: não há produção para "
+                    f"{NAO_TERMINAIS[erro.nao_terminal]} com símbolo de entrada "
+                    f"'{encontrado}'{local} no passo {erro.passo}."
+                )
+            return False
+        except RecursionError:
+            print("Erro de sintaxe: aninhamento excede o limite de recursão.")
+            return False
+
+    def arvore(self, tokens, acao=no_arvore):
+        """Árvore (ou valor das ações semânticas) do último parse aceito."""
+        return avaliar(self.derivacao_indices, tokens, acao)
+
+    def imprimir_derivacao(self):
+        """Imprime as produções usadas (derivação mais à esquerda)."""
+        if not self.derivacao_indices:
+            print("Nenhuma derivação disponível (execute parsear() primeiro).")
+            return
+
+        print("\\n=== DERIVAÇÃO (Leftmost) ===\\n")
+        for i, producao in enumerate(self.derivacao, 1):
+            print(f"{i:3}. {producao}")
+'''
+
+
+def gerar_codigo(tabela: TabelaLL1, gramatica: Gramatica) -> str:
+    """Gera o código-fonte de um parser descendente recursivo para a tabela.
+
+    O módulo gerado não depende deste pacote. Cada não-terminal vira uma
+    função `(tipos, i, d) -> i` que escolhe a produção pelo tipo do token
+    atual, registra o índice da produção em `d` e reconhece o corpo:
+    terminais são comparados no próprio corpo da função e não-terminais
+    viram chamadas. A chamada do próprio não-terminal no fim do corpo
+    (listas recursivas à direita) vira um laço, para que o tamanho da
+    entrada não se transforme em profundidade de recursão.
+
+    A derivação e as mensagens de erro (inclusive o número do passo) são as
+    mesmas de `ParserLL1`.
+
+    Args:
+        tabela: Tabela LL(1) já construída.
+        gramatica: Gramática da tabela.
+
+    Returns:
+        Código-fonte do módulo.
+    """
+    compilada = tabela.compilar(gramatica)
+    simbolos = gramatica.simbolos
+    largura = compilada.num_terminais
+    producoes = compilada.producoes
+
+    linhas = [CABECALHO.format(versao=VERSAO_GERADOR, chave=chave_gramatica(gramatica))]
+    linhas.append(f"PRODUCOES = {tuple(str(p) for p in producoes)!r}")
+    linhas.append(f"CABECAS = {tuple(p.cabeca.nome for p in producoes)!r}")
+    linhas.append(
+        f"NAO_TERMINAIS = {tuple(str(nt) for nt in simbolos.nao_terminais)!r}"
+    )
+    corpos_terminais = tuple(
+        tuple(isinstance(s, Terminal) for s in p.corpo) for p in producoes
+    )
+    linhas.append(f"CORPOS_TERMINAIS = {corpos_terminais!r}")
+    linhas.append(EXECUCAO)
+
+    for n, nao_terminal in enumerate(simbolos.nao_terminais):
+        # Tipos de token que selecionam cada produção da linha
+        selecao: dict[int, list[str]] = {}
+        for t in range(largura):
+            indice = compilada.acoes[n * largura + t]
+            if indice != SEM_PRODUCAO:
+                selecao.setdefault(indice, []).append(compilada.terminais[t].nome)
+
+        linhas.append("")
+        if sum(map(len, selecao.values())) <= LIMITE_CADEIA_IF:
+            linhas += _funcao_cadeia(n, nao_terminal, selecao, producoes, simbolos)
+        else:
+            linhas += _funcao_dicionario(n, nao_terminal, selecao, producoes, simbolos)
+
+    inicial = simbolos.ids_nao_terminais[gramatica.simbolo_inicial]
+    linhas += ["", f"INICIAL = _n{inicial}", ""]
+    return "\n".join(linhas)
+
+
+def _cauda_propria(producao, nao_terminal: NaoTerminal) -> bool:
+    return bool(producao.corpo) and producao.corpo[-1] == nao_terminal
+
+
+def _corpo(producao, simbolos, recuo: str, cauda: bool) -> list[str]:
+    """Linhas que reconhecem o corpo; sem a chamada final se `cauda`.
+
+    O primeiro terminal do corpo já foi verificado pelo despacho (é o único
+    tipo que seleciona a produção), então só avança a posição.
+    """
+    linhas = []
+    corpo = producao.corpo[:-1] if cauda else producao.corpo
+    for j, simbolo in enumerate(corpo):
+        if isinstance(simbolo, NaoTerminal):
+            linhas.append(f"{recuo}i = _n{simbolos.ids_nao_terminais[simbolo]}(tipos, i, d)")
+            continue
+        if j > 0:
+            linhas.append(f"{recuo}if tipos[i] != {simbolo.nome!r}:")
+            linhas.append(f"{recuo}    raise _esperado(i, d, {simbolo.nome!r})")
+        linhas.append(f"{recuo}i += 1")
+    return linhas
+
+
+def _funcao_cadeia(n, nao_terminal, selecao, producoes, simbolos) -> list[str]:
+    """Função do não-terminal com despacho por cadeia de if."""
+    laco = any(_cauda_propria(producoes[p], nao_terminal) for p in selecao)
+    recuo = "        " if laco else "    "
+    linhas = [f"# {nao_terminal}", f"def _n{n}(tipos, i, d):"]
+    if laco:
+        linhas.append("    while True:")
+    linhas.append(f"{recuo}t = tipos[i]")
+
+    for k, (p, tipos) in enumerate(selecao.items()):
+        condicao = f"t == {tipos[0]!r}" if len(tipos) == 1 else f"t in {tuple(tipos)!r}"
+        linhas.append(f"{recuo}{'if' if k == 0 else 'elif'} {condicao}:")
+        linhas.append(f"{recuo}    d.append({p})")
+        cauda = _cauda_propria(producoes[p], nao_terminal)
+        linhas += _corpo(producoes[p], simbolos, recuo + "    ", cauda)
+        linhas.append(f"{recuo}    {'continue' if cauda else 'return i'}")
+
+    linhas.append(f"{recuo}raise _sem_producao(i, d, {n})")
+    return linhas
+
+
+def _funcao_dicionario(n, nao_terminal, selecao, producoes, simbolos) -> list[str]:
+    """Função do não-terminal com despacho por dicionário, uma função por produção."""
+    linhas = []
+    cauda = set()
+    for p in selecao:
+        if _cauda_propria(producoes[p], nao_terminal):
+            cauda.add(p)
+        linhas.append(f"def _r{p}(tipos, i, d):")
+        linhas.append(f"    d.append({p})")
+        linhas += _corpo(producoes[p], simbolos, "    ", p in cauda)
+        linhas.append("    return i")
+        linhas.append("")
+
+    entradas = ", ".join(
+        f"{tipo!r}: _r{p}" for p, tipos in selecao.items() for tipo in tipos
+    )
+    linhas.append(f"_D{n} = {{{entradas}}}")
+    if cauda:
+        linhas.append(f"_C{n} = {{{', '.join(f'_r{p}' for p in sorted(cauda))}}}")
+
+    linhas += ["", f"# {nao_terminal}", f"def _n{n}(tipos, i, d):"]
+    recuo = "        " if cauda else "    "
+    if cauda:
+        linhas.append("    while True:")
+    linhas.append(f"{recuo}r = _D{n}.get(tipos[i])")
+    linhas.append(f"{recuo}if r is None:")
+    linhas.append(f"{recuo}    raise _sem_producao(i, d, {n})")
+    if cauda:
+        linhas.append(f"{recuo}i = r(tipos, i, d)")
+        linhas.append(f"{recuo}if r not in _C{n}:")
+        linhas.append(f"{recuo}    return i")
+    else:
+        linhas.append(f"{recuo}return r(tipos, i, d)")
+    return linhas
+
+
+def salvar_parser(tabela: TabelaLL1, gramatica: Gramatica, caminho: str):
+    """Gera o parser e grava o módulo em `caminho` (escrita atômica)."""
+    codigo = gerar_codigo(tabela, gramatica)
+    temporario = f"{caminho}.tmp"
+    with open(temporario, "w", encoding="utf-8") as f:
+        f.write(codigo)
+    os.replace(temporario, caminho)
+
+
+def carregar_parser(caminho: str, chave: str | None = None) -> ModuleType:
+    """Importa um módulo gerado por `salvar_parser`.
+
+    Args:
+        caminho: Arquivo .py do parser gerado.
+        chave: Se informada, exige que o parser seja da gramática com essa
+            chave (ver `chave_gramatica`).
+
+    Returns:
+        O módulo; `modulo.ParserDescendente()` cria o parser.
+
+    Raises:
+        ValueError: Se o módulo for de outra versão do gerador ou de outra
+            gramática.
+    """
+    nome = f"_parser_descendente_{abs(hash(os.path.abspath(caminho)))}"
+    spec = importlib.util.spec_from_file_location(nome, caminho)
+    if spec is None or spec.loader is None:
+        raise ValueError(f"Não foi possível importar o parser gerado: {caminho}")
+
+    modulo = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(modulo)
+    if getattr(modulo, "VERSAO_GERADOR", None) != VERSAO_GERADOR:
+        raise ValueError("Parser gerado por outra versão do gerador")
+    if chave is not None and modulo.CHAVE != chave:
+        raise ValueError("Parser desatualizado: a gramática mudou")
+
+    sys.modules[nome] = modulo
+    return modulo
@@ -1,35 +1,277 @@
-from typing import List, Tuple
+import os
+from array import array
+from typing import Iterable, Iterator, List, Tuple
 
-from src.gramaticas import Gramatica, NaoTerminal, Terminal
-from src.ll.tabela_ll1 import TabelaLL1
+from src.gramaticas import Gramatica, NaoTerminal, Producao, Terminal
+from src.gramaticas.indice_simbolos import ID_FIM
+from src.ll.arvore_sintatica import ArvoreSintatica
+from src.ll.tabela_comprimida import TabelaLL1Comprimida, chave_gramatica
+from src.ll.tabela_ll1 import SEM_PRODUCAO, TabelaLL1
+from src.token_stream import TokenStream
+
+# Token sintetizado quando a entrada acaba. Um `$` (ou `EOF`) explícito no fim
+# dos tokens dispensa o sintetizado: o parser aceita ou para nele, sem ler além.
+FIM_ENTRADA = ("$", "$")
 
 
 class ParserLL1:
-    def __init__(self, tabela: TabelaLL1, gramatica: Gramatica) -> None:
+    def __init__(
+        self,
+        tabela: TabelaLL1,
+        gramatica: Gramatica,
+        compilado: bool = True,
+        comprimida: bool = False,
+        construir_arvore: bool = False,
+        registrar_derivacao: bool = True,
+        caminho_comprimida: str | None = None,
+    ) -> None:
+        """Cria o parser preditivo.
+
+        Args:
+            tabela: Tabela LL(1) já construída.
+            gramatica: Gramática da tabela.
+            compilado: Se True, usa a forma compilada da tabela (ids inteiros,
+                tabela plana e corpos invertidos pré-calculados); se False,
+                consulta a tabela de símbolos diretamente.
+            comprimida: No modo compilado, consulta a tabela comprimida por
+                deslocamento de linhas em vez da tabela densa (ver
+                `TabelaLL1Comprimida`; erros podem ser detectados mais tarde).
+            construir_arvore: Se True, constrói durante o parse a árvore
+                sintática concreta em `arvore` (ver `ArvoreSintatica`);
+                exige o modo compilado. Após um parse rejeitado, a árvore
+                contém a parte construída até o erro.
+            registrar_derivacao: Se False, a derivação não é registrada (só
+                o reconhecimento interessa).
+            caminho_comprimida: Arquivo de cache da tabela comprimida. Se
+                existir e for da mesma gramática, a tabela é carregada dele;
+                senão, é comprimida e gravada nele.
+
+        Raises:
+            ValueError: Se `construir_arvore` for pedido fora do modo compilado.
+        """
+        if construir_arvore and not compilado:
+            raise ValueError("A árvore sintática só é construída no modo compilado")
+
         self.tabela = tabela
         self.gramatica = gramatica
-        self.derivacao: List[str] = []
+        self.compilado = compilado
+        self.comprimida = comprimida
+        self.tabela_comprimida: TabelaLL1Comprimida | None = None
+        self._origem_comprimida = None
+        self.caminho_comprimida = caminho_comprimida
+        self.tokens_lidos = 0
+        self.construir_arvore = construir_arvore
+        self.arvore: ArvoreSintatica | None = None
+        self.registrar_derivacao = registrar_derivacao
 
-    def parsear(self, tokens: List[Tuple[str, str]]) -> bool:
-        pilha: list[Terminal | NaoTerminal | str] = [
-            Terminal("$"),
-            self.gramatica.simbolo_inicial,
+        # Derivação como índices em `producoes_indexadas`, 4 bytes por passo;
+        # as produções só viram texto quando exibidas
+        self.indices_derivacao = array("i")
+        self.producoes_indexadas: List[Producao] = []
+
+    @property
+    def producoes_derivacao(self) -> List[Producao]:
+        """Produções usadas (derivação mais à esquerda)."""
+        return [self.producoes_indexadas[i] for i in self.indices_derivacao]
+
+    @property
+    def derivacao(self) -> List[str]:
+        """Produções usadas (derivação mais à esquerda), como texto."""
+        textos = [str(producao) for producao in self.producoes_indexadas]
+        return [textos[i] for i in self.indices_derivacao]
+
+    def pagina_derivacao(self, inicio: int, quantidade: int) -> List[tuple[int, str]]:
+        """Trecho da derivação como pares (número do passo, produção em texto).
+
+        Só as produções do trecho são formatadas.
+
+        Args:
+            inicio: Posição (a partir de 0) do primeiro passo do trecho.
+            quantidade: Número máximo de passos.
+        """
+        fim = min(inicio + quantidade, len(self.indices_derivacao))
+        return [
+            (i + 1, str(self.producoes_indexadas[self.indices_derivacao[i]]))
+            for i in range(inicio, fim)
         ]
-        simbolo_pilha: list[Terminal | NaoTerminal] = []
-        entrada = [(lexema, tipo) for lexema, tipo in tokens]
-        if not entrada or entrada[-1][1] not in ["$", "EOF"]:
-            entrada.append(("$", "$"))  # Fim de entrada
 
-        posicao = 0
-        passo = 0
-        self.derivacao.clear()
+    def parsear(
+        self, tokens: Iterable[Tuple[str, str]], fluxo: TokenStream | None = None
+    ) -> bool:
+        """Reconhece os tokens com a tabela LL(1), registrando a derivação.
+
+        Os tokens são consumidos sob demanda, um de cada vez (lookahead de um
+        token), e o `$` é sintetizado quando a entrada acaba. Assim a entrada
+        pode ser um gerador (ex.: `AnalisadorLexico.iterar_tokens`): não
+        precisa existir inteira em memória, e um erro de sintaxe interrompe a
+        produção dos tokens restantes. `tokens_lidos` informa quantos tokens
+        foram consumidos.
 
+        Args:
+            tokens: Tuplas (lexema, tipo) já mapeadas para os terminais, em
+                qualquer iterável.
+            fluxo: Fluxo de origem dos tokens (mesmos índices), usado apenas
+                para informar a linha e a coluna nos erros (opcional).
+
+        Returns:
+            True se a entrada foi aceita.
+        """
         if self.tabela is None:
             raise RuntimeError(
                 "Tabela LL(1) não inicializada. "
                 "Atribua uma TabelaLL1 a ParserLL1.tabela antes de chamar parsear()."
             )
 
+        self.tokens_lidos = 0
+        if self.compilado:
+            return self._parsear_compilado(iter(tokens), fluxo)
+        return self._parsear_simbolos(iter(tokens), fluxo)
+
+    def _parsear_compilado(
+        self, tokens: Iterator[Tuple[str, str]], fluxo: TokenStream | None
+    ) -> bool:
+        """Laço do parser sobre a tabela compilada: pilha de inteiros.
+
+        Ids abaixo de `num_terminais` são terminais; os demais, não-terminais.
+        Um tipo de token fora da gramática vira -1, que não casa com nenhum
+        terminal nem tem entrada na tabela.
+        """
+        compilada = self.tabela.compilar(self.gramatica)
+        num_terminais = compilada.num_terminais
+        acoes = compilada.acoes
+
+        comprimida = self._obter_comprimida(compilada) if self.comprimida else None
+        if comprimida:
+            padrao = comprimida.padrao
+            base = comprimida.base
+            proximo = comprimida.proximo
+            verificacao = comprimida.verificacao
+            tamanho = len(verificacao)
+        corpos = compilada.corpos_reversos
+        producoes = compilada.producoes
+        ids = compilada.ids_terminais
+
+        pilha = [ID_FIM, compilada.inicial]
+        self.producoes_indexadas = producoes
+        derivacao = self.indices_derivacao = array("i")
+        registrar = self.registrar_derivacao
+        posicao = 0
+        passo = 0
+        ids_get = ids.get
+        tipo_atual = next(tokens, FIM_ENTRADA)[1]
+        atual = ids_get(tipo_atual, -1)
+
+        # Nós da árvore, em paralelo à pilha de símbolos (o $ não tem nó)
+        arvore = None
+        if self.construir_arvore:
+            arvore = self.arvore = ArvoreSintatica(
+                compilada, self.gramatica.simbolos.nao_terminais
+            )
+            tokens_arvore = arvore.tokens
+            nos = [-1, 0]
+
+        while True:
+            passo += 1
+            topo = pilha[-1]
+
+            if topo < num_terminais:
+                if topo == atual:
+                    if atual == ID_FIM:
+                        self.tokens_lidos = posicao
+                        return True  # Aceita a entrada
+                    pilha.pop()
+                    if arvore is not None:
+                        tokens_arvore[nos.pop()] = posicao
+                    posicao += 1
+                    tipo_atual = next(tokens, FIM_ENTRADA)[1]
+                    atual = ids_get(tipo_atual, -1)
+                    continue
+
+                self.tokens_lidos = posicao
+                local = fluxo.descrever_posicao(posicao) if fluxo else ""
+                print(
+                    f"Erro de sintaxe: esperado '{compilada.terminais[topo].nome}', "
+                    f"encontrado '{tipo_atual}'{local} no passo {passo}."
+                )
+                return False
+
+            linha = topo - num_terminais
+            if atual < 0:
+                indice = SEM_PRODUCAO
+            elif comprimida:
+                i = base[linha] + atual
+                indice = (
+                    proximo[i]
+                    if i < tamanho and verificacao[i] == linha
+                    else padrao[linha]
+                )
+            else:
+                indice = acoes[linha * num_terminais + atual]
+
+            if indice == SEM_PRODUCAO:
+                self.tokens_lidos = posicao
+                nao_terminal = self.gramatica.simbolos.nao_terminais[linha]
+                local = fluxo.descrever_posicao(posicao) if fluxo else ""
+                print(
+                    f"Erro de sintaxe: não há produção para {nao_terminal} com "
+                    f"símbolo de entrada '{tipo_atual}'{local} no passo {passo}."
+                )
+                return False
+
+            pilha.pop()
+            if registrar:
+                derivacao.append(indice)
+            corpo = corpos[indice]
+            pilha.extend(corpo)
+            if arvore is not None:
+                primeiro = arvore.expandir(nos.pop(), indice)
+                nos.extend(range(primeiro + len(corpo) - 1, primeiro - 1, -1))
+
+    def _obter_comprimida(self, compilada) -> TabelaLL1Comprimida:
+        """Comprime a tabela compilada (uma vez por tabela compilada).
+
+        Com `caminho_comprimida`, reaproveita a tabela gravada se a chave da
+        gramática confere; senão comprime e grava o resultado.
+        """
+        if self.tabela_comprimida is None or self._origem_comprimida is not compilada:
+            chave = chave_gramatica(self.gramatica)
+            caminho = self.caminho_comprimida
+            tabela = None
+            if caminho is not None and os.path.exists(caminho):
+                try:
+                    tabela = TabelaLL1Comprimida.carregar(caminho, chave)
+                except ValueError as e:
+                    print(
+                        f"Cache da tabela comprimida ignorado ({e}), "
+                        "comprimindo novamente"
+                    )
+
+            if tabela is None:
+                tabela = TabelaLL1Comprimida.de_compilada(compilada, chave)
+                if caminho is not None:
+                    os.makedirs(os.path.dirname(caminho) or ".", exist_ok=True)
+                    tabela.salvar(caminho)
+
+            self.tabela_comprimida = tabela
+            self._origem_comprimida = compilada
+        return self.tabela_comprimida
+
+    def _parsear_simbolos(
+        self, tokens: Iterator[Tuple[str, str]], fluxo: TokenStream | None
+    ) -> bool:
+        fim = self.gramatica.simbolos.fim
+        pilha: list[Terminal | NaoTerminal | str] = [
+            fim,
+            self.gramatica.simbolo_inicial,
+        ]
+        posicao = 0
+        passo = 0
+        self.producoes_indexadas = list(self.gramatica.producoes)
+        indices = {producao: i for i, producao in enumerate(self.producoes_indexadas)}
+        derivacao = self.indices_derivacao = array("i")
+        registrar = self.registrar_derivacao
+        tipo_atual = next(tokens, FIM_ENTRADA)[1]
+
         while True:
             passo += 1
 
@@ -37,21 +279,24 @@ class ParserLL1:
             topo = pilha[-1]
 
             # simbolo atual
-            _, tipo_atual = entrada[posicao]
             simbolo_atual = Terminal(tipo_atual)
 
             # Ambos $
-            if simbolo_atual == Terminal("$") and topo == Terminal("$"):
+            if simbolo_atual == fim and topo == fim:
+                self.tokens_lidos = posicao
                 return True  # Aceita a entrada
 
             if isinstance(topo, Terminal):
                 if topo == simbolo_atual:
                     pilha.pop()  # Desempilha terminal
                     posicao += 1  # Avança na entrada
+                    tipo_atual = next(tokens, FIM_ENTRADA)[1]
                 else:
                     # Terminal Errado
+                    self.tokens_lidos = posicao
+                    local = fluxo.descrever_posicao(posicao) if fluxo else ""
                     print(
-                        f"Erro de sintaxe: esperado '{topo.nome}', encontrado '{simbolo_atual.nome}' no passo {passo}."
+                        f"Erro de sintaxe: esperado '{topo.nome}', encontrado '{simbolo_atual.nome}'{local} no passo {passo}."
                     )
                     return False
 
@@ -59,30 +304,55 @@ class ParserLL1:
                 producao = self.tabela.consultar(topo, simbolo_atual)
 
                 if not producao:
+                    self.tokens_lidos = posicao
+                    local = fluxo.descrever_posicao(posicao) if fluxo else ""
                     print(
-                        f"Erro de sintaxe: não há produção para {topo} com símbolo de entrada '{simbolo_atual.nome}' no passo {passo}."
+                        f"Erro de sintaxe: não há produção para {topo} com símbolo de entrada '{simbolo_atual.nome}'{local} no passo {passo}."
                     )
                     return False
 
                 pilha.pop()  # Desempilha o não-terminal
                 corpo = producao.corpo
 
-                self.derivacao.append(str(producao))
+                if registrar:
+                    derivacao.append(indices[producao])
 
                 for simbolo in reversed(corpo):
                     pilha.append(simbolo)
             else:
+                self.tokens_lidos = posicao
+                local = fluxo.descrever_posicao(posicao) if fluxo else ""
                 print(
-                    f"Erro de sintaxe: símbolo não reconhecido '{simbolo_atual.nome}' no passo {passo}."
+                    f"Erro de sintaxe: símbolo não reconhecido '{simbolo_atual.nome}'{local} no passo {passo}."
                 )
                 return False
 
-    def imprimir_derivacao(self):
-        """Imprime as produções usadas (derivação mais à esquerda)."""
-        if not self.derivacao:
-            print("Nenhuma derivação disponível (execute parsear() primeiro).")
+    def imprimir_derivacao(self, inicio: int = 0, quantidade: int | None = None):
+        """Imprime as produções usadas (derivação mais à esquerda).
+
+        Args:
+            inicio: Posição (a partir de 0) do primeiro passo impresso.
+            quantidade: Número máximo de passos impressos (padrão: todos).
+        """
+        if not self.indices_derivacao:
+            if self.registrar_derivacao:
+                print("Nenhuma derivação disponível (execute parsear() primeiro).")
+            else:
+                print("Derivação não registrada (registrar_derivacao=False).")
             return
 
+        total = len(self.indices_derivacao)
+        if quantidade is None:
+            quantidade = total - inicio
+
         print("\n=== DERIVAÇÃO (Leftmost) ===\n")
-        for i, producao in enumerate(self.derivacao, 1):
-            print(f"{i:3}. {producao}")
+        # Cada produção distinta é formatada uma vez
+        textos: dict[int, str] = {}
+        for i in range(inicio, min(inicio + quantidade, total)):
+            indice = self.indices_derivacao[i]
+            texto = textos.get(indice)
+            if texto is None:
+                texto = textos[indice] = str(self.producoes_indexadas[indice])
+            print(f"{i + 1:3}. {texto}")
+        if inicio + quantidade < total:
+            print(f"... mais {total - inicio - quantidade} passos")
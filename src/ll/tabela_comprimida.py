@@ -0,0 +1,234 @@
+import hashlib
+import json
+import mmap
+import os
+from array import array
+from collections import Counter
+from dataclasses import dataclass
+
+from src.gramaticas import Gramatica
+from src.ll.tabela_ll1 import SEM_PRODUCAO, TabelaLL1Compilada
+
+# Incrementar sempre que o formato do arquivo ou a codificação da tabela
+# (ex.: a escolha da produção padrão) mudar; arquivos de versões anteriores
+# passam a ser ignorados mesmo com a mesma gramática.
+VERSAO_FORMATO = 1
+
+MAGICO = b"LL1CMP01"
+LIVRE = -1
+
+
+def chave_gramatica(gramatica: Gramatica) -> str:
+    """Hash SHA-256 das produções (na ordem), que definem os índices da tabela."""
+    conteudo = "\n".join(str(p) for p in gramatica.producoes)
+    return hashlib.sha256(conteudo.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class TabelaLL1Comprimida:
+    """Tabela LL(1) comprimida por deslocamento de linhas (comb vector).
+
+    Cada linha (não-terminal) tem uma produção padrão, que responde por
+    todas as colunas não guardadas explicitamente. Quando a linha usa uma
+    produção ε, ela é a padrão, e as colunas do FOLLOW ficam implícitas. As
+    demais entradas de todas as linhas são sobrepostas em dois vetores
+    compartilhados: a linha `n` começa em `base[n]`, e a entrada `(n, t)`
+    está em `proximo[base[n] + t]` se `verificacao[base[n] + t] == n`.
+
+    A consulta continua O(1). Como a produção padrão também responde por
+    colunas que eram erro na tabela densa, um erro pode ser detectado alguns
+    passos depois (ao casar um terminal), mas a aceitação não muda: é o
+    mesmo efeito das reduções padrão em tabelas LR.
+
+    Attributes:
+        num_terminais: Largura das linhas (ids de terminal).
+        padrao: Produção padrão de cada linha, ou `SEM_PRODUCAO`.
+        base: Deslocamento de cada linha nos vetores compartilhados.
+        proximo: Índices de produção das entradas explícitas.
+        verificacao: Linha dona de cada posição de `proximo`, ou `LIVRE`.
+        chave: Hash da gramática de origem (ver `chave_gramatica`).
+    """
+
+    num_terminais: int
+    padrao: array
+    base: array
+    proximo: array | memoryview
+    verificacao: array | memoryview
+    chave: str = ""
+
+    @classmethod
+    def de_compilada(
+        cls, compilada: TabelaLL1Compilada, chave: str = ""
+    ) -> "TabelaLL1Comprimida":
+        """Comprime a tabela densa de `TabelaLL1Compilada`.
+
+        As linhas com mais entradas explícitas são encaixadas primeiro, cada
+        uma no menor deslocamento em que não colide com as já encaixadas.
+        """
+        largura = compilada.num_terminais
+        acoes = compilada.acoes
+        num_linhas = len(acoes) // largura if largura else 0
+        vazias = {i for i, p in enumerate(compilada.producoes) if not p.corpo}
+
+        padrao = array("i", [SEM_PRODUCAO]) * num_linhas
+        explicitas: list[list[tuple[int, int]]] = []
+        for n in range(num_linhas):
+            linha = acoes[n * largura : (n + 1) * largura]
+            usadas = Counter(p for p in linha if p != SEM_PRODUCAO)
+            producoes_vazias = [p for p in usadas if p in vazias]
+            if producoes_vazias:
+                padrao[n] = producoes_vazias[0]
+            elif usadas:
+                padrao[n] = usadas.most_common(1)[0][0]
+
+            omitidas = (SEM_PRODUCAO, padrao[n])
+            explicitas.append(
+                [(t, p) for t, p in enumerate(linha) if p not in omitidas]
+            )
+
+        base = array("i", [0]) * num_linhas
+        proximo = array("i")
+        verificacao = array("i")
+        ocupadas = bytearray()
+
+        for n in sorted(range(num_linhas), key=lambda n: -len(explicitas[n])):
+            entradas = explicitas[n]
+            if not entradas:
+                continue
+
+            # Candidatos: deslocamentos que põem a primeira entrada numa posição
+            # livre (bytearray.find salta as ocupadas)
+            primeira = entradas[0][0]
+            posicao = primeira
+            while True:
+                livre = ocupadas.find(0, posicao)
+                posicao = len(ocupadas) if livre < 0 else livre
+                deslocamento = posicao - primeira
+                if not any(
+                    deslocamento + t < len(ocupadas) and ocupadas[deslocamento + t]
+                    for t, _ in entradas[1:]
+                ):
+                    break
+                posicao += 1
+            base[n] = deslocamento
+
+            fim = deslocamento + entradas[-1][0] + 1
+            if fim > len(proximo):
+                proximo.extend([SEM_PRODUCAO] * (fim - len(proximo)))
+                verificacao.extend([LIVRE] * (fim - len(verificacao)))
+                ocupadas.extend(bytes(fim - len(ocupadas)))
+            for t, p in entradas:
+                proximo[deslocamento + t] = p
+                verificacao[deslocamento + t] = n
+                ocupadas[deslocamento + t] = 1
+
+        return cls(largura, padrao, base, proximo, verificacao, chave)
+
+    def consultar(self, linha: int, terminal: int) -> int:
+        """Índice da produção para (linha do não-terminal, id do terminal)."""
+        posicao = self.base[linha] + terminal
+        if posicao < len(self.verificacao) and self.verificacao[posicao] == linha:
+            return self.proximo[posicao]
+        return self.padrao[linha]
+
+    def tamanho_bytes(self) -> int:
+        """Memória dos vetores da tabela."""
+        return sum(
+            v.itemsize * len(v)
+            for v in (self.padrao, self.base, self.proximo, self.verificacao)
+        )
+
+    def salvar(self, caminho: str):
+        """Grava a tabela em disco (escrita atômica via arquivo temporário).
+
+        Formato: `MAGICO`, tamanho do cabeçalho JSON (8 bytes, little endian),
+        cabeçalho e, alinhados em 8 bytes, os vetores `padrao`, `base`,
+        `proximo` e `verificacao` em inteiros de 32 bits.
+        """
+        cabecalho = json.dumps(
+            {
+                "versao": VERSAO_FORMATO,
+                "chave": self.chave,
+                "num_terminais": self.num_terminais,
+                "num_linhas": len(self.padrao),
+                "tamanho": len(self.proximo),
+            }
+        ).encode("utf-8")
+
+        inicio_vetores = len(MAGICO) + 8 + len(cabecalho)
+        temporario = f"{caminho}.tmp"
+        with open(temporario, "wb") as f:
+            f.write(MAGICO)
+            f.write(len(cabecalho).to_bytes(8, "little"))
+            f.write(cabecalho)
+            f.write(b"\0" * (-inicio_vetores % 8))
+            for vetor in (self.padrao, self.base, self.proximo, self.verificacao):
+                vetor = array("i", vetor)
+                if vetor.itemsize != 4:
+                    raise ValueError(
+                        "Plataforma sem inteiros de 32 bits em array('i')"
+                    )
+                f.write(vetor.tobytes())
+        os.replace(temporario, caminho)
+
+    @classmethod
+    def carregar(
+        cls, caminho: str, chave: str | None = None
+    ) -> "TabelaLL1Comprimida":
+        """Carrega uma tabela gravada por `salvar`, mapeando os vetores em memória.
+
+        Args:
+            caminho: Arquivo da tabela.
+            chave: Se informada, exige que a tabela seja da gramática com essa
+                chave.
+
+        Raises:
+            ValueError: Se o arquivo for inválido, truncado, de outra versão do
+                formato ou de outra gramática.
+        """
+        with open(caminho, "rb") as f:
+            mapa = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            if mapa[: len(MAGICO)] != MAGICO:
+                raise ValueError(
+                    f"Arquivo não é uma tabela LL(1) comprimida: {caminho}"
+                )
+
+            tamanho = int.from_bytes(mapa[len(MAGICO) : len(MAGICO) + 8], "little")
+            inicio = len(MAGICO) + 8
+            cabecalho = json.loads(mapa[inicio : inicio + tamanho].decode("utf-8"))
+            if cabecalho["versao"] != VERSAO_FORMATO:
+                raise ValueError(
+                    f"Tabela de versão {cabecalho['versao']}, "
+                    f"esperada {VERSAO_FORMATO}"
+                )
+            if chave is not None and cabecalho["chave"] != chave:
+                raise ValueError("Tabela desatualizada: a gramática mudou")
+
+            # confere o tamanho antes do cast, que falharia com TypeError se
+            # o arquivo fosse cortado no meio de um inteiro
+            inicio += tamanho
+            inicio += -inicio % 8
+            linhas, comprimento = cabecalho["num_linhas"], cabecalho["tamanho"]
+            if len(mapa) - inicio != (2 * linhas + 2 * comprimento) * 4:
+                raise ValueError(f"Tabela LL(1) comprimida truncada: {caminho}")
+            num_terminais = cabecalho["num_terminais"]
+        except (KeyError, TypeError) as e:
+            mapa.close()
+            raise ValueError(
+                f"Cabeçalho de tabela comprimida inválido ({e!r}): {caminho}"
+            ) from e
+        except ValueError:
+            mapa.close()
+            raise
+
+        vetores = memoryview(mapa)[inicio:].cast("i")
+        return cls(
+            num_terminais=num_terminais,
+            padrao=array("i", vetores[:linhas]),
+            base=array("i", vetores[linhas : 2 * linhas]),
+            proximo=vetores[2 * linhas : 2 * linhas + comprimento],
+            verificacao=vetores[2 * linhas + comprimento :],
+            chave=cabecalho["chave"],
+        )
@@ -1,45 +1,114 @@
-from typing import Dict, List, Set, Tuple
+from array import array
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
 
-from src.gramaticas import Epsilon, HandlerGramatica, NaoTerminal, Producao, Terminal
+from src.gramaticas import (
+    BIT_EPSILON,
+    Gramatica,
+    HandlerGramatica,
+    NaoTerminal,
+    Producao,
+    Terminal,
+)
 from src.ll.acoes import ConflictErrorLL1
 
-_EPSILON = Epsilon()
+SEM_PRODUCAO = -1
 
 
-class TabelaLL1:
-    def __init__(self):
-        self.tabela: Dict[Tuple[NaoTerminal, Terminal], Producao] = {}
+@dataclass
+class TabelaLL1Compilada:
+    """Tabela LL(1) com símbolos e produções trocados por inteiros.
+
+    Os ids de símbolo da pilha separam terminais e não-terminais por faixa:
+    o terminal de id `t` (em `gramatica.simbolos`) é `t`, e o não-terminal
+    de id `n` é `num_terminais + n`.
+
+    Attributes:
+        num_terminais: Quantidade de terminais (largura de cada linha).
+        acoes: Tabela plana: `acoes[n * num_terminais + t]` é o índice da
+            produção para o não-terminal `n` com o terminal `t`, ou
+            `SEM_PRODUCAO`.
+        producoes: Produções, na ordem de `gramatica.producoes`.
+        corpos_reversos: Para cada produção, o corpo já invertido e em ids
+            de pilha, pronto para um único `extend`.
+        ids_terminais: Nome do terminal → id, para converter os tokens.
+        terminais: Terminais por id, para mensagens de erro.
+        inicial: Id de pilha do símbolo inicial.
+    """
+
+    num_terminais: int
+    acoes: array
+    producoes: List[Producao]
+    corpos_reversos: List[tuple[int, ...]]
+    ids_terminais: Dict[str, int]
+    terminais: List[Terminal]
+    inicial: int
+
+    @classmethod
+    def de_tabela(
+        cls, tabela: Dict[Tuple[NaoTerminal, Terminal], Producao], gramatica: Gramatica
+    ) -> "TabelaLL1Compilada":
+        simbolos = gramatica.simbolos
+        for nao_terminal, terminal in tabela:
+            simbolos.internar(nao_terminal)
+            simbolos.internar(terminal)
+        for producao in gramatica.producoes:
+            simbolos.internar(producao.cabeca)
+            for simbolo in producao.corpo:
+                simbolos.internar(simbolo)
+
+        num_terminais = len(simbolos.terminais)
 
-    @staticmethod
-    def _first_sequencia(simbolos: Tuple, handler: HandlerGramatica) -> Set[Terminal]:
-        resultado: Set[Terminal] = set()
+        def id_pilha(simbolo: Terminal | NaoTerminal) -> int:
+            if isinstance(simbolo, NaoTerminal):
+                return num_terminais + simbolos.ids_nao_terminais[simbolo]
+            return simbolos.ids_terminais[simbolo]
 
-        if not simbolos:
-            return {_EPSILON}
+        producoes = list(gramatica.producoes)
+        indices = {producao: i for i, producao in enumerate(producoes)}
 
-        for simbolo in simbolos:
-            first_xi: Set[Terminal] = handler.get_first(simbolo)
-            resultado |= first_xi - {_EPSILON}
-            if _EPSILON not in first_xi:
-                return resultado  # este símbolo bloqueia ε
+        acoes = array("i", [SEM_PRODUCAO]) * (
+            len(simbolos.nao_terminais) * num_terminais
+        )
+        for (nao_terminal, terminal), producao in tabela.items():
+            linha = simbolos.ids_nao_terminais[nao_terminal]
+            coluna = simbolos.ids_terminais[terminal]
+            acoes[linha * num_terminais + coluna] = indices[producao]
 
-        resultado.add(_EPSILON)  # toda a sequência deriva ε
-        return resultado
+        return cls(
+            num_terminais=num_terminais,
+            acoes=acoes,
+            producoes=producoes,
+            corpos_reversos=[
+                tuple(id_pilha(s) for s in reversed(p.corpo)) for p in producoes
+            ],
+            ids_terminais={t.nome: i for i, t in enumerate(simbolos.terminais)},
+            terminais=list(simbolos.terminais),
+            inicial=id_pilha(gramatica.simbolo_inicial),
+        )
+
+    def consultar(self, nao_terminal: int, terminal: int) -> int:
+        """Índice da produção para (id de pilha do não-terminal, id do terminal)."""
+        linha = nao_terminal - self.num_terminais
+        return self.acoes[linha * self.num_terminais + terminal]
+
+
+class TabelaLL1:
+    def __init__(self):
+        self.tabela: Dict[Tuple[NaoTerminal, Terminal], Producao] = {}
+        self.compilada: TabelaLL1Compilada | None = None
 
     def construir(self, producoes: List[Producao], handler: HandlerGramatica) -> None:
+        simbolos = handler.simbolos
         for producao in producoes:
             cabeca = producao.cabeca
-            corpo = producao.corpo
+            first = handler.get_first_sufixo(producao)
 
-            tem_epsilon = False
-            for simbolo in self._first_sequencia(corpo, handler):
-                if isinstance(simbolo, Terminal) and simbolo == _EPSILON:
-                    tem_epsilon = True
-                    continue
-                self._inserir(cabeca, simbolo, producao)
+            for terminal in simbolos.iterar(first & ~BIT_EPSILON):
+                self._inserir(cabeca, terminal, producao)
 
-            if tem_epsilon:
-                for terminal in handler.get_follow(cabeca):
+            if first & BIT_EPSILON:
+                for terminal in simbolos.iterar(handler.get_follow_bits(cabeca)):
                     self._inserir(cabeca, terminal, producao)
 
     def _inserir(
@@ -53,8 +122,15 @@ class TabelaLL1:
             return
 
         self.tabela[chave] = producao
+        self.compilada = None
 
     def consultar(
         self, nao_terminal: NaoTerminal, terminal: Terminal
     ) -> Producao | None:
         return self.tabela.get((nao_terminal, terminal))
+
+    def compilar(self, gramatica: Gramatica) -> TabelaLL1Compilada:
+        """Gera (ou reaproveita) a forma compilada da tabela para `gramatica`."""
+        if self.compilada is None:
+            self.compilada = TabelaLL1Compilada.de_tabela(self.tabela, gramatica)
+        return self.compilada
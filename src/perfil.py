@@ -0,0 +1,93 @@
+import json
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from typing import Iterator
+
+
+@dataclass
+class MedicaoFase:
+    """Duração e tamanhos de uma execução de uma fase de construção.
+
+    Os contadores são opcionais e preenchidos por quem mede: nem toda fase
+    tem autômato de entrada ou posições.
+    """
+
+    fase: str
+    alvo: str = ""
+    duracao_ns: int = 0
+    estados_antes: int | None = None
+    estados_depois: int | None = None
+    transicoes_antes: int | None = None
+    transicoes_depois: int | None = None
+    posicoes: int | None = None
+    extras: dict[str, int] = field(default_factory=dict)
+
+    @property
+    def duracao_ms(self) -> float:
+        return self.duracao_ns / 1_000_000
+
+
+class Perfilador:
+    """Registra o tempo (`perf_counter_ns`) e os tamanhos de cada fase de construção.
+
+    Uso:
+        with perfil.fase("minimizar", nome) as medicao:
+            medicao.estados_antes = len(afd.estados)
+            afd = minimizar(afd)
+            medicao.estados_depois = len(afd.estados)
+    """
+
+    def __init__(self):
+        self.medicoes: list[MedicaoFase] = []
+
+    @contextmanager
+    def fase(self, fase: str, alvo: str = "") -> Iterator[MedicaoFase]:
+        """Mede o bloco `with` como uma execução de `fase` sobre `alvo`.
+
+        A medição é registrada mesmo se o bloco levantar exceção.
+        """
+        medicao = MedicaoFase(fase, alvo)
+        inicio = time.perf_counter_ns()
+        try:
+            yield medicao
+        finally:
+            medicao.duracao_ns = time.perf_counter_ns() - inicio
+            self.medicoes.append(medicao)
+
+    def limpar(self):
+        self.medicoes = []
+
+    def total_ns(self, fase: str | None = None, alvo: str | None = None) -> int:
+        """Soma das durações, opcionalmente filtradas por fase e/ou alvo."""
+        return sum(
+            m.duracao_ns
+            for m in self.medicoes
+            if (fase is None or m.fase == fase) and (alvo is None or m.alvo == alvo)
+        )
+
+    def resumo(self) -> dict[str, int]:
+        """Tempo total por fase, em nanossegundos, na ordem da primeira execução."""
+        totais: dict[str, int] = {}
+        for m in self.medicoes:
+            totais[m.fase] = totais.get(m.fase, 0) + m.duracao_ns
+        return totais
+
+    def para_dict(self) -> dict:
+        return {
+            "resumo_ns": self.resumo(),
+            "medicoes": [asdict(m) for m in self.medicoes],
+        }
+
+    def exportar_json(self, caminho: str):
+        """Grava o resumo e todas as medições em um arquivo JSON."""
+        with open(caminho, "w", encoding="utf-8") as f:
+            json.dump(self.para_dict(), f, ensure_ascii=False, indent=2)
+
+    def imprimir_resumo(self):
+        total = sum(self.resumo().values()) or 1
+        for fase, duracao in self.resumo().items():
+            print(
+                f"  {fase:<14} {duracao / 1_000_000:10.3f} ms "
+                f"({100 * duracao / total:5.1f}%)"
+            )
@@ -0,0 +1,356 @@
+import mmap
+import re
+from dataclasses import dataclass
+from typing import Callable, Iterator
+
+from src.automatos import Automato, Estado
+from src.intervalos import intervalos_simbolo
+
+try:
+    import numpy as np
+except ImportError:  # o modo vetorizado é opcional
+    np = None
+
+SEM_TRANSICAO = -1
+ERRO = -1
+NOVA_LINHA = ord("\n")
+COMENTARIO = ord("#")
+
+# bytes para os quais str.isspace() é verdadeiro
+ESPACOS = re.compile(rb"[\t-\r\x1c-\x20]*")
+NAO_ESPACOS = re.compile(rb"[^\t-\r\x1c-\x20]*")
+
+# 1 para os bytes que não são brancos, na mesma definição de ESPACOS
+NAO_BRANCOS = bytes(
+    0 if b in range(0x09, 0x0E) or b in range(0x1C, 0x21) else 1 for b in range(256)
+)
+
+Token = tuple[int, int, int]
+
+
+def registrar_falhas(
+    falhas: set[tuple],
+    sem_final: list[tuple],
+    corridas: list[tuple],
+):
+    """Memoriza as configurações sem saída de um token que terminou sem final.
+
+    `corridas` são os trechos `(estado, inicio, fim)` consumidos de uma vez
+    pelo laço de um estado não final: as configurações `(estado, p)` para
+    `inicio <= p < fim` não passaram por `sem_final`, mas também não têm
+    saída. Registrá-las mantém a análise linear: sem elas, um token
+    seguinte que entre no mesmo laço relê o trecho inteiro (ex.: padrões `a`
+    e `a*b` sobre "aaaa..."). Cada configuração é registrada uma única vez:
+    ao encontrar uma já conhecida, o restante do trecho também já é.
+    """
+    falhas.update(sem_final)
+    for estado, inicio, fim in corridas:
+        for posicao in range(inicio, fim):
+            configuracao = (estado, posicao)
+            if configuracao in falhas:
+                break
+            falhas.add(configuracao)
+
+
+@dataclass
+class PrePassagem:
+    """Resultado da classificação vetorizada de um buffer (`pre_passagem`).
+
+    Attributes:
+        classes: Classe de cada byte (índice das linhas de `transicoes`).
+        proximo_nao_espaco: Para cada posição, a primeira posição não branca a
+            partir dela (ou o tamanho do buffer).
+        proxima_quebra: Para cada posição, a próxima quebra de linha a partir
+            dela (ou o tamanho do buffer).
+        comentarios: 1 nas posições que iniciam uma linha de comentário.
+        quebras: Offsets de todas as quebras de linha (índice de linhas).
+    """
+
+    classes: bytes
+    proximo_nao_espaco: memoryview
+    proxima_quebra: memoryview
+    comentarios: bytes
+    quebras: "np.ndarray"
+
+
+class ScannerBytes:
+    """Analisador léxico sobre bytes, para definições somente ASCII.
+
+    Percorre o autômato unificado diretamente sobre um buffer de bytes
+    (`bytes`, `bytearray` ou `mmap`), sem criar strings: cada token é uma
+    tupla `(tipo, inicio, fim)` de offsets no buffer, e o lexema só é
+    decodificado quando pedido (`lexema`).
+
+    Os bytes são traduzidos para classes por uma tabela de 256 entradas
+    (`classes`); a partir dela, cada estado tem uma linha de 256 destinos
+    indexada diretamente pelo byte lido. Bytes fora de todas as classes (em
+    particular bytes não ASCII) não têm transição.
+
+    Segue as mesmas regras de `AnalisadorLexico.analisar`: espaços entre
+    tokens são ignorados, linhas cujo primeiro caractere não branco é `#` são
+    comentários, nenhum token atravessa uma quebra de linha e a análise para
+    no primeiro erro léxico.
+    """
+
+    def __init__(self, automato: Automato, mapa_estados_padroes: dict[Estado, str]):
+        """Compila as tabelas a partir do autômato unificado.
+
+        Args:
+            automato: AFD unificado do analisador léxico.
+            mapa_estados_padroes: Padrão reconhecido por cada estado final.
+
+        Raises:
+            ValueError: Se algum símbolo do autômato não for ASCII.
+        """
+        simbolos = sorted(automato.simbolos, key=intervalos_simbolo)
+        for simbolo in simbolos:
+            if intervalos_simbolo(simbolo)[1] > 127:
+                raise ValueError(
+                    "Definições com caracteres não ASCII não podem usar o scanner "
+                    f"de bytes (símbolo {simbolo!r})"
+                )
+
+        indices: dict[Estado, int] = {automato.estado_inicial: 0}
+        for estado in sorted(automato.estados, key=lambda e: e.nome):
+            indices.setdefault(estado, len(indices))
+
+        # classe 0: sem transição; a quebra de linha encerra qualquer token
+        self.classes = bytearray(256)
+        for classe, simbolo in enumerate(simbolos, 1):
+            inicio, fim = intervalos_simbolo(simbolo)
+            for byte in range(inicio, fim + 1):
+                if byte != NOVA_LINHA:
+                    self.classes[byte] = classe
+
+        indice_classe = {simbolo: classe for classe, simbolo in enumerate(simbolos, 1)}
+        transicoes = [[SEM_TRANSICAO] * (len(simbolos) + 1) for _ in indices]
+        for (origem, simbolo), destinos in automato.transicoes.items():
+            if destinos:
+                destino = indices[next(iter(destinos))]
+                transicoes[indices[origem]][indice_classe[simbolo]] = destino
+
+        # linha de destinos por classe e, expandida pela tabela de classes,
+        # por byte (dispensa a consulta à tabela de classes no laço)
+        self.transicoes: list[list[int]] = transicoes
+        self.linhas: list[list[int]] = [
+            [linha[classe] for classe in self.classes] for linha in transicoes
+        ]
+
+        self.tipos: list[str] = []
+        self.finais: list[int] = [ERRO] * len(indices)
+        for estado in automato.estados_finais:
+            padrao = mapa_estados_padroes.get(estado, "desconhecido")
+            if padrao not in self.tipos:
+                self.tipos.append(padrao)
+            self.finais[indices[estado]] = self.tipos.index(padrao)
+
+        # mesmos laços dominantes de `AnalisadorLexico.preparar_lacos`
+        self.lacos: dict[int, re.Pattern[bytes]] = {}
+        for estado, linha in enumerate(self.linhas):
+            laco = bytes(b for b in range(256) if linha[b] == estado)
+            com_transicao = sum(1 for destino in linha if destino != SEM_TRANSICAO)
+            if laco and 2 * len(laco) >= com_transicao:
+                classe = b"".join(re.escape(bytes([b])) for b in laco)
+                self.lacos[estado] = re.compile(b"[" + classe + b"]*")
+
+    @staticmethod
+    def abrir(caminho: str) -> mmap.mmap | bytes:
+        """Mapeia um arquivo em memória (somente leitura), sem copiá-lo."""
+        with open(caminho, "rb") as f:
+            try:
+                return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # arquivos vazios não podem ser mapeados
+                return b""
+
+    def escanear(self, dados: bytes | bytearray | mmap.mmap) -> Iterator[Token]:
+        """Produz os tokens do buffer como `(tipo, inicio, fim)`.
+
+        `tipo` indexa `self.tipos`; um erro léxico é produzido como
+        `(ERRO, inicio, fim)`, com `fim` no próximo espaço, e encerra a análise.
+        Usa a mesma memorização de configurações sem saída de
+        `AnalisadorLexico.tokenizar`, então o tempo é linear no tamanho do buffer.
+        """
+        n = len(dados)
+        inicio_de_linha = True
+
+        def proximo_token(pos: int) -> tuple[int, bool]:
+            nonlocal inicio_de_linha
+            mudou_linha = False
+            while pos < n:
+                fim_espacos = ESPACOS.match(dados, pos).end()
+                if dados.find(b"\n", pos, fim_espacos) != -1:
+                    inicio_de_linha = mudou_linha = True
+                pos = fim_espacos
+                if pos < n and inicio_de_linha and dados[pos] == COMENTARIO:
+                    fim_linha = dados.find(b"\n", pos)
+                    pos = n if fim_linha == -1 else fim_linha
+                    continue
+                break
+            inicio_de_linha = False
+            return pos, mudou_linha
+
+        return self._escanear(dados, dados, self.linhas, proximo_token)
+
+    def escanear_vetorizado(
+        self, dados: bytes | bytearray | mmap.mmap
+    ) -> Iterator[Token]:
+        """Como `escanear`, mas com a classificação feita antes, pelo NumPy.
+
+        Usa `pre_passagem` para classificar todos os bytes, localizar as quebras
+        de linha, os espaços e os comentários com operações vetoriais; o laço
+        do autômato só indexa as classes já calculadas.
+
+        Raises:
+            ImportError: Se o NumPy não estiver instalado.
+        """
+        pre = self.pre_passagem(dados)
+        n = len(dados)
+        proximo = pre.proximo_nao_espaco
+        proxima_quebra = pre.proxima_quebra
+        comentarios = pre.comentarios
+
+        def proximo_token(pos: int) -> tuple[int, bool]:
+            inicio = pos
+            while pos < n:
+                pos = proximo[pos]
+                if pos < n and comentarios[pos]:
+                    pos = proxima_quebra[pos]
+                    continue
+                break
+            return pos, inicio < n and proxima_quebra[inicio] < pos
+
+        return self._escanear(dados, pre.classes, self.transicoes, proximo_token)
+
+    def pre_passagem(self, dados: bytes | bytearray | mmap.mmap) -> "PrePassagem":
+        """Classifica o buffer inteiro com NumPy.
+
+        Raises:
+            ImportError: Se o NumPy não estiver instalado.
+        """
+        if np is None:
+            raise ImportError("O scanner vetorizado requer o pacote numpy")
+
+        n = len(dados)
+        codigos = np.frombuffer(dados, dtype=np.uint8) if n else np.zeros(0, np.uint8)
+        posicoes = np.arange(n, dtype=np.int64)
+
+        classes = np.take(np.frombuffer(bytes(self.classes), dtype=np.uint8), codigos)
+
+        nao_espaco = np.take(np.frombuffer(NAO_BRANCOS, dtype=np.bool_), codigos)
+        # próxima posição não branca (n se não houver): mínimo acumulado de trás
+        # para frente, equivalente a saltar cada sequência de espaços inteira
+        candidatos = np.where(nao_espaco, posicoes, n)
+        proximo_nao_espaco = np.minimum.accumulate(candidatos[::-1])[::-1]
+
+        eh_quebra = codigos == NOVA_LINHA
+        quebras = np.flatnonzero(eh_quebra)
+        candidatos = np.where(eh_quebra, posicoes, n)
+        proxima_quebra = np.minimum.accumulate(candidatos[::-1])[::-1]
+
+        # comentário: '#' que é o primeiro caractere não branco da linha
+        ultima_quebra = np.maximum.accumulate(np.where(eh_quebra, posicoes, -1))
+        inicio_linha = ultima_quebra + 1
+        primeiro_da_linha = np.zeros(n, dtype=np.bool_)
+        if n:
+            primeiro_da_linha = (
+                proximo_nao_espaco[np.minimum(inicio_linha, n - 1)] == posicoes
+            )
+        comentarios = (codigos == COMENTARIO) & primeiro_da_linha
+
+        return PrePassagem(
+            classes=classes.tobytes(),
+            proximo_nao_espaco=memoryview(proximo_nao_espaco.astype(np.int64)),
+            proxima_quebra=memoryview(proxima_quebra.astype(np.int64)),
+            comentarios=comentarios.tobytes(),
+            quebras=quebras,
+        )
+
+    def _escanear(
+        self,
+        dados: bytes | bytearray | mmap.mmap,
+        entrada: bytes | bytearray | mmap.mmap,
+        tabela: list[list[int]],
+        proximo_token: Callable[[int], tuple[int, bool]],
+    ) -> Iterator[Token]:
+        """Laço do autômato comum aos dois modos.
+
+        Args:
+            dados: Buffer original (lexemas e laços).
+            entrada: Índice de `tabela` para cada posição: o próprio byte ou a
+                classe já calculada.
+            tabela: Linha de destinos por estado, indexada pelos valores de
+                `entrada`.
+            proximo_token: Início do próximo token a partir de uma posição e se
+                alguma quebra de linha foi atravessada.
+        """
+        finais = self.finais
+        lacos = self.lacos
+        n = len(dados)
+        falhas: set[tuple[int, int]] = set()
+
+        pos = 0
+        while True:
+            pos, mudou_linha = proximo_token(pos)
+            if pos >= n:
+                return
+            if mudou_linha:
+                # nenhum token atravessa linhas: configurações antigas não voltam
+                falhas.clear()
+
+            estado = 0
+            tipo = ERRO
+            fim_token = -1
+            sem_final: list[tuple[int, int]] = []
+            corridas: list[tuple[int, int, int]] = []
+            i = pos
+            while i < n:
+                if (estado, i) in falhas:
+                    break
+                sem_final.append((estado, i))
+
+                estado = tabela[estado][entrada[i]]
+                if estado == SEM_TRANSICAO:
+                    break
+                i += 1
+
+                if finais[estado] != ERRO:
+                    tipo = finais[estado]
+                    fim_token = i
+                    sem_final.clear()
+                    corridas.clear()
+
+                laco = lacos.get(estado)
+                if laco is not None:
+                    if (estado, i) in falhas:
+                        break
+                    fim_laco = laco.match(dados, i).end()
+                    if fim_laco > i:
+                        if finais[estado] != ERRO:
+                            fim_token = fim_laco
+                        else:
+                            corridas.append((estado, i, fim_laco))
+                        i = fim_laco
+            registrar_falhas(falhas, sem_final, corridas)
+
+            if fim_token < 0:
+                yield ERRO, pos, max(NAO_ESPACOS.match(dados, pos).end(), pos + 1)
+                return
+
+            yield tipo, pos, fim_token
+            pos = fim_token
+
+    def lexema(self, dados: bytes | bytearray | mmap.mmap, token: Token) -> str:
+        """Decodifica o lexema de um token."""
+        _, inicio, fim = token
+        return bytes(dados[inicio:fim]).decode("utf-8", errors="replace")
+
+    def tipo(self, token: Token) -> str:
+        """Nome do padrão de um token, ou "erro!"."""
+        return "erro!" if token[0] == ERRO else self.tipos[token[0]]
+
+    def tuplas(
+        self, dados: bytes | bytearray | mmap.mmap, tokens: list[Token]
+    ) -> list[tuple[str, str]]:
+        """Converte tokens para o formato (lexema, padrão) de `analisar`."""
+        return [(self.lexema(dados, t), self.tipo(t)) for t in tokens]
@@ -1,4 +1,5 @@
 from src.sdd.dec_tree import NodeDec
+from src.token_stream import TokenStream
 
 
 class SDD:
@@ -7,11 +8,13 @@ class SDD:
         self.declaracoes_processadas = 0
         self.declaracoes = []
         self.erros = []
+        self.fluxo: TokenStream | None = None
 
-    def aplicar(self, tokens: list[tuple[str, str]]):
+    def aplicar(self, tokens: list[tuple[str, str]] | TokenStream):
         self.declaracoes_processadas = 0
         self.declaracoes = []
         self.erros = []
+        self.fluxo = tokens if isinstance(tokens, TokenStream) else None
 
         self.aplicar_declaracoes(tokens)
         self.verificar_tipos_expressoes(tokens)
@@ -87,7 +90,7 @@ class SDD:
                 fim = self._encontrar_fim_expressao(tokens, inicio)
 
                 if inicio < fim and not self._eh_alloc_expressao(tokens, inicio):
-                    self._verificar_expressao(tokens[inicio:fim])
+                    self._verificar_expressao(tokens[inicio:fim], inicio)
 
                 i = fim
                 continue
@@ -97,7 +100,7 @@ class SDD:
                 fim = self._encontrar_fim_expressao(tokens, inicio)
 
                 if inicio < fim:
-                    self._verificar_expressao(tokens[inicio:fim])
+                    self._verificar_expressao(tokens[inicio:fim], inicio)
 
                 i = fim
                 continue
@@ -107,7 +110,7 @@ class SDD:
                 fim = self._encontrar_fim_expressao(tokens, inicio)
 
                 if inicio < fim:
-                    self._verificar_expressao(tokens[inicio:fim])
+                    self._verificar_expressao(tokens[inicio:fim], inicio)
 
                 i = fim
                 continue
@@ -117,7 +120,7 @@ class SDD:
                 fim = self._fechar_parenteses(tokens, inicio)
 
                 if inicio is not None and fim is not None:
-                    self._verificar_expressao(tokens[inicio + 1:fim])
+                    self._verificar_expressao(tokens[inicio + 1:fim], inicio + 1)
                     i = fim + 1
                     continue
 
@@ -140,7 +143,12 @@ class SDD:
 
         partes = self._separar_por_ponto_virgula(tokens[abre + 1:fecha])
 
+        # Cada parte, exceto talvez a última, é seguida por exatamente um ";"
+        inicio_parte = abre + 1
         for parte in partes:
+            inicio = inicio_parte
+            inicio_parte += len(parte) + 1
+
             if not parte:
                 continue
 
@@ -148,14 +156,24 @@ class SDD:
                 if lexema == "=":
                     expr = parte[indice + 1:]
                     if expr and not self._eh_alloc_expressao(expr, 0):
-                        self._verificar_expressao(expr)
+                        self._verificar_expressao(expr, inicio + indice + 1)
                     break
             else:
-                self._verificar_expressao(parte)
+                self._verificar_expressao(parte, inicio)
 
         return fecha + 1
 
-    def _verificar_expressao(self, expressao: list[tuple[str, str]]):
+    def _local(self, indice: int | None) -> str:
+        """Trecho " na linha L, coluna C" do token `indice`, se conhecido."""
+        if self.fluxo is None or indice is None:
+            return ""
+        return self.fluxo.descrever_posicao(indice)
+
+    def _verificar_expressao(
+        self,
+        expressao: list[tuple[str, str]],
+        inicio: int | None = None,
+    ):
         operadores_aritmeticos = {"+", "-", "*", "/", "%"}
         operadores_relacionais = {"<", ">", "<=", ">=", "==", "!="}
 
@@ -177,7 +195,9 @@ class SDD:
                 i = self._pular_chamada_funcao(expressao, i)
                 continue
 
-            tipo = self._tipo_operando(lexema, categoria)
+            tipo = self._tipo_operando(
+                lexema, categoria, None if inicio is None else inicio + i
+            )
 
             if tipo is not None:
                 tipos_encontrados.append((lexema, tipo))
@@ -192,11 +212,13 @@ class SDD:
                 f"{lexema}:{tipo}" for lexema, tipo in tipos_encontrados
             )
             self.erros.append(
-                f"Erro semântico: expressão '{expr_texto}' possui operandos "
+                f"Erro semântico{self._local(inicio)}: expressão '{expr_texto}' possui operandos "
                 f"com tipos incompatíveis ({detalhes})."
             )
 
-    def _tipo_operando(self, lexema: str, categoria: str) -> str | None:
+    def _tipo_operando(
+        self, lexema: str, categoria: str, indice: int | None = None
+    ) -> str | None:
         if categoria == "intconstant":
             return "int"
 
@@ -214,7 +236,8 @@ class SDD:
 
             if entrada is None:
                 self.erros.append(
-                    f"Erro semântico: identificador '{lexema}' não declarado."
+                    f"Erro semântico{self._local(indice)}: identificador "
+                    f"'{lexema}' não declarado."
                 )
                 return None
 
@@ -0,0 +1,214 @@
+import re
+import sys
+from array import array
+from bisect import bisect_right
+from typing import Iterable, Iterator, overload
+
+SEM_LEXEMA = -1
+
+# Sufixo opcional de posição no arquivo de tokens: "<lexema, tipo> @linha:coluna"
+PADRAO_POSICAO = re.compile(r"(<.*>) @(\d+):(\d+)")
+
+
+def formatar_token(
+    lexema: str, tipo: str, posicao: tuple[int, int] | None = None
+) -> str:
+    """Formata um token como linha do arquivo de tokens (sem quebra de linha)."""
+    if posicao is None:
+        return f"<{lexema}, {tipo}>"
+    return f"<{lexema}, {tipo}> @{posicao[0]}:{posicao[1]}"
+
+
+class TokenStream:
+    """Sequência compacta de tokens, em colunas paralelas (struct of arrays).
+
+    Cada token ocupa uma posição em cada coluna `array('i')`: tipo (índice em
+    `tipos`), início (offset em `fonte`), comprimento e lexema internado
+    (índice em `lexemas`, ou `SEM_LEXEMA`). Os nomes dos padrões são
+    guardados uma única vez em `tipos`.
+
+    Quando há texto fonte, a linha e a coluna de um token não são guardadas:
+    `posicao` as calcula sob demanda, por busca binária do offset no índice
+    das quebras de linha de `fonte`, construído no primeiro uso. Fluxos
+    carregados de um arquivo de tokens não têm a fonte original e guardam as
+    posições lidas em duas colunas explícitas (`linhas` e `colunas`).
+
+    Lexemas com forma de identificador (identificadores e palavras-chave), que
+    se repetem muito, são internados: cada lexema distinto existe uma única
+    vez. Os demais (números, strings, operadores) são recortados de `fonte`
+    somente quando acessados.
+
+    Indexar ou iterar produz tuplas `(lexema, tipo)`, o mesmo formato de
+    `AnalisadorLexico.analisar`, então o fluxo pode substituir a lista de
+    tuplas (por exemplo em `AnalisadorSintatico.analisar_ll1`).
+    """
+
+    def __init__(self, fonte: str = ""):
+        """Cria um fluxo vazio sobre um texto fonte.
+
+        Args:
+            fonte: Texto do qual os tokens são recortados.
+        """
+        self.fonte: str = fonte
+        self.com_posicoes: bool = True
+        self._quebras: array | None = None
+        self.linhas: array | None = None
+        self.colunas: array | None = None
+        self.tipos: list[str] = []
+        self.indice_tipos: dict[str, int] = {}
+        self.lexemas: list[str] = []
+        self.indice_lexemas: dict[str, int] = {}
+
+        self.colunas_tipo = array("i")
+        self.inicios = array("i")
+        self.comprimentos = array("i")
+        self.colunas_lexema = array("i")
+
+    @classmethod
+    def de_tuplas(
+        cls,
+        tokens: Iterable[tuple[str, str]],
+        posicoes: list[tuple[int, int]] | None = None,
+    ) -> "TokenStream":
+        """Cria um fluxo a partir de tuplas (lexema, tipo), sem texto fonte.
+
+        Os lexemas são concatenados em uma fonte compacta, um por linha. Sem
+        `posicoes`, o fluxo não informa posições; com elas, a linha e a
+        coluna de cada token são guardadas como vieram, em `linhas` e
+        `colunas`, sem depender da ordem dos tokens.
+
+        Args:
+            tokens: Tuplas (lexema, tipo).
+            posicoes: (linha, coluna) de cada token, a partir de 1 (opcional).
+
+        Raises:
+            ValueError: Se `posicoes` não tiver uma posição por token.
+        """
+        fluxo = cls()
+        partes: list[str] = []
+        offset = 0
+        for lexema, tipo in tokens:
+            fluxo.adicionar(tipo, offset, len(lexema), lexema)
+            partes.append(lexema)
+            offset += len(lexema) + 1
+        fluxo.fonte = "\n".join(partes)
+
+        if posicoes is None:
+            fluxo.com_posicoes = False
+            return fluxo
+
+        if len(posicoes) != len(fluxo):
+            raise ValueError(f"{len(posicoes)} posições para {len(fluxo)} tokens")
+        fluxo.linhas = array("i", (linha for linha, _ in posicoes))
+        fluxo.colunas = array("i", (coluna for _, coluna in posicoes))
+        return fluxo
+
+    def adicionar(self, tipo: str, inicio: int, comprimento: int, lexema: str = ""):
+        """Acrescenta um token.
+
+        Args:
+            tipo: Nome do padrão (ou "erro!").
+            inicio: Offset do lexema em `fonte`.
+            comprimento: Tamanho do lexema.
+            lexema: Texto do lexema, se já disponível; usado para decidir se
+                ele é internado.
+        """
+        indice_tipo = self.indice_tipos.get(tipo)
+        if indice_tipo is None:
+            indice_tipo = self.indice_tipos[tipo] = len(self.tipos)
+            self.tipos.append(tipo)
+
+        indice_lexema = SEM_LEXEMA
+        if lexema.isidentifier():
+            indice_lexema = self.indice_lexemas.get(lexema, SEM_LEXEMA)
+            if indice_lexema == SEM_LEXEMA:
+                indice_lexema = self.indice_lexemas[lexema] = len(self.lexemas)
+                self.lexemas.append(sys.intern(lexema))
+
+        self.colunas_tipo.append(indice_tipo)
+        self.inicios.append(inicio)
+        self.comprimentos.append(comprimento)
+        self.colunas_lexema.append(indice_lexema)
+
+    def lexema(self, indice: int) -> str:
+        indice_lexema = self.colunas_lexema[indice]
+        if indice_lexema != SEM_LEXEMA:
+            return self.lexemas[indice_lexema]
+        inicio = self.inicios[indice]
+        return self.fonte[inicio : inicio + self.comprimentos[indice]]
+
+    def tipo(self, indice: int) -> str:
+        return self.tipos[self.colunas_tipo[indice]]
+
+    @property
+    def quebras(self) -> array:
+        """Offsets das quebras de linha de `fonte`, em ordem crescente."""
+        if self._quebras is None:
+            self._quebras = array(
+                "i", (m.start() for m in re.finditer("\n", self.fonte))
+            )
+        return self._quebras
+
+    def posicao_offset(self, offset: int) -> tuple[int, int]:
+        """Converte um offset de `fonte` em (linha, coluna), a partir de 1."""
+        linha = bisect_right(self.quebras, offset - 1)
+        inicio_linha = self.quebras[linha - 1] + 1 if linha else 0
+        return linha + 1, offset - inicio_linha + 1
+
+    def posicao(self, indice: int) -> tuple[int, int] | None:
+        """Linha e coluna (a partir de 1) do início do token `indice`.
+
+        Returns:
+            (linha, coluna), ou None se o fluxo não tem posições de origem.
+        """
+        if not self.com_posicoes:
+            return None
+        if self.linhas is not None and self.colunas is not None:
+            return self.linhas[indice], self.colunas[indice]
+        return self.posicao_offset(self.inicios[indice])
+
+    def descrever_posicao(self, indice: int) -> str:
+        """Trecho " na linha L, coluna C" para mensagens, ou "" sem posição."""
+        if not -len(self) <= indice < len(self):
+            return ""
+        posicao = self.posicao(indice)
+        if posicao is None:
+            return ""
+        return f" na linha {posicao[0]}, coluna {posicao[1]}"
+
+    def __len__(self) -> int:
+        return len(self.colunas_tipo)
+
+    @overload
+    def __getitem__(self, indice: int) -> tuple[str, str]: ...
+
+    @overload
+    def __getitem__(self, indice: slice) -> list[tuple[str, str]]: ...
+
+    def __getitem__(self, indice):
+        if isinstance(indice, slice):
+            return [self[i] for i in range(*indice.indices(len(self)))]
+        if indice < 0:
+            indice += len(self)
+        if not 0 <= indice < len(self):
+            raise IndexError("índice de token fora do fluxo")
+        return self.lexema(indice), self.tipo(indice)
+
+    def __iter__(self) -> Iterator[tuple[str, str]]:
+        for indice in range(len(self)):
+            yield self.lexema(indice), self.tipo(indice)
+
+    def tamanho_bytes(self) -> int:
+        """Memória aproximada das colunas e tabelas (sem contar a fonte)."""
+        colunas = (
+            self.colunas_tipo,
+            self.inicios,
+            self.comprimentos,
+            self.colunas_lexema,
+        )
+        for extra in (self._quebras, self.linhas, self.colunas):
+            if extra is not None:
+                colunas += (extra,)
+        return sum(c.itemsize * len(c) for c in colunas) + sum(
+            sys.getsizeof(s) for s in self.lexemas + self.tipos
+        )
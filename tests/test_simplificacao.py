@@ -0,0 +1,70 @@
+import contextlib
+import io
+import os
+import random
+
+import pytest
+
+from src.analisador_lexico import AnalisadorLexico
+from src.automatos import HandlerAutomatos
+from src.conversorER import ConversorER_AFD
+from src.expressaoregular import ExpressaoRegular
+
+PASTA_DEFINICOES = os.path.join(os.path.dirname(__file__), "arquivos_definicao")
+
+
+def gerar_par(expressao: str):
+    """ERs e AFDs (followpos) de `expressao` sem e com simplificação."""
+    conversor = ConversorER_AFD()
+    original = ExpressaoRegular(expressao, simplificar=False)
+    simplificada = ExpressaoRegular(expressao, simplificar=True)
+    return (
+        original,
+        simplificada,
+        conversor.gerar_afd(original),
+        conversor.gerar_afd(simplificada),
+    )
+
+
+def expressao_aleatoria(gerador: random.Random, profundidade: int) -> str:
+    sorteio = gerador.random()
+    if profundidade == 0 or sorteio < 0.3:
+        return gerador.choice("abc&")
+    if sorteio < 0.5:
+        esquerda = expressao_aleatoria(gerador, profundidade - 1)
+        direita = expressao_aleatoria(gerador, profundidade - 1)
+        return f"({esquerda}|{direita})"
+    if sorteio < 0.7:
+        return expressao_aleatoria(gerador, profundidade - 1) + expressao_aleatoria(
+            gerador, profundidade - 1
+        )
+    interna = expressao_aleatoria(gerador, profundidade - 1)
+    return f"({interna}){gerador.choice('*+?')}"
+
+
+@pytest.mark.parametrize("arquivo", sorted(os.listdir(PASTA_DEFINICOES)))
+def test_definicoes_equivalentes(arquivo):
+    analisador = AnalisadorLexico()
+    with contextlib.redirect_stdout(io.StringIO()):
+        analisador.ler_definicoes(os.path.join(PASTA_DEFINICOES, arquivo))
+
+    handler = HandlerAutomatos()
+    posicoes_antes = posicoes_depois = 0
+    for nome, expressao in analisador.definicoes.items():
+        original, simplificada, afd_original, afd_simplificado = gerar_par(expressao)
+        assert handler.equivalentes(afd_original, afd_simplificado), nome
+        assert len(afd_simplificado.estados) <= len(afd_original.estados), nome
+        posicoes_antes += len(original.folhas)
+        posicoes_depois += len(simplificada.folhas)
+
+    assert posicoes_depois <= posicoes_antes
+
+
+def test_aleatorias_equivalentes():
+    gerador = random.Random(0)
+    handler = HandlerAutomatos()
+    for _ in range(500):
+        expressao = expressao_aleatoria(gerador, 4)
+        original, simplificada, afd_original, afd_simplificado = gerar_par(expressao)
+        assert handler.equivalentes(afd_original, afd_simplificado), expressao
+        assert len(simplificada.folhas) <= len(original.folhas), expressao